@@ -0,0 +1,88 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from benchmarks.local_aws import (
+    inject_bandwidth_limit,
+    inject_latency,
+    make_session,
+    moto_server,
+)
+from src.aws_utils.s3_utils import MB, S3Utils
+
+
+def single_stream_download(s3: S3Utils, bucket: str, key: str, dest_path: str) -> None:
+    body = s3.client.get_object(Bucket=bucket, Key=key)["Body"]
+    with open(dest_path, "wb") as f:
+        for chunk in body.iter_chunks(S3Utils.IO_CHUNK_SIZE):
+            f.write(chunk)
+
+
+def ranged_download(s3: S3Utils, bucket: str, key: str, dest_path: str) -> None:
+    s3.download_file(bucket, key, dest_path)
+
+
+def measure(
+    download: Callable[[S3Utils, str, str, str], None],
+    s3: S3Utils,
+    bucket: str,
+    key: str,
+    dest_dir: str,
+    total_bytes: int,
+) -> Dict[str, float]:
+    dest_path = os.path.join(dest_dir, f"{download.__name__}.bin")
+    start = time.perf_counter()
+    download(s3, bucket, key, dest_path)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "mb_per_sec": total_bytes / MB / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare a single-stream GET with S3Utils.download_file"
+    )
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--chunk-mb", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=S3Utils.DEFAULT_MAX_WORKERS)
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Injected seconds per request"
+    )
+    parser.add_argument(
+        "--stream-mbps", type=float, default=50, help="Simulated MB/s per connection"
+    )
+    args = parser.parse_args()
+
+    total_bytes = args.size_mb * MB
+    with moto_server(), tempfile.TemporaryDirectory() as dest_dir:
+        s3 = S3Utils(
+            make_session(),
+            transfer_config=S3Utils.build_transfer_config(
+                max_workers=args.workers,
+                multipart_threshold=args.chunk_mb * MB,
+                multipart_chunksize=args.chunk_mb * MB,
+            ),
+        )
+        bucket, key = "bench-download", "large.bin"
+        s3.client.create_bucket(Bucket=bucket)
+        s3.client.put_object(Bucket=bucket, Key=key, Body=os.urandom(total_bytes))
+        inject_latency(s3.client, args.latency)
+        inject_bandwidth_limit(s3.client, args.stream_mbps * MB)
+
+        results = {
+            name: measure(download, s3, bucket, key, dest_dir, total_bytes)
+            for name, download in (
+                ("single", single_stream_download),
+                ("ranged", ranged_download),
+            )
+        }
+
+    for name, result in results.items():
+        print(f"{name:>8}: {result['seconds']:.2f}s {result['mb_per_sec']:.2f} MB/s")
+    speedup = results["single"]["seconds"] / results["ranged"]["seconds"]
+    print(f" speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
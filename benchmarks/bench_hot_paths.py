@@ -0,0 +1,279 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.bench_upload_directory import create_tree
+from benchmarks.local_aws import inject_latency, make_session, moto_server
+from src.aws_utils.client_cache import client_cache
+from src.aws_utils.codec import BodyCodec
+from src.aws_utils.instrumentation import instrumentation
+from src.aws_utils.s3_utils import MB, S3Utils
+from src.aws_utils.sqs_utils import SQSUtils
+
+VERSION = "0.1.0"
+SCENARIOS: Dict[str, Callable[["Context"], Dict[str, float]]] = {}
+REGRESSION_METRICS = ("ops_per_sec", "mb_per_sec")
+
+
+class Context:
+    def __init__(self, args: argparse.Namespace, work_dir: str) -> None:
+        self.args = args
+        self.work_dir = work_dir
+        session = make_session()
+        inject_latency(session, args.latency)
+        self.sqs = SQSUtils(session)
+        self.sqs_compressed = SQSUtils(session, codec=BodyCodec())
+        self.s3 = S3Utils(
+            session,
+            transfer_config=S3Utils.build_transfer_config(max_workers=args.workers),
+        )
+
+
+def scenario(name: str):
+    def register(func: Callable[[Context], Dict[str, float]]):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def timed(func: Callable[[], object]) -> float:
+    instrumentation.reset()
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def rates(seconds: float, ops: int, total_bytes: int = 0) -> Dict[str, float]:
+    return {
+        "seconds": round(seconds, 4),
+        "ops": ops,
+        "ops_per_sec": round(ops / seconds, 2),
+        "mb_per_sec": round(total_bytes / MB / seconds, 3),
+    }
+
+
+def message_body(size: int, index: int) -> str:
+    prefix = f"{index:08d}:"
+    return prefix + "x" * max(0, size - len(prefix))
+
+
+def json_body(size: int, index: int) -> str:
+    items = []
+    while sum(len(item) for item in items) < size:
+        n = len(items)
+        items.append(json.dumps({
+            "event_id": f"{index:08d}-{n:04d}", "type": "order.updated",
+            "account": f"acct-{(index * 31 + n) % 997:04d}", "amount": (index * 7 + n) % 10000 / 100,
+            "status": ("pending", "paid", "shipped")[n % 3], "tags": ["web", "eu-west-1"],
+        }))
+    return "[" + ",".join(items) + "]"
+
+
+def wire_bytes(operation: str) -> int:
+    stats = instrumentation.get(operation)
+    return stats["bytes_sent"] if stats else 0
+
+
+def send_json(ctx: Context, sqs: SQSUtils, queue_name: str) -> Dict[str, float]:
+    args = ctx.args
+    queue_url = sqs.create_queue(queue_name)
+    path = os.path.join(ctx.work_dir, "events.jsonl")
+    if not os.path.exists(path):
+        with open(path, "w") as f:
+            for i in range(args.messages):
+                f.write(json_body(args.json_size, i) + "\n")
+    payload_bytes = os.path.getsize(path) - args.messages
+
+    seconds = timed(lambda: sqs.send_messages_from_file(queue_url, path, args.workers))
+    result = rates(seconds, args.messages, payload_bytes)
+    result["batches"] = (instrumentation.get("sqs.SendMessageBatch") or {}).get("calls", 0)
+    result["wire_bytes"] = wire_bytes("sqs.SendMessageBatch")
+    return result
+
+
+@scenario("sqs.send_messages_from_file")
+def bench_send_messages_from_file(ctx: Context) -> Dict[str, float]:
+    args = ctx.args
+    queue_url = ctx.sqs.create_queue("bench-send")
+    path = os.path.join(ctx.work_dir, "messages.txt")
+    with open(path, "w") as f:
+        for i in range(args.messages):
+            f.write(message_body(args.message_size, i) + "\n")
+
+    seconds = timed(lambda: ctx.sqs.send_messages_from_file(queue_url, path, args.workers))
+    return rates(seconds, args.messages, args.messages * args.message_size)
+
+
+@scenario("sqs.send_json")
+def bench_send_json(ctx: Context) -> Dict[str, float]:
+    return send_json(ctx, ctx.sqs, "bench-send-json")
+
+
+@scenario("sqs.send_json_compressed")
+def bench_send_json_compressed(ctx: Context) -> Dict[str, float]:
+    return send_json(ctx, ctx.sqs_compressed, "bench-send-json-compressed")
+
+
+@scenario("sqs.receive_messages")
+def bench_receive_messages(ctx: Context) -> Dict[str, float]:
+    args = ctx.args
+    queue_url = ctx.sqs.create_queue("bench-receive")
+    bodies = (message_body(args.message_size, i) for i in range(args.messages))
+    batches = ctx.sqs._pack_batches({"MessageBody": body} for body in bodies)
+    for batch in batches:
+        ctx.sqs._send_batch(queue_url, batch)
+
+    received: List[Dict] = []
+
+    def receive() -> None:
+        while len(received) < args.messages:
+            messages = ctx.sqs.receive_messages(queue_url)
+            if not messages:
+                break
+            received.extend(messages)
+
+    seconds = timed(receive)
+    return rates(seconds, len(received), len(received) * args.message_size)
+
+
+@scenario("sqs.list_queues")
+def bench_list_queues(ctx: Context) -> Dict[str, float]:
+    args = ctx.args
+    for i in range(args.queues):
+        ctx.sqs.create_queue(f"bench-list-{i:04d}")
+
+    def list_queues() -> None:
+        for _ in range(args.repeat):
+            ctx.sqs.list_queues("bench-list-", refresh=True)
+
+    return rates(timed(list_queues), args.repeat)
+
+
+@scenario("s3.upload_directory")
+def bench_upload_directory(ctx: Context) -> Dict[str, float]:
+    args = ctx.args
+    dir_path = os.path.join(ctx.work_dir, "tree")
+    total_bytes = create_tree(dir_path, args.files, args.file_size)
+    bucket = "bench-upload-directory"
+    ctx.s3.client.create_bucket(Bucket=bucket)
+
+    seconds = timed(lambda: ctx.s3.upload_directory(dir_path, bucket, "tree"))
+    return rates(seconds, args.files, total_bytes)
+
+
+@scenario("s3.upload_file")
+def bench_upload_file(ctx: Context) -> Dict[str, float]:
+    args = ctx.args
+    path = os.path.join(ctx.work_dir, "large.bin")
+    with open(path, "wb") as f:
+        f.write(os.urandom(args.large_file_size))
+    bucket = "bench-upload-file"
+    ctx.s3.client.create_bucket(Bucket=bucket)
+
+    seconds = timed(lambda: ctx.s3.upload_file(path, bucket, "large.bin"))
+    return rates(seconds, 1, args.large_file_size)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_scenarios(args: argparse.Namespace) -> Dict[str, Dict]:
+    results = {}
+    with moto_server(), tempfile.TemporaryDirectory() as work_dir:
+        client_cache.clear()
+        ctx = Context(args, work_dir)
+        for name in args.scenarios:
+            result = SCENARIOS[name](ctx)
+            result["operations"] = {
+                op: {"calls": stats["calls"], "errors": stats["errors"],
+                     "p50_ms": stats["latency_ms"]["p50"], "p99_ms": stats["latency_ms"]["p99"]}
+                for op, stats in instrumentation.snapshot().items()
+            }
+            results[name] = result
+            print(
+                f"{name:<30} {result['seconds']:>8.2f}s {result['ops_per_sec']:>10.1f} ops/s "
+                f"{result['mb_per_sec']:>8.2f} MB/s"
+            )
+        client_cache.clear()
+    return results
+
+
+def find_regressions(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        for metric in REGRESSION_METRICS:
+            before, after = previous.get(metric, 0), result.get(metric, 0)
+            if before and after < before * (1 - threshold):
+                regressions.append(
+                    f"{name} {metric}: {before} -> {after} ({(after / before - 1) * 100:.1f}%)"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark SQSUtils and S3Utils hot paths against a local moto server"
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS),
+                        default=list(SCENARIOS))
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--message-size", type=int, default=1024)
+    parser.add_argument("--json-size", type=int, default=48 * 1024,
+                        help="Approximate size of JSON bodies for the compression scenarios")
+    parser.add_argument("--queues", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-size", type=int, default=16 * 1024)
+    parser.add_argument("--large-file-size", type=int, default=32 * MB)
+    parser.add_argument("--workers", type=int, default=S3Utils.DEFAULT_MAX_WORKERS)
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="Injected seconds per request"
+    )
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2,
+        help="Relative throughput drop reported as a regression",
+    )
+    args = parser.parse_args(argv)
+
+    report = {
+        "version": VERSION,
+        "git_revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items()
+                   if k not in ("output", "baseline", "threshold")},
+        "results": run_scenarios(args),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
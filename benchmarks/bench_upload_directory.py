@@ -0,0 +1,92 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, Dict
+
+from benchmarks.local_aws import inject_latency, make_session, moto_server
+from src.aws_utils.s3_utils import MB, S3Utils
+
+
+def create_tree(root: str, file_count: int, file_size: int) -> int:
+    payload = os.urandom(file_size)
+    for i in range(file_count):
+        directory = os.path.join(root, f"dir{i % 20:02d}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i:06d}.bin"), "wb") as f:
+            f.write(payload)
+    return file_count * file_size
+
+
+def serial_upload(s3: S3Utils, dir_path: str, bucket: str, prefix: str) -> None:
+    for local_path, s3_key in s3._walk_directory(dir_path, prefix):
+        s3.upload_file(local_path, bucket, s3_key)
+
+
+def parallel_upload(s3: S3Utils, dir_path: str, bucket: str, prefix: str) -> None:
+    s3.upload_directory(dir_path, bucket, prefix)
+
+
+def measure(
+    name: str,
+    upload: Callable[[S3Utils, str, str, str], None],
+    s3: S3Utils,
+    dir_path: str,
+    bucket: str,
+    file_count: int,
+    total_bytes: int,
+) -> Dict[str, float]:
+    start = time.perf_counter()
+    upload(s3, dir_path, bucket, name)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "files_per_sec": file_count / elapsed,
+        "mb_per_sec": total_bytes / MB / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare serial and parallel S3Utils.upload_directory"
+    )
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--file-size", type=int, default=16 * 1024)
+    parser.add_argument("--workers", type=int, default=S3Utils.DEFAULT_MAX_WORKERS)
+    parser.add_argument(
+        "--latency", type=float, default=0.01, help="Injected seconds per request"
+    )
+    args = parser.parse_args()
+
+    with moto_server(), tempfile.TemporaryDirectory() as dir_path:
+        total_bytes = create_tree(dir_path, args.files, args.file_size)
+        s3 = S3Utils(
+            make_session(),
+            transfer_config=S3Utils.build_transfer_config(max_workers=args.workers),
+        )
+        inject_latency(s3.client, args.latency)
+        bucket = "bench-upload-directory"
+        s3.client.create_bucket(Bucket=bucket)
+
+        results = {
+            name: measure(
+                name, upload, s3, dir_path, bucket, args.files, total_bytes
+            )
+            for name, upload in (
+                ("serial", serial_upload),
+                ("parallel", parallel_upload),
+            )
+        }
+
+    for name, result in results.items():
+        print(
+            f"{name:>8}: {result['seconds']:.2f}s "
+            f"{result['files_per_sec']:.1f} files/s "
+            f"{result['mb_per_sec']:.2f} MB/s"
+        )
+    speedup = results["serial"]["seconds"] / results["parallel"]["seconds"]
+    print(f" speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
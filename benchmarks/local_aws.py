@@ -0,0 +1,83 @@
+import logging
+import os
+import socket
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import boto3
+from moto.server import ThreadedMotoServer
+
+DEFAULT_REGION = "us-east-1"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def moto_server() -> Iterator[str]:
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    port = _free_port()
+    server = ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    endpoint = f"http://127.0.0.1:{port}"
+    previous = {
+        key: os.environ.get(key)
+        for key in (
+            "AWS_ENDPOINT_URL",
+            "AWS_ACCESS_KEY_ID",
+            "AWS_SECRET_ACCESS_KEY",
+            "AWS_DEFAULT_REGION",
+        )
+    }
+    os.environ.update(
+        {
+            "AWS_ENDPOINT_URL": endpoint,
+            "AWS_ACCESS_KEY_ID": "testing",
+            "AWS_SECRET_ACCESS_KEY": "testing",
+            "AWS_DEFAULT_REGION": DEFAULT_REGION,
+        }
+    )
+    try:
+        yield endpoint
+    finally:
+        server.stop()
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _events(target):
+    return target.meta.events if hasattr(target, "meta") else target.events
+
+
+def inject_latency(target, latency: float) -> None:
+    if latency <= 0:
+        return
+
+    def _delay(**kwargs) -> None:
+        time.sleep(latency)
+
+    _events(target).register("before-send", _delay)
+
+
+def inject_bandwidth_limit(target, bytes_per_second: float) -> None:
+    if bytes_per_second <= 0:
+        return
+
+    def _throttle(http_response, model, **kwargs) -> None:
+        if model.http.get("method") == "HEAD":
+            return
+        length = int(http_response.headers.get("content-length") or 0)
+        time.sleep(length / bytes_per_second)
+
+    _events(target).register("after-call", _throttle)
+
+
+def make_session() -> boto3.Session:
+    return boto3.Session(region_name=DEFAULT_REGION)
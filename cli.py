@@ -1,16 +1,38 @@
+import argparse
+import atexit
+import json
+import os
+import shlex
+import sys
+import threading
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass, replace
 
 import questionary
-import yaml
 from colorama import Fore, Style, init
+from prompt_toolkit.completion import Completer, Completion, ThreadedCompleter
 
+from src import aws_utils
 from src.aws_utils.configuration import ConfigurationManager, Config
-from src.aws_utils.s3_utils import S3Utils
-from src.aws_utils.sqs_utils import SQSUtils
+from src.aws_utils.instrumentation import instrumentation
+from src.aws_utils.log import configure_logging
+from src.aws_utils.progress import Progress, console_progress
+
+STATS_FILE_ENV = "AWS_UTILS_STATS_FILE"
+LOG_LEVEL_ENV = "AWS_UTILS_LOG_LEVEL"
+LOG_FORMAT_ENV = "AWS_UTILS_LOG_FORMAT"
 
 
 class MenuOptions:
-    MAIN = ["SQS", "S3", "Configure", "Exit"]
+    MAIN = ["SQS", "S3", "All regions", "Stats", "Configure", "Exit"]
+
+    FANOUT = {
+        "queues": "Find queues",
+        "metrics": "Queue message counts",
+        "buckets": "List buckets",
+    }
 
     SQS = {
         "list_queues": "List queues",
@@ -26,10 +48,16 @@ class MenuOptions:
 
     S3 = {
         "list_buckets": "List buckets",
+        "list_objects": "List objects",
+        "summarize_objects": "Summarize objects by prefix",
         "open_bucket": "Open bucket in console",
         "delete_object": "Delete file",
+        "download_file": "Download file",
+        "download_prefix": "Download prefix",
         "upload_file": "Upload file",
         "upload_directory": "Upload directory",
+        "abort_uploads": "Clean up incomplete uploads",
+        "sync_directory": "Sync directory",
         "back": "Back"
     }
 
@@ -63,7 +91,7 @@ class MenuHandler(ABC):
 class SQSActionExecutor(MenuHandler):
     def __init__(self, session):
         super().__init__(session, MenuOptions.SQS, "What would you like to do with SQS?")
-        self.sqs = SQSUtils(session)
+        self.sqs = aws_utils.SQSUtils(session)
 
     def _init_actions(self):
         return {
@@ -78,68 +106,122 @@ class SQSActionExecutor(MenuHandler):
         }
 
     def _list_queues(self):
-        queue_list = self.sqs.list_queues()
+        queue_list = self.sqs.list_queues(refresh=True)
         print(Fore.GREEN + "Found queues:")
         for queue_url, queue_name in queue_list:
             print(Fore.YELLOW + f"{queue_name} - ({queue_url})")
 
     def _display_message_count(self):
-        queue_url = select_queue(self.sqs)
-        count = self.sqs.get_message_count(queue_url)
-        print(Fore.GREEN + f"Message count: {count}")
+        scope = questionary.select(
+            "Count messages for:",
+            choices=["One queue", "All queues", "All queues (watch)"]
+        ).ask()
+
+        if scope == "One queue":
+            queue_url = select_queue(self.sqs)
+            count = self.sqs.get_message_count(queue_url)
+            print(Fore.GREEN + f"Message count: {count}")
+            return
+
+        interval = 0
+        if scope == "All queues (watch)":
+            interval = float(questionary.text("Refresh every N seconds:", default="5").ask())
+        try:
+            for metrics, changed in self.sqs.watch_queue_metrics(
+                interval, iterations=None if interval else 1
+            ):
+                if len(changed) == len(metrics):
+                    print(Fore.GREEN + render_metrics_header())
+                for row in changed:
+                    print(Fore.YELLOW + render_metrics_row(row))
+        except KeyboardInterrupt:
+            pass
 
     def _open_queue_console(self):
         queue_url = select_queue(self.sqs)
         region = questionary.text("Enter region (or leave blank for default):").ask()
-        self.sqs.open_queue_in_console(queue_url, region or None)
+        self.sqs.open_in_console(queue_url, region or None)
 
     def _display_queue_settings(self):
+        import yaml
+
         queue_url = select_queue(self.sqs)
-        attrs = self.sqs.get_queue_attributes(queue_url)
+        attrs = self.sqs.get_attributes(queue_url)
         print(Fore.GREEN + "Queue settings:")
         print(Fore.YELLOW + yaml.safe_dump(attrs, allow_unicode=True, default_flow_style=False))
 
     def _clear_queue(self):
         queue_url = select_queue(self.sqs)
         if questionary.confirm(f"Are you sure you want to clear the queue?\n{queue_url}").ask():
-            self.sqs.purge_queue(queue_url)
+            self.sqs.purge(queue_url)
             print(Fore.RED + "Queue cleared successfully!")
 
     def _scan_messages(self):
         queue_url = select_queue(self.sqs)
-        messages = self.sqs.scan_messages(queue_url)
-        if messages:
-            print(Fore.GREEN + f"Found {len(messages)} messages:")
-            for message in messages:
-                print(Fore.YELLOW + message.get("Body", ""))
+        limit = questionary.text("Maximum messages to scan (blank for all):").ask()
+        body_contains = questionary.text("Only messages whose body contains (optional):").ask()
+        jmespath_filter = questionary.text("JMESPath filter on JSON bodies (optional):").ask()
+        output_path = questionary.text("Write JSONL to file (blank for screen):").ask()
+
+        options = dict(
+            max_messages=int(limit) if limit else None,
+            body_contains=body_contains or None,
+            jmespath_filter=jmespath_filter or None,
+        )
+        if output_path:
+            with open(output_path, "w") as output:
+                summary = self.sqs.scan_messages(queue_url, output, **options)
+        else:
+            summary = self.sqs.scan_messages(queue_url, **options)
+
+        if summary.scanned:
+            print(Fore.GREEN + f"Scanned {summary.scanned} messages, {summary.matched} matched.")
         else:
             print(Fore.YELLOW + "No messages found.")
 
     def _send_message_to_queue(self):
         queue_url = select_queue(self.sqs)
         body = questionary.text("Enter message:").ask()
-        self.sqs.send_message(body, queue_url)
+        group_id = None
+        if self.sqs.is_fifo(queue_url):
+            group_id = questionary.text("Message group id:").ask()
+        self.sqs.send_message(queue_url, body, group_id or None)
         print(Fore.GREEN + "Message sent!")
 
     def _send_batch_messages(self):
         queue_url = select_queue(self.sqs)
         file_path = questionary.text("Enter file path:").ask()
-        self.sqs.send_batch_messages(file_path, queue_url)
-        print(Fore.GREEN + "Batch messages sent!")
+        group_id = None
+        if self.sqs.is_fifo(queue_url):
+            group_id = questionary.text(
+                "Default message group id (JSON lines may set group_id/dedup_id):"
+            ).ask()
+        summary = self.sqs.send_messages_from_file(
+            queue_url, file_path, progress=make_progress("Sending", "msgs"),
+            group_id=group_id or None,
+        )
+        print(Fore.GREEN + f"Batch messages sent! {summary.sent} sent, {summary.failed} failed "
+                           f"({summary.messages_per_second:.1f} msgs/s)")
 
 
 class S3ActionExecutor(MenuHandler):
     def __init__(self, session):
         super().__init__(session, MenuOptions.S3, "What would you like to do with S3?")
-        self.s3 = S3Utils(session)
+        self.s3 = aws_utils.S3Utils(session)
 
     def _init_actions(self):
         return {
             "list_buckets": self._list_buckets,
+            "list_objects": self._list_objects,
+            "summarize_objects": self._summarize_objects,
             "open_bucket": self._open_bucket,
             "delete_object": self._delete_object,
+            "download_file": self._download_file,
+            "download_prefix": self._download_prefix,
             "upload_file": self._upload_file,
-            "upload_directory": self._upload_directory
+            "upload_directory": self._upload_directory,
+            "abort_uploads": self._abort_uploads,
+            "sync_directory": self._sync_directory
         }
 
     def _list_buckets(self):
@@ -148,47 +230,532 @@ class S3ActionExecutor(MenuHandler):
         for bucket in buckets:
             print(Fore.YELLOW + bucket)
 
+    def _list_objects(self):
+        bucket = questionary.text("Bucket:").ask()
+        prefix = questionary.text("Prefix (optional):").ask()
+        recursive = questionary.confirm("Include nested prefixes?", default=False).ask()
+        if not recursive:
+            for common_prefix in self.s3.list_common_prefixes(bucket, prefix or ""):
+                print(Fore.CYAN + f"{'PRE':>12}  {common_prefix}")
+        delimiter = None if recursive else "/"
+        for obj in self.s3.list_objects(bucket, prefix or "", delimiter):
+            print(Fore.YELLOW + f"{obj['Size']:>12}  {obj['Key']}")
+
+    def _summarize_objects(self):
+        bucket = questionary.text("Bucket:").ask()
+        prefix = questionary.text("Prefix (optional):").ask()
+        depth = questionary.text("Group by prefix depth:", default="1").ask()
+        summary = self.s3.summarize_objects(
+            bucket, prefix or "", int(depth or 1), max_workers=self.s3.DEFAULT_MAX_WORKERS
+        )
+        print(Fore.GREEN + f"{'PREFIX':<50} {'OBJECTS':>10} {'BYTES':>15}  SIZES")
+        for group, stats in sorted(summary.items(), key=lambda i: i[1].total_bytes, reverse=True):
+            histogram = ", ".join(f"{label}: {count}" for label, count in stats.histogram.items())
+            print(Fore.YELLOW + f"{group or '/':<50} {stats.count:>10} {stats.total_bytes:>15}  {histogram}")
+
     def _open_bucket(self):
         bucket = questionary.text("Enter bucket name (or leave blank for default):").ask()
         self.s3.open_bucket_in_console(bucket or None)
 
     def _delete_object(self):
         bucket = questionary.text("Bucket:").ask()
-        key = questionary.text("Key (path/file) to delete:").ask()
-        self.s3.delete_object(bucket, key)
-        print(Fore.RED + "File deleted!")
+        mode = questionary.select(
+            "What would you like to delete?",
+            choices=["Single key", "All keys under a prefix", "Keys listed in a file"]
+        ).ask()
+
+        if mode == "Single key":
+            key = questionary.text("Key (path/file) to delete:").ask()
+            self.s3.delete_object(bucket, key)
+            print(Fore.RED + "File deleted!")
+            return
+
+        if mode == "All keys under a prefix":
+            prefix = questionary.text("Prefix to delete:").ask()
+
+            def delete(dry_run, progress=None):
+                return self.s3.delete_prefix(bucket, prefix, dry_run=dry_run, progress=progress)
+        else:
+            file_path = questionary.text("File with one key per line:").ask()
+
+            def delete(dry_run, progress=None):
+                return self.s3.delete_keys_from_file(
+                    bucket, file_path, dry_run=dry_run, progress=progress
+                )
+
+        count = delete(True).deleted
+        if not count:
+            print(Fore.YELLOW + "No objects to delete.")
+            return
+        if questionary.confirm(f"Delete {count} objects from '{bucket}'?", default=False).ask():
+            summary = delete(False, make_progress("Deleting", "objects", total=count))
+            print(Fore.RED + f"{summary.deleted} files deleted!")
+            for error in summary.errors:
+                print(Fore.YELLOW + f"{error['Key']}: {error.get('Code')} {error.get('Message')}")
+
+    def _download_file(self):
+        bucket = questionary.text("Bucket:").ask()
+        key = questionary.text("Key (path/file) to download:").ask()
+        dest_path = questionary.text("Local file path (or leave blank to use key name):").ask()
+        if self.s3.download_file(bucket, key, dest_path or None):
+            print(Fore.GREEN + "File downloaded!")
+        else:
+            print(Fore.YELLOW + "Local file already up to date.")
+
+    def _download_prefix(self):
+        bucket = questionary.text("Bucket:").ask()
+        prefix = questionary.text("Prefix to download:").ask()
+        dest_dir = questionary.text("Local directory path:").ask()
+        stats = self.s3.download_prefix(
+            bucket, prefix or "", dest_dir, progress=make_progress("Downloading", "files")
+        )
+        print(Fore.GREEN + f"Prefix downloaded! {stats['downloaded']} downloaded, "
+                           f"{stats['skipped']} up to date.")
 
     def _upload_file(self):
         bucket = questionary.text("Bucket:").ask()
         file_path = questionary.text("Local file path:").ask()
         key = questionary.text("Destination key in bucket (or leave blank to use file name):").ask()
-        self.s3.upload_file(file_path, bucket, key or None)
+        if questionary.confirm("Resumable multipart upload?", default=False).ask():
+            self.s3.upload_file_resumable(file_path, bucket, key or None)
+        else:
+            self.s3.upload_file(
+                file_path, bucket, key or None, progress=make_progress("Uploading", "files")
+            )
         print(Fore.GREEN + "File uploaded!")
 
     def _upload_directory(self):
         bucket = questionary.text("Bucket:").ask()
         dir_path = questionary.text("Local directory path:").ask()
         prefix = questionary.text("Destination prefix in bucket (optional):").ask()
-        self.s3.upload_directory(dir_path, bucket, prefix or "")
+        self.s3.upload_directory(
+            dir_path, bucket, prefix or "", progress=make_progress("Uploading", "files")
+        )
         print(Fore.GREEN + "Directory uploaded!")
 
+    def _abort_uploads(self):
+        bucket = questionary.text("Bucket:").ask()
+        prefix = questionary.text("Prefix (optional):").ask()
+        hours = questionary.text("Abort uploads started more than N hours ago:", default="24").ask()
+        aborted = self.s3.abort_incomplete_uploads(bucket, prefix or "", float(hours or 24))
+        print(Fore.RED + f"{aborted} incomplete uploads aborted!")
+
+    def _sync_directory(self):
+        bucket = questionary.text("Bucket:").ask()
+        dir_path = questionary.text("Local directory path:").ask()
+        prefix = questionary.text("Destination prefix in bucket (optional):").ask()
+        manifest = questionary.text("Manifest cache file (optional):").ask()
+        delete = questionary.confirm("Delete remote files missing locally?", default=False).ask()
+        stats = self.s3.sync_directory(
+            dir_path, bucket, prefix or "", delete, manifest or None,
+            progress=make_progress("Uploading", "files"),
+        )
+        print(Fore.GREEN + f"Directory synced! {stats['uploaded']} uploaded, "
+                           f"{stats['skipped']} unchanged, {stats['deleted']} deleted.")
+
+
+class QueueCompleter(Completer):
+    MAX_COMPLETIONS = 50
+
+    def __init__(self, sqs):
+        self.sqs = sqs
+
+    def get_completions(self, document, complete_event):
+        text = document.text_before_cursor.strip()
+        if "://" in text:
+            return
+
+        queues = self.sqs.list_queues(prefix=text)
+        if not queues and text:
+            queues = [q for q in self.sqs.list_queues() if fuzzy_match(text, q[1])]
+        for queue_url, queue_name in queues[:self.MAX_COMPLETIONS]:
+            yield Completion(
+                queue_name,
+                start_position=-len(document.text_before_cursor),
+                display_meta=queue_url
+            )
+
+
+def fuzzy_match(pattern, name):
+    remaining = iter(name.lower())
+    return all(char in remaining for char in pattern.lower())
+
 
 def select_queue(sqs):
-    queue_list = sqs.list_queues()
-    choices = queue_list + ["Enter manually"]
-    selected = questionary.select(
-        "Select a queue or enter manually:",
-        choices=choices
+    answer = questionary.autocomplete(
+        "Queue name (type to search, or paste a queue URL):",
+        choices=[],
+        completer=ThreadedCompleter(QueueCompleter(sqs))
     ).ask()
 
-    if selected == "Enter manually":
-        return questionary.text("Enter queue URL:").ask()
-    return selected
+    return resolve_queue(sqs, answer)
 
 
-def main():
+def resolve_queue(sqs, queue):
+    if not queue or "://" in queue:
+        return queue
+    for queue_url, queue_name in sqs.list_queues(prefix=queue):
+        if queue_name == queue:
+            return queue_url
+    return sqs.get_queue_url(queue)
+
+
+def make_progress(label, unit, total=None):
+    return Progress(label, total=total, callback=console_progress(unit))
+
+
+def render_metrics_header():
+    return f"{'QUEUE':<60} {'VISIBLE':>10} {'IN FLIGHT':>10} {'DELAYED':>10}"
+
+
+def render_metrics_row(metrics):
+    if metrics.error:
+        return f"{metrics.name:<60} {metrics.error}"
+    return (f"{metrics.name:<60} {metrics.visible:>10} "
+            f"{metrics.in_flight:>10} {metrics.delayed:>10}")
+
+
+def render_stats_header():
+    return (f"{'OPERATION':<32} {'CALLS':>8} {'ERRORS':>7} {'RETRIES':>7} "
+            f"{'SENT':>12} {'RECEIVED':>12} {'P50 MS':>9} {'P90 MS':>9} {'P99 MS':>9}")
+
+
+def render_stats_row(operation, stats):
+    latency = stats["latency_ms"]
+    return (f"{operation:<32} {stats['calls']:>8} {stats['errors']:>7} {stats['retries']:>7} "
+            f"{stats['bytes_sent']:>12} {stats['bytes_received']:>12} "
+            f"{latency['p50']:>9.1f} {latency['p90']:>9.1f} {latency['p99']:>9.1f}")
+
+
+def show_stats():
+    snapshot = instrumentation.snapshot()
+    if not snapshot:
+        print(Fore.YELLOW + "No AWS calls recorded yet.")
+        return
+    print(Fore.GREEN + render_stats_header())
+    for operation, stats in snapshot.items():
+        print(Fore.YELLOW + render_stats_row(operation, stats))
+    path = questionary.text("Save as JSON (leave blank to skip):").ask()
+    if path and path.strip():
+        instrumentation.dump(path.strip())
+        print(Fore.GREEN + f"Stats written to {path.strip()}")
+
+
+FANOUT_COLUMNS = {
+    "queues": ["profile", "region", "name"],
+    "metrics": ["profile", "region", "name", "visible", "in_flight", "delayed"],
+    "buckets": ["profile", "region", "name"],
+}
+
+
+def run_fanout(fanout, kind, prefix=""):
+    if kind == "queues":
+        return fanout.list_queues(prefix)
+    if kind == "metrics":
+        return fanout.get_queue_metrics(prefix)
+    return fanout.list_buckets()
+
+
+def render_fanout(result, kind):
+    columns = FANOUT_COLUMNS[kind]
+    widths = {c: max([len(c)] + [len(str(row.get(c, ""))) for row in result.rows]) for c in columns}
+    lines = ["  ".join(c.upper().ljust(widths[c]) for c in columns).rstrip()]
+    for row in result.rows:
+        lines.append("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns).rstrip())
+    return lines
+
+
+def show_fanout(config_manager):
+    action = questionary.select("Across all configured regions/profiles:",
+                                choices=list(MenuOptions.FANOUT.values())).ask()
+    kind = next(k for k, v in MenuOptions.FANOUT.items() if v == action)
+    prefix = ""
+    if kind != "buckets":
+        prefix = questionary.text("Queue name prefix (optional):").ask() or ""
+
+    with aws_utils.FanOut.from_config(config_manager.load_config()) as fanout:
+        result = run_fanout(fanout, kind, prefix)
+    header, *rows = render_fanout(result, kind)
+    print(Fore.GREEN + header)
+    for row in rows:
+        print(Fore.YELLOW + row)
+    for error in result.errors:
+        print(Fore.RED + f"{error.target.label}: {error.error}")
+
+
+class CommandRunner:
+    def __init__(self, session, workers=1, config=None):
+        self.session = session
+        self.workers = workers
+        self.config = config or Config()
+        self._sqs = None
+        self._s3 = None
+        self._fanouts = {}
+        self._lock = threading.Lock()
+
+    @property
+    def sqs(self):
+        with self._lock:
+            if self._sqs is None:
+                self._sqs = aws_utils.SQSUtils(self.session)
+                self._sqs._scale_pool(self.workers)
+            return self._sqs
+
+    @property
+    def s3(self):
+        with self._lock:
+            if self._s3 is None:
+                self._s3 = aws_utils.S3Utils(self.session)
+                self._s3._scale_pool(max(self.workers, self._s3.transfer_config.max_concurrency))
+            return self._s3
+
+    def run(self, args):
+        return getattr(self, args.command)(args)
+
+    def fanout(self, args):
+        config = Config(
+            profile=self.config.profile, region=self.config.region,
+            profiles=args.profiles.split(",") if args.profiles else self.config.profiles,
+            regions=args.regions.split(",") if args.regions else self.config.regions,
+        )
+        key = (tuple(config.targets()), args.timeout)
+        with self._lock:
+            if key not in self._fanouts:
+                self._fanouts[key] = aws_utils.FanOut(config.targets(), timeout=args.timeout)
+            return self._fanouts[key]
+
+    def fanout_queues(self, args):
+        return run_fanout(self.fanout(args), "queues", args.prefix)
+
+    def fanout_metrics(self, args):
+        return run_fanout(self.fanout(args), "metrics", args.prefix)
+
+    def fanout_buckets(self, args):
+        return run_fanout(self.fanout(args), "buckets")
+
+    def queue_url(self, args):
+        return resolve_queue(self.sqs, args.queue)
+
+    def sqs_list_queues(self, args):
+        return [{"name": name, "url": url} for url, name in self.sqs.list_queues(args.prefix)]
+
+    def sqs_count(self, args):
+        return {"queue": args.queue, "count": self.sqs.get_message_count(self.queue_url(args))}
+
+    def sqs_attributes(self, args):
+        return self.sqs.get_attributes(self.queue_url(args))
+
+    def sqs_purge(self, args):
+        self.sqs.purge(self.queue_url(args))
+        return {"queue": args.queue, "purged": True}
+
+    def sqs_send(self, args):
+        self.sqs.send_message(self.queue_url(args), args.body, args.group_id, args.dedup_id)
+        return {"queue": args.queue, "sent": 1}
+
+    def sqs_send_file(self, args):
+        return self.sqs.send_messages_from_file(
+            self.queue_url(args), args.file, group_id=args.group_id
+        )
+
+    def sqs_scan(self, args):
+        options = dict(max_messages=args.limit, body_contains=args.contains,
+                       jmespath_filter=args.filter)
+        if not args.output:
+            return self.sqs.scan_messages(self.queue_url(args), **options)
+        with open(args.output, "w") as output:
+            return self.sqs.scan_messages(self.queue_url(args), output, **options)
+
+    def s3_list_buckets(self, args):
+        return self.s3.list_buckets()
+
+    def s3_list_objects(self, args):
+        delimiter = None if args.recursive else "/"
+        return [{"key": obj["Key"], "size": obj["Size"]}
+                for obj in self.s3.list_objects(args.bucket, args.prefix, delimiter)]
+
+    def s3_delete(self, args):
+        self.s3.delete_object(args.bucket, args.key)
+        return {"bucket": args.bucket, "key": args.key, "deleted": True}
+
+    def s3_delete_prefix(self, args):
+        return self.s3.delete_prefix(args.bucket, args.prefix, dry_run=args.dry_run)
+
+    def s3_download(self, args):
+        downloaded = self.s3.download_file(args.bucket, args.key, args.dest)
+        return {"bucket": args.bucket, "key": args.key, "downloaded": downloaded}
+
+    def s3_download_prefix(self, args):
+        return self.s3.download_prefix(args.bucket, args.prefix, args.dest)
+
+    def s3_upload(self, args):
+        self.s3.upload_file(args.file, args.bucket, args.key)
+        return {"bucket": args.bucket, "file": args.file, "uploaded": True}
+
+    def s3_upload_dir(self, args):
+        return {"uploaded": self.s3.upload_directory(args.dir, args.bucket, args.prefix)}
+
+    def s3_sync(self, args):
+        return self.s3.sync_directory(args.dir, args.bucket, args.prefix, args.delete, args.manifest)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="AWS Utils CLI. Run without arguments for interactive menus."
+    )
+    services = parser.add_subparsers(dest="service")
+
+    def command(group, name, handler, *arguments):
+        sub = group.add_parser(name)
+        for names, options in arguments:
+            sub.add_argument(*names, **options)
+        sub.set_defaults(command=handler)
+        return sub
+
+    queue = (["queue"], {"help": "Queue name or URL"})
+    sqs = services.add_parser("sqs").add_subparsers(dest="action", required=True)
+    command(sqs, "list-queues", "sqs_list_queues", (["--prefix"], {"default": ""}))
+    command(sqs, "count", "sqs_count", queue)
+    command(sqs, "attributes", "sqs_attributes", queue)
+    command(sqs, "purge", "sqs_purge", queue)
+    group = (["--group-id"], {"help": "MessageGroupId for FIFO queues"})
+    command(sqs, "send", "sqs_send", queue, (["body"], {}), group,
+            (["--dedup-id"], {"help": "MessageDeduplicationId (default: body hash)"}))
+    command(sqs, "send-file", "sqs_send_file", queue, (["file"], {}), group)
+    command(sqs, "scan", "sqs_scan", queue,
+            (["--limit"], {"type": int}), (["--contains"], {}), (["--filter"], {}),
+            (["--output"], {"help": "Write matching messages as JSONL to this file"}))
+
+    bucket = (["bucket"], {})
+    s3 = services.add_parser("s3").add_subparsers(dest="action", required=True)
+    command(s3, "list-buckets", "s3_list_buckets")
+    command(s3, "list-objects", "s3_list_objects", bucket, (["--prefix"], {"default": ""}),
+            (["--recursive"], {"action": "store_true"}))
+    command(s3, "delete", "s3_delete", bucket, (["key"], {}))
+    command(s3, "delete-prefix", "s3_delete_prefix", bucket, (["prefix"], {}),
+            (["--dry-run"], {"action": "store_true"}))
+    command(s3, "download", "s3_download", bucket, (["key"], {}), (["dest"], {"nargs": "?"}))
+    command(s3, "download-prefix", "s3_download_prefix", bucket, (["prefix"], {}), (["dest"], {}))
+    command(s3, "upload", "s3_upload", (["file"], {}), bucket, (["key"], {"nargs": "?"}))
+    command(s3, "upload-dir", "s3_upload_dir", (["dir"], {}), bucket,
+            (["prefix"], {"nargs": "?", "default": ""}))
+    command(s3, "sync", "s3_sync", (["dir"], {}), bucket, (["prefix"], {"nargs": "?", "default": ""}),
+            (["--delete"], {"action": "store_true"}), (["--manifest"], {}))
+
+    targets = ((["--regions"], {"help": "Comma-separated regions (default: from config)"}),
+               (["--profiles"], {"help": "Comma-separated profiles (default: from config)"}),
+               (["--timeout"], {"type": float, "default": 30.0, "help": "Seconds per target"}))
+    fanout = services.add_parser(
+        "fanout", help="Run across every configured region and profile"
+    ).add_subparsers(dest="action", required=True)
+    command(fanout, "queues", "fanout_queues", (["--prefix"], {"default": ""}), *targets)
+    command(fanout, "metrics", "fanout_metrics", (["--prefix"], {"default": ""}), *targets)
+    command(fanout, "buckets", "fanout_buckets", *targets)
+
+    batch = services.add_parser(
+        "batch", help="Run one command per line from a file or stdin through a single session"
+    )
+    batch.add_argument("file", nargs="?", default="-", help="Commands file, '-' for stdin")
+    batch.add_argument("--parallel", type=int, default=1, help="Commands to run concurrently")
+    batch.add_argument("--fail-fast", action="store_true", help="Stop at the first failed command")
+    batch.set_defaults(command="batch")
+    return parser
+
+
+def to_json(result):
+    return json.dumps(result, default=lambda o: asdict(o) if is_dataclass(o) else str(o))
+
+
+def parse_batch(parser, lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            args = parser.parse_args(shlex.split(line))
+        except (SystemExit, ValueError):
+            args = None
+        if args is not None and args.command == "batch":
+            args = None
+        yield number, line, args
+
+
+def run_batch(runner, parser, lines, parallel=1, fail_fast=False, output=None):
+    output = output or sys.stdout
+    failed = 0
+
+    def execute(entry):
+        number, line, args = entry
+        if args is None:
+            return {"line": number, "command": line, "ok": False, "error": "invalid command"}
+        try:
+            result = runner.run(args)
+            return {"line": number, "command": line, "ok": True, "result": result}
+        except Exception as e:
+            return {"line": number, "command": line, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def report(future):
+        record = future.result()
+        output.write(to_json(record) + "\n")
+        return not record["ok"]
+
+    entries = parse_batch(parser, lines)
+    window = max(1, parallel) * (1 if fail_fast else 2)
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as executor:
+        pending = deque()
+        for entry in entries:
+            pending.append(executor.submit(execute, entry))
+            if len(pending) >= window:
+                failed += report(pending.popleft())
+                if fail_fast and failed:
+                    break
+        while pending:
+            future = pending.popleft()
+            if fail_fast and failed and future.cancel():
+                continue
+            failed += report(future)
+    return failed
+
+
+def run_command(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.service is None:
+        parser.print_help()
+        return 2
+
+    config_manager = ConfigurationManager()
+    session = config_manager.create_session()
+    config = config_manager.load_config()
+    if args.command == "batch":
+        runner = CommandRunner(session, workers=args.parallel, config=config)
+        if args.file == "-":
+            failed = run_batch(runner, parser, sys.stdin, args.parallel, args.fail_fast)
+        else:
+            with open(args.file) as lines:
+                failed = run_batch(runner, parser, lines, args.parallel, args.fail_fast)
+        return 1 if failed else 0
+
+    print(to_json(CommandRunner(session, config=config).run(args)))
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
     init(autoreset=True)
+    configure_logging(
+        os.environ.get(LOG_LEVEL_ENV, "INFO").upper(),
+        json_format=os.environ.get(LOG_FORMAT_ENV, "").lower() == "json",
+        stream=sys.stderr if argv else None,
+    )
+    stats_file = os.environ.get(STATS_FILE_ENV)
+    if stats_file:
+        atexit.register(instrumentation.dump, stats_file)
+    if argv:
+        return run_command(argv)
+
     config_manager = ConfigurationManager()
+    executors = {}
     print(Fore.CYAN + Style.BRIGHT + "Welcome to AWS Utils CLI!\n")
 
     while True:
@@ -197,25 +764,36 @@ def main():
             choices=MenuOptions.MAIN
         ).ask()
 
-        if choice == "SQS":
-            session = config_manager.create_session()
-            SQSActionExecutor(session).execute_menu()
-        elif choice == "S3":
+        if choice in ("SQS", "S3"):
             session = config_manager.create_session()
-            S3ActionExecutor(session).execute_menu()
+            executor = executors.get(choice)
+            if executor is None or executor.session is not session:
+                executor_class = SQSActionExecutor if choice == "SQS" else S3ActionExecutor
+                executor = executors[choice] = executor_class(session)
+            executor.execute_menu()
+        elif choice == "All regions":
+            show_fanout(config_manager)
+        elif choice == "Stats":
+            show_stats()
         elif choice == "Configure":
-            region = questionary.text("Enter default region:").ask()
-            profile = questionary.text("Enter default profile:").ask()
-            config = Config(
-                profile=profile.strip(),
-                region=region.strip()
+            region = questionary.text("Enter default region (comma-separate several):").ask()
+            profile = questionary.text("Enter default profile (comma-separate several):").ask()
+            entered = Config.from_dict({
+                "profile": profile.strip(),
+                "region": region.strip()
+            })
+            config = replace(
+                config_manager.load_config(),
+                region=entered.region, regions=entered.regions,
+                profile=entered.profile, profiles=entered.profiles,
             )
             config_manager.save_config(config)
             print(Fore.GREEN + "Configuration saved successfully!")
         elif choice == "Exit":
             print(Fore.RED + "Exiting AWS Utils CLI.")
             break
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,5 +1,48 @@
-from .configuration import Config, ConfigurationManager
-from .s3_utils import S3Utils
-from .sqs_utils import SQSUtils
+import importlib
+from typing import TYPE_CHECKING, Any, List
 
-__all__ = ["SQSUtils", "ConfigurationManager", "Config", "S3Utils"]
+if TYPE_CHECKING:
+    from .async_utils import AsyncS3Utils, AsyncSQSUtils
+    from .configuration import Config, ConfigurationManager
+    from .extended_sqs import ExtendedSQSUtils
+    from .fanout import FanOut
+    from .log import configure_logging
+    from .s3_utils import S3Utils
+    from .sqs_utils import SQSUtils
+
+__all__ = [
+    "SQSUtils",
+    "ConfigurationManager",
+    "Config",
+    "S3Utils",
+    "AsyncSQSUtils",
+    "AsyncS3Utils",
+    "ExtendedSQSUtils",
+    "FanOut",
+    "configure_logging",
+]
+
+_LAZY_ATTRIBUTES = {
+    "AsyncS3Utils": ".async_utils",
+    "AsyncSQSUtils": ".async_utils",
+    "Config": ".configuration",
+    "ConfigurationManager": ".configuration",
+    "ExtendedSQSUtils": ".extended_sqs",
+    "FanOut": ".fanout",
+    "S3Utils": ".s3_utils",
+    "SQSUtils": ".sqs_utils",
+    "configure_logging": ".log",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,339 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set,
+                    Tuple, TypeVar)
+
+from boto3 import Session
+
+from .log import get_logger
+from .s3_utils import DeleteSummary, S3Utils
+from .sqs_consumer import ConsumeSummary
+from .sqs_utils import QueueMetrics, SendSummary, SQSUtils
+
+T = TypeVar("T")
+
+logger = get_logger("SQSUtils")
+s3_logger = get_logger("S3Utils")
+
+
+class _AsyncRunner:
+    DEFAULT_MAX_WORKERS = 32
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def _gather_bounded(
+        self, limit: int, calls: Iterable[Tuple[Callable[..., T], tuple]]
+    ) -> List[T]:
+        limit = max(1, limit)
+        calls = iter(calls)
+        results: Dict[int, T] = {}
+        pending: Dict["asyncio.Future[T]", int] = {}
+        submitted = 0
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < limit:
+                call = await self._run(next, calls, None)
+                if call is None:
+                    exhausted = True
+                    break
+                func, args = call
+                pending[asyncio.ensure_future(self._run(func, *args))] = submitted
+                submitted += 1
+            if pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    results[pending.pop(future)] = future.result()
+        return [results[i] for i in range(submitted)]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+class AsyncSQSUtils(_AsyncRunner):
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        max_workers: int = _AsyncRunner.DEFAULT_MAX_WORKERS,
+        utils: Optional[SQSUtils] = None,
+    ) -> None:
+        super().__init__(max_workers)
+        self.utils = utils or SQSUtils(session)
+        self.utils._scale_pool(max_workers)
+        self.client = self.utils.client
+
+    async def get_queues(self, prefix: str = "", refresh: bool = False) -> List[str]:
+        return await self._run(self.utils.get_queues, prefix, refresh)
+
+    async def list_queues(self, prefix: str = "", refresh: bool = False) -> List[Tuple[str, str]]:
+        return await self._run(self.utils.list_queues, prefix, refresh)
+
+    async def get_queue_url(self, queue_name: str) -> str:
+        return await self._run(self.utils.get_queue_url, queue_name)
+
+    async def get_message_count(self, queue_url: Optional[str] = None) -> int:
+        return await self._run(self.utils.get_message_count, queue_url)
+
+    async def get_queue_metrics(
+        self,
+        queue_urls: Optional[List[str]] = None,
+        max_concurrency: int = SQSUtils.DEFAULT_METRICS_CONCURRENCY,
+    ) -> List[QueueMetrics]:
+        if queue_urls is None:
+            queue_urls = await self.get_queues()
+        metrics = await self._gather_bounded(
+            max_concurrency,
+            ((self.utils._fetch_queue_metrics, (url,)) for url in queue_urls),
+        )
+        return sorted(metrics, key=lambda m: (m.backlog, m.visible), reverse=True)
+
+    async def send_message(self, queue_url: str, body: str) -> None:
+        await self._run(self.utils.send_message, queue_url, body)
+
+    async def send_messages(
+        self,
+        queue_url: str,
+        bodies: Iterable[str],
+        max_in_flight: int = SQSUtils.DEFAULT_MAX_IN_FLIGHT,
+    ) -> SendSummary:
+        summary = SendSummary()
+        start = time.perf_counter()
+        batches = self.utils._pack_batches({"MessageBody": body} for body in bodies)
+        results = await self._gather_bounded(
+            max_in_flight,
+            ((self.utils._send_batch, (queue_url, batch)) for batch in batches),
+        )
+        for sent, failed in results:
+            summary.sent += sent
+            summary.failed += failed
+        summary.seconds = time.perf_counter() - start
+        logger.info(
+            "Sent %d messages, %d failed (%.1f msgs/s)",
+            summary.sent, summary.failed, summary.messages_per_second,
+        )
+        return summary
+
+    async def receive_messages(self, queue_url: str) -> List[Dict]:
+        return await self._run(self.utils.receive_messages, queue_url)
+
+    async def consume(
+        self,
+        queue_url: str,
+        handler: Callable[[Dict], Awaitable[None]],
+        workers: int = SQSUtils.DEFAULT_CONSUMER_WORKERS,
+        max_messages: Optional[int] = None,
+        wait_time_seconds: int = SQSUtils.LONG_POLL_SECONDS,
+        visibility_timeout: int = SQSUtils.DEFAULT_VISIBILITY_TIMEOUT,
+        idle_polls: int = 1,
+    ) -> ConsumeSummary:
+        summary = ConsumeSummary()
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(workers)
+        tasks: Set[asyncio.Task] = set()
+        held: Set[str] = set()
+        pending_deletes: List[str] = []
+        deletes: List[asyncio.Future] = []
+
+        def flush(force: bool = False) -> None:
+            while pending_deletes and (force or len(pending_deletes) >= SQSUtils.MAX_BATCH_SIZE):
+                batch = pending_deletes[: SQSUtils.MAX_BATCH_SIZE]
+                del pending_deletes[: SQSUtils.MAX_BATCH_SIZE]
+                deletes.append(asyncio.ensure_future(self._delete_batch(queue_url, batch)))
+
+        async def handle(message: Dict) -> None:
+            try:
+                await handler(message)
+            except Exception as e:
+                logger.warning("Handler failed for message %s: %s", message.get("MessageId"), e)
+                summary.failed += 1
+            else:
+                summary.processed += 1
+                pending_deletes.append(message["ReceiptHandle"])
+                flush()
+            finally:
+                held.discard(message["ReceiptHandle"])
+                semaphore.release()
+
+        heartbeat = None
+        if visibility_timeout > 0:
+            heartbeat = asyncio.ensure_future(
+                self._heartbeat(queue_url, held, visibility_timeout)
+            )
+        try:
+            idle = 0
+            while idle < idle_polls:
+                count = SQSUtils.MAX_BATCH_SIZE
+                if max_messages is not None:
+                    count = min(count, max_messages - summary.received)
+                    if count <= 0:
+                        break
+                response = await self._run(
+                    self.client.receive_message,
+                    QueueUrl=queue_url,
+                    MaxNumberOfMessages=count,
+                    WaitTimeSeconds=wait_time_seconds,
+                    VisibilityTimeout=visibility_timeout,
+                    AttributeNames=["All"],
+                    MessageAttributeNames=["All"],
+                )
+                received = response.get("Messages", [])
+                messages = await self._run(self.utils._resolve_messages, received) if received else []
+                summary.received += len(received)
+                summary.failed += len(received) - len(messages)
+                idle = 0 if received else idle + 1
+                held.update(m["ReceiptHandle"] for m in messages)
+                for message in messages:
+                    await semaphore.acquire()
+                    task = asyncio.ensure_future(handle(message))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+        flush(force=True)
+        for deleted in await asyncio.gather(*deletes):
+            summary.deleted += deleted
+
+        summary.seconds = time.perf_counter() - start
+        logger.info(
+            "Processed %d messages, %d failed (%.1f msgs/s)",
+            summary.processed, summary.failed, summary.messages_per_second,
+        )
+        return summary
+
+    async def _heartbeat(self, queue_url: str, held: Set[str],
+                         visibility_timeout: int) -> None:
+        while True:
+            await asyncio.sleep(visibility_timeout / 2)
+            receipts = list(held)
+            for i in range(0, len(receipts), SQSUtils.MAX_BATCH_SIZE):
+                entries = [
+                    {"Id": str(j), "ReceiptHandle": r, "VisibilityTimeout": visibility_timeout}
+                    for j, r in enumerate(receipts[i : i + SQSUtils.MAX_BATCH_SIZE])
+                ]
+                try:
+                    await self._run(self.client.change_message_visibility_batch,
+                                    QueueUrl=queue_url, Entries=entries)
+                except Exception as e:
+                    logger.warning("Failed to extend visibility timeout: %s", e)
+
+    async def _delete_batch(self, queue_url: str, receipts: List[str]) -> int:
+        response = await self._run(
+            self.client.delete_message_batch,
+            QueueUrl=queue_url,
+            Entries=[{"Id": str(i), "ReceiptHandle": r} for i, r in enumerate(receipts)],
+        )
+        for failure in response.get("Failed", []):
+            logger.warning("Failed to delete message: %s", failure)
+        deleted = [receipts[int(entry["Id"])] for entry in response.get("Successful", [])]
+        if deleted:
+            await self._run(self.utils._on_deleted, deleted)
+        return len(deleted)
+
+
+class AsyncS3Utils(_AsyncRunner):
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        max_workers: int = _AsyncRunner.DEFAULT_MAX_WORKERS,
+        utils: Optional[S3Utils] = None,
+    ) -> None:
+        super().__init__(max_workers)
+        self.utils = utils or S3Utils(session)
+        self.utils._scale_pool(max_workers)
+        self.client = self.utils.client
+
+    async def list_buckets(self) -> List[str]:
+        return await self._run(self.utils.list_buckets)
+
+    async def list_objects(
+        self, bucket: str, prefix: str = "", delimiter: Optional[str] = None
+    ) -> List[Dict]:
+        return await self._run(lambda: list(self.utils.list_objects(bucket, prefix, delimiter)))
+
+    async def delete_object(self, bucket: str, key: str) -> None:
+        await self._run(self.utils.delete_object, bucket, key)
+
+    async def delete_many(
+        self,
+        bucket: str,
+        keys: Iterable[str],
+        max_in_flight: int = S3Utils.DEFAULT_DELETE_IN_FLIGHT,
+        dry_run: bool = False,
+    ) -> DeleteSummary:
+        summary = DeleteSummary(dry_run=dry_run)
+        if dry_run:
+            summary.deleted = await self._run(lambda: sum(1 for _ in keys))
+            return summary
+
+        results = await self._gather_bounded(
+            max_in_flight,
+            ((self.utils._delete_batch, (bucket, batch))
+             for batch in self.utils._batch_keys(keys)),
+        )
+        for deleted, errors in results:
+            summary.deleted += deleted
+            summary.errors.extend(errors)
+        s3_logger.info("Deleted %s objects, %s errors.", summary.deleted, len(summary.errors))
+        return summary
+
+    async def delete_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+        max_in_flight: int = S3Utils.DEFAULT_DELETE_IN_FLIGHT,
+        dry_run: bool = False,
+    ) -> DeleteSummary:
+        if not bucket or not prefix:
+            raise ValueError("Bucket and prefix are required")
+        keys = (obj["Key"] for obj in self.utils.list_objects(bucket, prefix))
+        return await self.delete_many(bucket, keys, max_in_flight, dry_run)
+
+    async def upload_file(
+        self, file_path: str, bucket: str, key: Optional[str] = None
+    ) -> None:
+        await self._run(self.utils.upload_file, file_path, bucket, key)
+
+    async def upload_files(
+        self,
+        files: Iterable[Tuple[str, str]],
+        bucket: str,
+        max_concurrency: int = S3Utils.DEFAULT_MAX_WORKERS,
+    ) -> int:
+        results = await self._gather_bounded(
+            max_concurrency,
+            ((self.utils.upload_file, (path, bucket, key)) for path, key in files),
+        )
+        return len(results)
+
+    async def download_file(
+        self, bucket: str, key: str, dest_path: Optional[str] = None
+    ) -> bool:
+        return await self._run(self.utils.download_file, bucket, key, dest_path)
+
+    async def download_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+        dest_dir: str,
+        max_workers: int = S3Utils.DEFAULT_MAX_WORKERS,
+    ) -> Dict[str, int]:
+        return await self._run(self.utils.download_prefix, bucket, prefix, dest_dir, max_workers)
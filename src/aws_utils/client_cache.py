@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import boto3
+
+from .configuration import ClientSettings
+from .instrumentation import instrumentation
+from .throttling import rate_controller
+
+
+class ClientCache:
+    def __init__(self, settings: Optional[ClientSettings] = None) -> None:
+        self._lock = threading.Lock()
+        self.settings = settings or ClientSettings()
+        self._sessions: Dict[Tuple[Optional[str], Optional[str]], boto3.Session] = {}
+        self._clients: Dict[Tuple[Any, Any, str], Tuple[boto3.Session, Any, int]] = {}
+
+    def configure(self, settings: ClientSettings) -> None:
+        with self._lock:
+            if settings == self.settings:
+                return
+            self.settings = settings
+            self._clients.clear()
+
+    def get_session(
+        self, profile_name: Optional[str] = None, region_name: Optional[str] = None
+    ) -> boto3.Session:
+        key = (profile_name, region_name)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session_args = {}
+                if region_name:
+                    session_args["region_name"] = region_name
+                if profile_name:
+                    session_args["profile_name"] = profile_name
+                session = boto3.Session(**session_args)
+                self._sessions[key] = session
+            return session
+
+    def get_client(
+        self,
+        service: str,
+        session: Optional[boto3.Session] = None,
+        max_pool_connections: Optional[int] = None,
+    ) -> Any:
+        session = session or self.get_session()
+        key = (session.profile_name, session.region_name, service)
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached is not None and cached[0] is session \
+                    and cached[2] >= (max_pool_connections or 0):
+                return cached[1]
+            config = self.settings.to_client_config(max_pool_connections)
+            client = session.client(service, config=config)
+            instrumentation.register(rate_controller.register(client, session.profile_name))
+            self._clients[key] = (session, client, config.max_pool_connections)
+            return client
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+
+
+client_cache = ClientCache()
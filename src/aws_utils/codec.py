@@ -0,0 +1,49 @@
+import base64
+import gzip
+import zlib
+from typing import Callable, Dict, Tuple
+
+ENCODING_ATTRIBUTE = "ContentEncoding"
+DEFAULT_THRESHOLD = 1024
+
+_ALGORITHMS: Dict[str, Tuple[Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (zlib.compress, zlib.decompress),
+    "gzip": (lambda data, level: gzip.compress(data, level, mtime=0), gzip.decompress),
+}
+
+
+class BodyCodec:
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, algorithm: str = "zlib",
+                 level: int = 6) -> None:
+        if algorithm not in _ALGORITHMS:
+            raise ValueError(f"Unsupported compression algorithm: {algorithm}")
+        self.threshold = threshold
+        self.algorithm = algorithm
+        self.level = level
+        self.encoding = f"{algorithm}+base64"
+
+    def encode(self, entry: Dict) -> Dict:
+        data = entry["MessageBody"].encode("utf-8")
+        if len(data) <= self.threshold:
+            return entry
+        compress, _ = _ALGORITHMS[self.algorithm]
+        encoded = base64.b64encode(compress(data, self.level)).decode("ascii")
+        if len(encoded) >= len(data):
+            return entry
+
+        attributes = dict(entry.get("MessageAttributes") or {})
+        attributes[ENCODING_ATTRIBUTE] = {"DataType": "String", "StringValue": self.encoding}
+        return dict(entry, MessageBody=encoded, MessageAttributes=attributes)
+
+
+def decode_message(message: Dict) -> Dict:
+    attributes = message.get("MessageAttributes") or {}
+    encoding = attributes.get(ENCODING_ATTRIBUTE, {}).get("StringValue", "")
+    algorithm, _, transfer = encoding.partition("+")
+    if transfer != "base64" or algorithm not in _ALGORITHMS:
+        return message
+
+    _, decompress = _ALGORITHMS[algorithm]
+    body = decompress(base64.b64decode(message["Body"])).decode("utf-8")
+    attributes = {k: v for k, v in attributes.items() if k != ENCODING_ATTRIBUTE}
+    return dict(message, Body=body, MessageAttributes=attributes)
@@ -1,9 +1,50 @@
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import boto3
-import yaml
+from .log import get_logger
+
+if TYPE_CHECKING:
+    import boto3
+    import botocore.config
+
+logger = get_logger("Configuration")
+
+
+@dataclass
+class ClientSettings:
+    max_pool_connections: int = 50
+    connect_timeout: float = 10
+    read_timeout: float = 60
+    tcp_keepalive: bool = True
+    retries_mode: str = "standard"
+    max_attempts: int = 5
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ClientSettings":
+        defaults = cls()
+        return cls(
+            max_pool_connections=int(data.get("max_pool_connections", defaults.max_pool_connections)),
+            connect_timeout=float(data.get("connect_timeout", defaults.connect_timeout)),
+            read_timeout=float(data.get("read_timeout", defaults.read_timeout)),
+            tcp_keepalive=bool(data.get("tcp_keepalive", defaults.tcp_keepalive)),
+            retries_mode=data.get("retries_mode", defaults.retries_mode),
+            max_attempts=int(data.get("max_attempts", defaults.max_attempts)),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_client_config(self, max_pool_connections: Optional[int] = None) -> "botocore.config.Config":
+        from botocore.config import Config as ClientConfig
+
+        return ClientConfig(
+            max_pool_connections=max(self.max_pool_connections, max_pool_connections or 0),
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            tcp_keepalive=self.tcp_keepalive,
+            retries={"mode": self.retries_mode, "max_attempts": self.max_attempts},
+        )
 
 
 @dataclass
@@ -12,36 +53,70 @@ class Config:
     profile: str = ""
     sqs: str = ""
     bucket: str = ""
+    client: ClientSettings = field(default_factory=ClientSettings)
+    regions: List[str] = field(default_factory=list)
+    profiles: List[str] = field(default_factory=list)
 
     @classmethod
-    def from_dict(cls, data: Dict[str, str]) -> "Config":
-        return cls(region=data.get("region", ""),
-                   profile=data.get("profile", ""),
+    def from_dict(cls, data: Dict[str, Any]) -> "Config":
+        region, regions = _split_list(data.get("region", ""), data.get("regions"))
+        profile, profiles = _split_list(data.get("profile", ""), data.get("profiles"))
+        return cls(region=region,
+                   profile=profile,
                    sqs=data.get("sqs", ""),
-                   bucket=data.get("bucket", ""))
+                   bucket=data.get("bucket", ""),
+                   client=ClientSettings.from_dict(data.get("client") or {}),
+                   regions=regions,
+                   profiles=profiles)
 
-    def to_dict(self) -> Dict[str, str]:
-        return {
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
             "region": self.region,
             "profile": self.profile,
             "sqs": self.sqs,
             "bucket": self.bucket
         }
+        if self.client != ClientSettings():
+            data["client"] = self.client.to_dict()
+        if self.regions:
+            data["regions"] = list(self.regions)
+        if self.profiles:
+            data["profiles"] = list(self.profiles)
+        return data
 
     def is_valid(self) -> bool:
         return bool(self.region or self.profile)
 
+    def targets(self) -> List[Tuple[str, str]]:
+        profiles = self.profiles or [self.profile]
+        regions = self.regions or [self.region]
+        return [(profile, region) for profile in profiles for region in regions]
+
+
+def _split_list(value: Any, values: Any) -> Tuple[str, List[str]]:
+    if isinstance(value, str) and "," in value:
+        value = [item.strip() for item in value.split(",")]
+    if isinstance(value, (list, tuple)):
+        values = values or value
+        value = value[0] if value else ""
+    values = [item for item in values or [] if item]
+    return value or "", values if values != [value] else []
+
 
 class ConfigurationManager:
     DEFAULT_CONFIG_FILENAME = ".awsutills"
     YAML_OPTIONS = {"allow_unicode": True, "default_flow_style": False}
 
     def __init__(self, config_path: Optional[Path] = None):
-        self.config_path = config_path or Path.home() / self.CONFIG_FILENAME
+        self.config_path = config_path or Path.home() / self.DEFAULT_CONFIG_FILENAME
+        self._session: Optional["boto3.Session"] = None
+        self._session_mtime: Optional[int] = None
 
     def load_config(self) -> Config:
+        import yaml
+
         if not self.config_path.exists():
-            print("Configuration file not found. Using default settings.")
+            logger.info("Configuration file not found. Using default settings.")
             return Config()
 
         with open(self.config_path, "r") as file:
@@ -49,6 +124,8 @@ class ConfigurationManager:
             return Config.from_dict(config_data)
 
     def save_config(self, config: Config) -> None:
+        import yaml
+
         try:
             with open(self.config_path, "w") as file:
                 config_dict = config.to_dict()
@@ -68,7 +145,24 @@ class ConfigurationManager:
             session_args["profile_name"] = config.profile
         return session_args
 
-    def create_session(self) -> boto3.Session:
+    def _config_mtime(self) -> Optional[int]:
+        try:
+            return self.config_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def create_session(self) -> "boto3.Session":
+        from .client_cache import client_cache
+
+        mtime = self._config_mtime()
+        if self._session is not None and mtime == self._session_mtime:
+            return self._session
+        if self._session is not None:
+            client_cache.clear()
+
         config = self.load_config()
+        client_cache.configure(config.client)
         session_args = self._build_session_args(config)
-        return boto3.Session(**session_args)
+        self._session = client_cache.get_session(**session_args)
+        self._session_mtime = mtime
+        return self._session
@@ -0,0 +1,178 @@
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+
+import boto3
+
+from .codec import BodyCodec
+from .log import get_logger
+from .s3_utils import S3Utils
+from .sqs_consumer import QueueConsumer
+from .sqs_utils import SQSUtils
+
+logger = get_logger("SQSUtils")
+
+POINTER_CLASS = "software.amazon.payloadoffloading.PayloadS3Pointer"
+SIZE_ATTRIBUTE = "ExtendedPayloadSize"
+
+
+def make_pointer(bucket: str, key: str) -> str:
+    return json.dumps([POINTER_CLASS, {"s3BucketName": bucket, "s3Key": key}], separators=(",", ":"))
+
+
+def parse_pointer(body: str) -> Optional[Tuple[str, str]]:
+    if not body.startswith(f'["{POINTER_CLASS}"'):
+        return None
+    try:
+        _, pointer = json.loads(body)
+        return pointer["s3BucketName"], pointer["s3Key"]
+    except (ValueError, TypeError, KeyError):
+        return None
+
+
+class ExtendedSQSUtils(SQSUtils):
+    DEFAULT_THRESHOLD = SQSUtils.MAX_BATCH_BYTES
+    DEFAULT_PAYLOAD_WORKERS = 16
+    DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+    KEY_PREFIX = "sqs-payloads/"
+    POINTER_SIZE = 512
+    MAX_TRACKED_RECEIPTS = 100_000
+
+    def __init__(
+        self,
+        session: Optional[boto3.Session] = None,
+        bucket: Optional[str] = None,
+        threshold: int = DEFAULT_THRESHOLD,
+        delete_payloads: bool = False,
+        payload_workers: int = DEFAULT_PAYLOAD_WORKERS,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        s3: Optional[S3Utils] = None,
+        codec: Optional[BodyCodec] = None,
+    ) -> None:
+        super().__init__(session, codec)
+        self.bucket = bucket or self.config_manager.load_config().bucket
+        if not self.bucket:
+            raise ValueError("A bucket is required to offload large payloads (set Config.bucket)")
+        self.threshold = threshold
+        self.delete_payloads = delete_payloads
+        self.cache_bytes = cache_bytes
+        self.s3 = s3 or S3Utils(session)
+        self.s3._scale_pool(payload_workers)
+        self._executor = ThreadPoolExecutor(max_workers=payload_workers)
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[str, int]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._pointers: "OrderedDict[str, Tuple[str, str]]" = OrderedDict()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _is_large(self, entry: Dict) -> bool:
+        return self._entry_size(entry) > self.threshold
+
+    def _wire_size(self, entry: Dict) -> int:
+        return self.POINTER_SIZE if self._is_large(entry) else self._entry_size(entry)
+
+    def _prepare_entries(self, entries: List[Dict]) -> List[Dict]:
+        large = [i for i, entry in enumerate(entries) if self._is_large(entry)]
+        if not large:
+            return entries
+        entries = list(entries)
+        if len(large) == 1:
+            entries[large[0]] = self._offload(entries[large[0]])
+            return entries
+        for i, entry in zip(large, self._executor.map(self._offload, [entries[i] for i in large])):
+            entries[i] = entry
+        return entries
+
+    def _offload(self, entry: Dict) -> Dict:
+        data = entry["MessageBody"].encode("utf-8")
+        key = f"{self.KEY_PREFIX}{uuid.uuid4()}"
+        self.s3.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+        logger.debug("Offloaded %d byte payload to s3://%s/%s", len(data), self.bucket, key)
+
+        attributes = dict(entry.get("MessageAttributes") or {})
+        attributes[SIZE_ATTRIBUTE] = {"DataType": "Number", "StringValue": str(len(data))}
+        return dict(entry, MessageBody=make_pointer(self.bucket, key), MessageAttributes=attributes)
+
+    def _make_consumer(self, queue_url: str, **kwargs: Any) -> QueueConsumer:
+        track = kwargs.get("delete", True)
+        return QueueConsumer(
+            self.client, queue_url, resolve=partial(self._resolve_messages, track=track),
+            on_deleted=self._on_deleted, **kwargs
+        )
+
+    def _resolve_messages(self, messages: List[Dict], track: bool = True) -> List[Dict]:
+        pointers = [parse_pointer(message.get("Body", "")) for message in messages]
+        if not any(pointers):
+            return super()._resolve_messages(messages)
+
+        fetches: Dict[Tuple[str, str], Future] = {
+            pointer: self._executor.submit(self._fetch, *pointer)
+            for pointer in pointers if pointer is not None
+        }
+        resolved = []
+        for message, pointer in zip(messages, pointers):
+            if pointer is None:
+                resolved.append(message)
+                continue
+            try:
+                body = fetches[pointer].result()
+            except Exception as e:
+                logger.warning(
+                    "Failed to fetch payload s3://%s/%s for message %s: %s",
+                    pointer[0], pointer[1], message.get("MessageId"), e,
+                )
+                continue
+            message = dict(message, Body=body, S3Payload={"Bucket": pointer[0], "Key": pointer[1]})
+            attributes = dict(message.get("MessageAttributes") or {})
+            attributes.pop(SIZE_ATTRIBUTE, None)
+            message["MessageAttributes"] = attributes
+            if track and self.delete_payloads:
+                self._track(message["ReceiptHandle"], pointer)
+            resolved.append(message)
+        return super()._resolve_messages(resolved)
+
+    def _track(self, receipt_handle: str, pointer: Tuple[str, str]) -> None:
+        with self._lock:
+            self._pointers[receipt_handle] = pointer
+            while len(self._pointers) > self.MAX_TRACKED_RECEIPTS:
+                self._pointers.popitem(last=False)
+
+    def _fetch(self, bucket: str, key: str) -> str:
+        with self._lock:
+            cached = self._cache.get((bucket, key))
+            if cached is not None:
+                self._cache.move_to_end((bucket, key))
+                return cached[0]
+
+        data = self.s3.client.get_object(Bucket=bucket, Key=key)["Body"].read()
+        body = data.decode("utf-8")
+        with self._lock:
+            if (bucket, key) not in self._cache and len(data) <= self.cache_bytes:
+                self._cache[(bucket, key)] = (body, len(data))
+                self._cached_bytes += len(data)
+                while self._cached_bytes > self.cache_bytes:
+                    _, (_, size) = self._cache.popitem(last=False)
+                    self._cached_bytes -= size
+        return body
+
+    def _on_deleted(self, receipt_handles: List[str]) -> None:
+        if not self.delete_payloads:
+            return
+        by_bucket: Dict[str, List[str]] = {}
+        with self._lock:
+            for receipt in receipt_handles:
+                pointer = self._pointers.pop(receipt, None)
+                if pointer is None:
+                    continue
+                by_bucket.setdefault(pointer[0], []).append(pointer[1])
+                evicted = self._cache.pop(pointer, None)
+                if evicted is not None:
+                    self._cached_bytes -= evicted[1]
+        for bucket, keys in by_bucket.items():
+            self.s3._delete_batch(bucket, keys)
@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from boto3 import Session
+
+from .client_cache import client_cache
+from .configuration import Config
+from .log import get_logger
+from .sqs_utils import SQSUtils
+
+logger = get_logger("FanOut")
+
+
+@dataclass(frozen=True)
+class Target:
+    profile: str = ""
+    region: str = ""
+
+    @property
+    def label(self) -> str:
+        return f"{self.profile or 'default'}/{self.region or 'default'}"
+
+
+@dataclass
+class TargetResult:
+    target: Target
+    value: Any = None
+    error: str = ""
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+@dataclass
+class FanOutResult:
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    errors: List[TargetResult] = field(default_factory=list)
+
+
+class FanOut:
+    DEFAULT_TIMEOUT = 30.0
+    QUEUE_METRICS_WORKERS = 8
+
+    def __init__(
+        self,
+        targets: Iterable[Tuple[str, str]],
+        timeout: float = DEFAULT_TIMEOUT,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.targets = list(dict.fromkeys(Target(*target) for target in targets))
+        if not self.targets:
+            raise ValueError("At least one profile/region target is required")
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._sqs: Dict[Target, SQSUtils] = {}
+
+    @classmethod
+    def from_config(cls, config: Config, **kwargs: Any) -> "FanOut":
+        return cls(config.targets(), **kwargs)
+
+    def session(self, target: Target) -> Session:
+        return client_cache.get_session(target.profile or None, target.region or None)
+
+    def sqs(self, target: Target) -> SQSUtils:
+        with self._lock:
+            utils = self._sqs.get(target)
+            if utils is None:
+                utils = self._sqs[target] = SQSUtils(self.session(target))
+            return utils
+
+    def run(self, func: Callable[[Target], Any],
+            targets: Optional[List[Target]] = None) -> List[TargetResult]:
+        targets = targets or self.targets
+        workers = min(self.max_workers or len(targets), len(targets))
+        start = time.monotonic()
+        queued_deadline = start + self.timeout * math.ceil(len(targets) / workers)
+        started: Dict[int, float] = {}
+
+        def call(index: int) -> TargetResult:
+            began = started[index] = time.monotonic()
+            try:
+                return TargetResult(targets[index], func(targets[index]),
+                                    seconds=time.monotonic() - began)
+            except Exception as e:
+                logger.warning("%s failed: %s", targets[index].label, e)
+                return TargetResult(targets[index], error=str(e) or type(e).__name__,
+                                    seconds=time.monotonic() - began)
+
+        def deadline(index: int) -> float:
+            return started[index] + self.timeout if index in started else queued_deadline
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures: Dict[Future, int] = {executor.submit(call, i): i for i in range(len(targets))}
+        results: List[Optional[TargetResult]] = [None] * len(targets)
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(
+                    pending, return_when=FIRST_COMPLETED,
+                    timeout=max(0.0, min(deadline(futures[f]) for f in pending) - time.monotonic()),
+                )
+                for future in done:
+                    results[futures[future]] = future.result()
+                now = time.monotonic()
+                for future in [f for f in pending if deadline(futures[f]) <= now]:
+                    pending.discard(future)
+                    future.cancel()
+                    index = futures[future]
+                    logger.warning("%s timed out after %.1fs", targets[index].label, self.timeout)
+                    results[index] = TargetResult(
+                        targets[index], error="timed out",
+                        seconds=now - started.get(index, start),
+                    )
+        finally:
+            executor.shutdown(wait=False)
+        return [result for result in results if result is not None]
+
+    def list_queues(self, prefix: str = "") -> FanOutResult:
+        return self._merge(
+            self.run(lambda target: self.sqs(target).list_queues(prefix)),
+            lambda queue: {"name": queue[1], "url": queue[0]},
+        )
+
+    def get_queue_metrics(self, prefix: str = "") -> FanOutResult:
+        def metrics(target: Target) -> List[Any]:
+            utils = self.sqs(target)
+            queue_urls = utils.get_queues(prefix)
+            return utils.get_queue_metrics(queue_urls, self.QUEUE_METRICS_WORKERS)
+
+        return self._merge(self.run(metrics), lambda m: {
+            "name": m.name, "url": m.queue_url, "visible": m.visible,
+            "in_flight": m.in_flight, "delayed": m.delayed, "error": m.error,
+        })
+
+    def list_buckets(self) -> FanOutResult:
+        per_profile = list({target.profile: target for target in self.targets}.values())
+
+        def buckets(target: Target) -> List[Dict[str, Any]]:
+            client = client_cache.get_client("s3", self.session(target))
+            return client.list_buckets().get("Buckets", [])
+
+        return self._merge(self.run(buckets, per_profile), lambda bucket: {
+            "region": bucket.get("BucketRegion", ""), "name": bucket["Name"],
+            "created": bucket.get("CreationDate"),
+        })
+
+    def close(self) -> None:
+        with self._lock:
+            self._sqs.clear()
+
+    def __enter__(self) -> "FanOut":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _merge(results: List[TargetResult], to_row: Callable[[Any], Dict[str, Any]]) -> FanOutResult:
+        merged = FanOutResult()
+        for result in results:
+            if not result.ok:
+                merged.errors.append(result)
+                continue
+            for item in result.value:
+                row = {"profile": result.target.profile or "default",
+                       "region": result.target.region or "default"}
+                row.update(to_row(item))
+                merged.rows.append(row)
+        return merged
@@ -0,0 +1,184 @@
+import bisect
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+LATENCY_BUCKETS_PER_DOUBLING = 8
+MIN_LATENCY_MS = 0.1
+MAX_LATENCY_MS = 600_000.0
+PERCENTILES = (50, 90, 99)
+
+
+def _latency_bounds() -> List[float]:
+    count = math.ceil(math.log2(MAX_LATENCY_MS / MIN_LATENCY_MS) * LATENCY_BUCKETS_PER_DOUBLING)
+    return [MIN_LATENCY_MS * 2 ** (i / LATENCY_BUCKETS_PER_DOUBLING) for i in range(count + 1)]
+
+
+LATENCY_BOUNDS_MS = _latency_bounds()
+
+
+@dataclass
+class LatencyHistogram:
+    counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BOUNDS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    min_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, latency_ms: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BOUNDS_MS, latency_ms)] += 1
+        self.min_ms = latency_ms if not self.count else min(self.min_ms, latency_ms)
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.count += 1
+        self.total_ms += latency_ms
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * pct / 100)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                bound = LATENCY_BOUNDS_MS[index] if index < len(LATENCY_BOUNDS_MS) else self.max_ms
+                return min(max(bound, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_ms": {
+                "mean": round(self.latency.mean_ms, 3),
+                "min": round(self.latency.min_ms, 3),
+                "max": round(self.latency.max_ms, 3),
+            },
+        }
+        for pct in PERCENTILES:
+            data["latency_ms"][f"p{pct}"] = round(self.latency.percentile(pct), 3)
+        return data
+
+
+class Instrumentation:
+    CONTEXT_KEY = "aws_utils_instrumentation"
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, OperationStats] = {}
+
+    def register(self, client: Any) -> Any:
+        events = client.meta.events
+        events.register("before-call.*.*", self._before_call)
+        events.register("before-send.*.*", self._before_send)
+        events.register("after-call.*.*", self._after_call)
+        events.register("after-call-error.*.*", self._after_call_error)
+        return client
+
+    def record(
+        self,
+        operation: str,
+        latency_ms: float,
+        error: bool = False,
+        retries: int = 0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(operation, OperationStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.retries += retries
+            stats.bytes_sent += bytes_sent
+            stats.bytes_received += bytes_received
+            stats.latency.add(latency_ms)
+
+    def get(self, operation: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            stats = self._stats.get(operation)
+            return stats.to_dict() if stats else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    @staticmethod
+    def _body_size(request: Any) -> int:
+        headers = request.headers
+        length = headers.get("Content-Length", headers.get("X-Amz-Decoded-Content-Length"))
+        if length is not None:
+            return int(length)
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if isinstance(body, bytes):
+            return len(body)
+        return 0
+
+    def _before_call(self, model: Any = None, context: Optional[Dict] = None,
+                     **kwargs: Any) -> None:
+        if context is None or model is None:
+            return
+        name = f"{model.service_model.service_name}.{model.name}"
+        head = model.http.get("method") == "HEAD"
+        context[self.CONTEXT_KEY] = (name, time.perf_counter(), 0, head)
+
+    def _before_send(self, request: Any = None, **kwargs: Any) -> None:
+        context = getattr(request, "context", None)
+        if not context or self.CONTEXT_KEY not in context:
+            return
+        name, start, sent, head = context[self.CONTEXT_KEY]
+        context[self.CONTEXT_KEY] = (name, start, sent + self._body_size(request), head)
+
+    def _after_call(self, http_response: Any = None, parsed: Optional[Dict] = None,
+                    context: Optional[Dict] = None, **kwargs: Any) -> None:
+        if not context or self.CONTEXT_KEY not in context:
+            return
+        name, start, sent, head = context.pop(self.CONTEXT_KEY)
+        metadata = (parsed or {}).get("ResponseMetadata", {})
+        status = getattr(http_response, "status_code", metadata.get("HTTPStatusCode", 200))
+        received = 0 if head else int(metadata.get("HTTPHeaders", {}).get("content-length") or 0)
+        self.record(
+            name,
+            (time.perf_counter() - start) * 1000,
+            error=status >= 300,
+            retries=metadata.get("RetryAttempts", 0),
+            bytes_sent=sent,
+            bytes_received=received,
+        )
+
+    def _after_call_error(self, context: Optional[Dict] = None, **kwargs: Any) -> None:
+        if not context or self.CONTEXT_KEY not in context:
+            return
+        name, start, sent, _ = context.pop(self.CONTEXT_KEY)
+        self.record(name, (time.perf_counter() - start) * 1000, error=True, bytes_sent=sent)
+
+
+instrumentation = Instrumentation()
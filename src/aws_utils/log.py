@@ -0,0 +1,113 @@
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, Optional, TextIO
+
+ROOT_LOGGER = "aws_utils"
+TEXT_FORMAT = "[%(component)s] %(message)s"
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "component"}
+
+logging.getLogger(ROOT_LOGGER).addHandler(logging.NullHandler())
+
+
+def get_logger(component: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+
+def _component(record: logging.LogRecord) -> str:
+    return record.name.rsplit(".", 1)[-1]
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self, fmt: str = TEXT_FORMAT) -> None:
+        super().__init__(fmt)
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.component = _component(record)
+        return super().format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES:
+                data[key] = value
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+def configure_logging(
+    level: Any = logging.INFO,
+    json_format: bool = False,
+    stream: Optional[TextIO] = None,
+) -> logging.Handler:
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_aws_utils_handler", False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_format else TextFormatter())
+    handler._aws_utils_handler = True  # type: ignore[attr-defined]
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return handler
+
+
+class ThroughputLog:
+    def __init__(
+        self,
+        logger: logging.Logger,
+        label: str,
+        unit: str = "items",
+        interval: float = 1.0,
+        level: int = logging.INFO,
+    ) -> None:
+        self.logger = logger
+        self.label = label
+        self.unit = unit
+        self.interval = interval
+        self.level = level
+        self.count = 0
+        self.bytes = 0
+        self._enabled = logger.isEnabledFor(level)
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self._next_emit = self._start + interval
+
+    def add(self, count: int = 1, nbytes: int = 0) -> None:
+        if not self._enabled:
+            return
+        with self._lock:
+            self.count += count
+            self.bytes += nbytes
+            now = time.monotonic()
+            if now < self._next_emit:
+                return
+            self._next_emit = now + self.interval
+            count, total = self.count, self.bytes
+        self._emit(count, total, now)
+
+    def close(self) -> None:
+        if self._enabled:
+            self._emit(self.count, self.bytes, time.monotonic())
+
+    def _emit(self, count: int, total: int, now: float) -> None:
+        elapsed = max(now - self._start, 1e-9)
+        self.logger.log(
+            self.level,
+            "%s: %d %s, %.1f MB (%.1f %s/s)",
+            self.label, count, self.unit, total / (1024 * 1024), count / elapsed, self.unit,
+            extra={"progress": self.label, "count": count, "bytes": total,
+                   "rate": round(count / elapsed, 2), "elapsed": round(elapsed, 3)},
+        )
@@ -0,0 +1,181 @@
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, TextIO
+
+DEFAULT_INTERVAL = 0.5
+RATE_SMOOTHING = 0.3
+
+
+@dataclass
+class ProgressSnapshot:
+    label: str
+    done: int = 0
+    total: Optional[int] = None
+    bytes_done: int = 0
+    total_bytes: Optional[int] = None
+    elapsed: float = 0.0
+    rate: float = 0.0
+    byte_rate: float = 0.0
+    finished: bool = False
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.total_bytes:
+            return min(100.0, self.bytes_done * 100 / self.total_bytes)
+        if self.total:
+            return min(100.0, self.done * 100 / self.total)
+        return None
+
+    @property
+    def eta(self) -> Optional[float]:
+        if self.total_bytes and self.byte_rate > 0:
+            return max(0.0, (self.total_bytes - self.bytes_done) / self.byte_rate)
+        if self.total and self.rate > 0:
+            return max(0.0, (self.total - self.done) / self.rate)
+        return None
+
+
+ProgressCallback = Callable[[ProgressSnapshot], None]
+
+
+class Progress:
+    def __init__(
+        self,
+        label: str,
+        total: Optional[int] = None,
+        total_bytes: Optional[int] = None,
+        callback: Optional[ProgressCallback] = None,
+        interval: float = DEFAULT_INTERVAL,
+    ) -> None:
+        self.label = label
+        self.total = total
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.interval = interval
+        self.done = 0
+        self.bytes_done = 0
+        self._lock = threading.Lock()
+        self._report_lock = threading.Lock()
+        self._start = time.monotonic()
+        self._next_report = self._start + interval
+        self._last = (self._start, 0, 0)
+        self._rate = 0.0
+        self._byte_rate = 0.0
+        self._finished = False
+
+    def set_total(self, total: Optional[int] = None, total_bytes: Optional[int] = None) -> None:
+        with self._lock:
+            if total is not None:
+                self.total = total
+            if total_bytes is not None:
+                self.total_bytes = total_bytes
+
+    def add(self, count: int = 1, nbytes: int = 0) -> None:
+        with self._lock:
+            self.done += count
+            self.bytes_done += nbytes
+            now = time.monotonic()
+            if now < self._next_report or self.callback is None:
+                return
+            self._next_report = now + self.interval
+            snapshot = self._snapshot(now)
+        self._report(snapshot)
+
+    def add_bytes(self, nbytes: int) -> None:
+        self.add(0, nbytes)
+
+    def snapshot(self) -> ProgressSnapshot:
+        with self._lock:
+            return self._snapshot(time.monotonic())
+
+    def close(self) -> ProgressSnapshot:
+        with self._lock:
+            self._finished = True
+            snapshot = self._snapshot(time.monotonic())
+        if self.callback is not None:
+            with self._report_lock:
+                self.callback(snapshot)
+        return snapshot
+
+    def _snapshot(self, now: float) -> ProgressSnapshot:
+        last_time, last_done, last_bytes = self._last
+        window = now - last_time
+        elapsed = now - self._start
+        if self._finished and elapsed > 0:
+            self._rate, self._byte_rate = self.done / elapsed, self.bytes_done / elapsed
+        elif window > 0 and window >= self.interval / 2:
+            rate = (self.done - last_done) / window
+            byte_rate = (self.bytes_done - last_bytes) / window
+            if last_time == self._start:
+                self._rate, self._byte_rate = rate, byte_rate
+            else:
+                self._rate += RATE_SMOOTHING * (rate - self._rate)
+                self._byte_rate += RATE_SMOOTHING * (byte_rate - self._byte_rate)
+            self._last = (now, self.done, self.bytes_done)
+        return ProgressSnapshot(
+            label=self.label,
+            done=self.done,
+            total=self.total,
+            bytes_done=self.bytes_done,
+            total_bytes=self.total_bytes,
+            elapsed=elapsed,
+            rate=self._rate,
+            byte_rate=self._byte_rate,
+            finished=self._finished,
+        )
+
+    def _report(self, snapshot: ProgressSnapshot) -> None:
+        if not self._report_lock.acquire(blocking=False):
+            return
+        try:
+            self.callback(snapshot)  # type: ignore[misc]
+        finally:
+            self._report_lock.release()
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def format_progress(snapshot: ProgressSnapshot, unit: str = "items") -> str:
+    done = f"{snapshot.done}/{snapshot.total}" if snapshot.total is not None else str(snapshot.done)
+    parts = [f"{snapshot.label}: {done} {unit}"]
+    if snapshot.percent is not None:
+        parts.append(f"{snapshot.percent:.0f}%")
+    if snapshot.bytes_done:
+        parts.append(format_bytes(snapshot.bytes_done))
+    rate = f"{snapshot.rate:.1f} {unit}/s"
+    if snapshot.byte_rate:
+        rate += f", {format_bytes(snapshot.byte_rate)}/s"
+    parts.append(rate)
+    if snapshot.finished:
+        parts.append(f"in {format_duration(snapshot.elapsed)}")
+    elif snapshot.eta is not None:
+        parts.append(f"ETA {format_duration(snapshot.eta)}")
+    return "  ".join(parts)
+
+
+def console_progress(unit: str = "items", stream: Optional[TextIO] = None) -> ProgressCallback:
+    def render(snapshot: ProgressSnapshot) -> None:
+        out = stream or sys.stdout
+        out.write("\r\033[K" + format_progress(snapshot, unit))
+        if snapshot.finished:
+            out.write("\n")
+        out.flush()
+
+    return render
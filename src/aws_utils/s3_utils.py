@@ -1,71 +1,791 @@
+import hashlib
+import json
 import os
+import queue
+import threading
+import time
 import webbrowser
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-import boto3
+from boto3.s3.transfer import (ProgressCallbackInvoker, TransferConfig,
+                               create_transfer_manager)
 from boto3.session import Session
+from s3transfer.futures import TransferFuture
+from s3transfer.utils import ChunksizeAdjuster
+
+from .client_cache import client_cache
+from .log import ThroughputLog, get_logger
+from .progress import Progress
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+SIZE_BUCKETS = [(KB, "<1KB"), (MB, "<1MB"), (100 * MB, "<100MB"), (GB, "<1GB")]
+LARGEST_SIZE_BUCKET = ">=1GB"
+
+logger = get_logger("S3Utils")
+
+
+@dataclass
+class ObjectInfo:
+    size: int
+    etag: str = ""
+    last_modified: float = 0.0
+    mtime: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ObjectInfo":
+        return cls(size=int(data.get("size", 0)),
+                   etag=data.get("etag", ""),
+                   last_modified=float(data.get("last_modified", 0.0)),
+                   mtime=float(data.get("mtime", 0.0)))
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+@dataclass
+class PrefixStats:
+    count: int = 0
+    total_bytes: int = 0
+    histogram: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, size: int) -> None:
+        self.count += 1
+        self.total_bytes += size
+        label = next(
+            (label for limit, label in SIZE_BUCKETS if size < limit), LARGEST_SIZE_BUCKET
+        )
+        self.histogram[label] = self.histogram.get(label, 0) + 1
+
+
+@dataclass
+class DeleteSummary:
+    deleted: int = 0
+    errors: List[Dict] = field(default_factory=list)
+    dry_run: bool = False
 
 
 class S3Utils:
-    LOG_PREFIX = "[S3Utils]"
+    DEFAULT_MAX_WORKERS = 16
+    DEFAULT_MULTIPART_THRESHOLD = 8 * MB
+    DEFAULT_MULTIPART_CHUNKSIZE = 8 * MB
+    PENDING_UPLOADS_PER_WORKER = 4
+    MAX_DELETE_BATCH_SIZE = 1000
+    DEFAULT_DELETE_IN_FLIGHT = 4
+    IO_CHUNK_SIZE = 256 * KB
+    PARTIAL_SUFFIX = ".part"
+    STATE_SUFFIX = ".part.state"
+    UPLOAD_STATE_SUFFIX = ".upload.state"
+    STALE_UPLOAD_HOURS = 24
+    DEFAULT_DELIMITER = "/"
+    QUEUE_TIMEOUT = 0.5
+    _PARTITION_DONE = object()
 
-    def __init__(self, session: Optional[Session] = None) -> None:
-        self._log("Initializing S3 client...")
-        self.client = (session or boto3.Session()).client("s3")
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        transfer_config: Optional[TransferConfig] = None,
+    ) -> None:
+        logger.debug("Initializing S3 client...")
+        self.session = session
+        self.transfer_config = transfer_config or self.build_transfer_config()
+        self.client = client_cache.get_client(
+            "s3", session, self.transfer_config.max_concurrency
+        )
+
+    @classmethod
+    def build_transfer_config(
+        cls,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        multipart_chunksize: int = DEFAULT_MULTIPART_CHUNKSIZE,
+    ) -> TransferConfig:
+        return TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_workers,
+        )
 
-    def _log(self, message: str) -> None:
-        print(f"{self.LOG_PREFIX} {message}")
+    def _scale_pool(self, workers: int) -> None:
+        self.client = client_cache.get_client("s3", self.session, workers)
 
     def list_buckets(self) -> List[str]:
-        self._log("Listing S3 buckets...")
+        logger.info("Listing S3 buckets...")
         resp = self.client.list_buckets()
         return [b["Name"] for b in resp.get("Buckets", [])]
 
+    def list_objects(
+        self, bucket: str, prefix: str = "", delimiter: Optional[str] = None
+    ) -> Iterator[Dict]:
+        for page in self._list_pages(bucket, prefix, delimiter):
+            yield from page.get("Contents", [])
+
+    def list_common_prefixes(
+        self, bucket: str, prefix: str = "", delimiter: str = DEFAULT_DELIMITER
+    ) -> List[str]:
+        return [
+            common["Prefix"]
+            for page in self._list_pages(bucket, prefix, delimiter)
+            for common in page.get("CommonPrefixes", [])
+        ]
+
+    def list_objects_parallel(
+        self,
+        bucket: str,
+        prefix: str = "",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        delimiter: str = DEFAULT_DELIMITER,
+    ) -> Iterator[Dict]:
+        partitions: List[str] = []
+        for page in self._list_pages(bucket, prefix, delimiter):
+            yield from page.get("Contents", [])
+            partitions.extend(common["Prefix"] for common in page.get("CommonPrefixes", []))
+        if not partitions:
+            return
+
+        self._scale_pool(max_workers)
+        pages: "queue.Queue" = queue.Queue(maxsize=max_workers * 2)
+        stop = threading.Event()
+
+        def put(item: object) -> None:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=self.QUEUE_TIMEOUT)
+                    return
+                except queue.Full:
+                    continue
+
+        def list_partition(partition: str) -> None:
+            try:
+                for page in self._list_pages(bucket, partition):
+                    if stop.is_set():
+                        return
+                    put(page.get("Contents", []))
+            finally:
+                put(self._PARTITION_DONE)
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(partitions)))
+        futures = [executor.submit(list_partition, p) for p in partitions]
+        try:
+            remaining = len(partitions)
+            while remaining:
+                item = pages.get()
+                if item is self._PARTITION_DONE:
+                    remaining -= 1
+                else:
+                    yield from item
+            for future in futures:
+                future.result()
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+    def summarize_objects(
+        self,
+        bucket: str,
+        prefix: str = "",
+        depth: int = 1,
+        max_workers: Optional[int] = None,
+        delimiter: str = DEFAULT_DELIMITER,
+    ) -> Dict[str, PrefixStats]:
+        if max_workers:
+            objects = self.list_objects_parallel(bucket, prefix, max_workers, delimiter)
+        else:
+            objects = self.list_objects(bucket, prefix)
+
+        summary: Dict[str, PrefixStats] = {}
+        for obj in objects:
+            parts = obj["Key"][len(prefix):].split(delimiter)[:-1][:depth]
+            group = prefix + "".join(part + delimiter for part in parts)
+            summary.setdefault(group, PrefixStats()).add(obj["Size"])
+        return summary
+
+    def _list_pages(
+        self, bucket: str, prefix: str = "", delimiter: Optional[str] = None
+    ) -> Iterator[Dict]:
+        kwargs = {"Bucket": bucket, "Prefix": prefix}
+        if delimiter:
+            kwargs["Delimiter"] = delimiter
+        return iter(self.client.get_paginator("list_objects_v2").paginate(**kwargs))
+
     def open_bucket_in_console(self, bucket: str) -> None:
         if not bucket:
-            self._log("No bucket specified to open in console.")
+            logger.info("No bucket specified to open in console.")
             return
 
         region = self.client.meta.region_name
         url = f"https://s3.console.aws.amazon.com/s3/buckets/{bucket}?region={region}&tab=objects"
-        self._log(f"Opening bucket in console: {url}")
+        logger.info("Opening bucket in console: %s", url)
         webbrowser.open(url)
 
     def delete_object(self, bucket: str, key: str) -> None:
         if not bucket or not key:
             raise ValueError("Bucket and key are required")
 
-        self._log(f"Deleting object '{key}' from bucket '{bucket}'...")
+        logger.info("Deleting object '%s' from bucket '%s'...", key, bucket)
         try:
             self.client.delete_object(Bucket=bucket, Key=key)
-            self._log(f"Object '{key}' successfully deleted.")
+            logger.info("Object '%s' successfully deleted.", key)
         except Exception as e:
-            self._log(f"Error deleting object: {e}")
+            logger.error("Error deleting object: %s", e)
             raise
 
+    def delete_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+        max_in_flight: int = DEFAULT_DELETE_IN_FLIGHT,
+        dry_run: bool = False,
+        progress: Optional[Progress] = None,
+    ) -> DeleteSummary:
+        if not bucket or not prefix:
+            raise ValueError("Bucket and prefix are required")
+
+        logger.info("Deleting objects under '%s' from bucket '%s'...", prefix, bucket)
+        keys = (obj["Key"] for obj in self.list_objects(bucket, prefix))
+        return self.delete_many(bucket, keys, max_in_flight, dry_run, progress)
+
+    def delete_keys_from_file(
+        self,
+        bucket: str,
+        file_path: str,
+        max_in_flight: int = DEFAULT_DELETE_IN_FLIGHT,
+        dry_run: bool = False,
+        progress: Optional[Progress] = None,
+    ) -> DeleteSummary:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        logger.info("Deleting keys listed in '%s' from bucket '%s'...", file_path, bucket)
+        with open(file_path, "r") as f:
+            keys = (line for line in map(str.strip, f) if line)
+            return self.delete_many(bucket, keys, max_in_flight, dry_run, progress)
+
+    def delete_many(
+        self,
+        bucket: str,
+        keys: Iterable[str],
+        max_in_flight: int = DEFAULT_DELETE_IN_FLIGHT,
+        dry_run: bool = False,
+        progress: Optional[Progress] = None,
+    ) -> DeleteSummary:
+        summary = DeleteSummary(dry_run=dry_run)
+        if dry_run:
+            summary.deleted = sum(1 for _ in keys)
+            logger.info("Dry run: %s objects would be deleted.", summary.deleted)
+            return summary
+
+        self._scale_pool(max_in_flight)
+        pending: Deque[Future] = deque()
+
+        def collect(future: Future) -> None:
+            count = self._add_delete_result(summary, future)
+            if progress is not None:
+                progress.add(count)
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for batch in self._batch_keys(keys):
+                pending.append(executor.submit(self._delete_batch, bucket, batch))
+                if len(pending) >= max_in_flight * 2:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+
+        if progress is not None:
+            progress.close()
+        logger.info("Deleted %s objects, %s errors.", summary.deleted, len(summary.errors))
+        return summary
+
+    def _batch_keys(self, keys: Iterable[str]) -> Iterator[List[str]]:
+        batch: List[str] = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) == self.MAX_DELETE_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _delete_batch(self, bucket: str, keys: List[str]) -> Tuple[int, List[Dict]]:
+        response = self.client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+        )
+        errors = response.get("Errors", [])
+        for error in errors:
+            logger.warning("Error deleting '%s': %s", error["Key"], error.get("Message"))
+        return len(keys) - len(errors), errors
+
+    @staticmethod
+    def _add_delete_result(summary: DeleteSummary, future: Future) -> int:
+        deleted, errors = future.result()
+        summary.deleted += deleted
+        summary.errors.extend(errors)
+        return deleted + len(errors)
+
     def upload_file(
-        self, file_path: str, bucket: str, key: Optional[str] = None
+        self,
+        file_path: str,
+        bucket: str,
+        key: Optional[str] = None,
+        progress: Optional[Progress] = None,
     ) -> None:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
 
         key = key or os.path.basename(file_path)
-        self._log(
-            f"Uploading file '{file_path}' to bucket '{bucket}' with key '{key}'..."
+        logger.info(
+            "Uploading file '%s' to bucket '%s' with key '%s'...", file_path, bucket, key
+        )
+        if progress is None:
+            self.client.upload_file(file_path, bucket, key, Config=self.transfer_config)
+            return
+
+        progress.set_total(1, os.path.getsize(file_path))
+        self.client.upload_file(file_path, bucket, key, Config=self.transfer_config,
+                                Callback=progress.add_bytes)
+        progress.add(1)
+        progress.close()
+
+    def upload_file_resumable(
+        self,
+        file_path: str,
+        bucket: str,
+        key: Optional[str] = None,
+        state_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> str:
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        key = key or os.path.basename(file_path)
+        state_path = state_path or file_path + self.UPLOAD_STATE_SUFFIX
+        stat = os.stat(file_path)
+        chunksize = ChunksizeAdjuster().adjust_chunksize(
+            self.transfer_config.multipart_chunksize, stat.st_size
+        )
+        header = {"bucket": bucket, "key": key, "size": stat.st_size,
+                  "mtime": stat.st_mtime, "chunksize": chunksize}
+
+        upload_id = self._load_upload_state(state_path, header)
+        parts = self._list_uploaded_parts(bucket, key, upload_id) if upload_id else None
+        if parts is None:
+            upload_id = self.client.create_multipart_upload(Bucket=bucket, Key=key)["UploadId"]
+            parts = {}
+            with open(state_path, "w") as f:
+                f.write(json.dumps(dict(header, upload_id=upload_id)) + "\n")
+            logger.info("Started multipart upload of '%s' to '%s'...", file_path, key)
+        else:
+            logger.info(
+                "Resuming upload of '%s', %s parts already uploaded.", file_path, len(parts)
+            )
+
+        part_count = max(1, (stat.st_size + chunksize - 1) // chunksize)
+        missing = [n for n in range(1, part_count + 1) if n not in parts]
+        lock = threading.Lock()
+        with open(state_path, "a") as state:
+
+            def send(part_number: int) -> None:
+                with open(file_path, "rb") as f:
+                    f.seek((part_number - 1) * chunksize)
+                    data = f.read(chunksize)
+                etag = self.client.upload_part(
+                    Bucket=bucket, Key=key, UploadId=upload_id,
+                    PartNumber=part_number, Body=data,
+                )["ETag"]
+                with lock:
+                    parts[part_number] = etag
+                    state.write(f"{part_number} {etag}\n")
+                    state.flush()
+
+            workers = max_workers or self.transfer_config.max_concurrency
+            self._scale_pool(workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(send, n) for n in missing]:
+                    future.result()
+
+        response = self.client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": [
+                {"PartNumber": n, "ETag": parts[n]} for n in sorted(parts)
+            ]},
+        )
+        os.remove(state_path)
+        logger.info("Completed multipart upload of '%s' (%s parts).", key, part_count)
+        return response.get("ETag", "")
+
+    @staticmethod
+    def _load_upload_state(state_path: str, header: Dict) -> Optional[str]:
+        if not os.path.exists(state_path):
+            return None
+        with open(state_path, "r") as f:
+            lines = f.read().split("\n")[:-1]
+        if not lines:
+            return None
+        saved = json.loads(lines[0])
+        upload_id = saved.pop("upload_id", None)
+        return upload_id if saved == header else None
+
+    def _list_uploaded_parts(
+        self, bucket: str, key: str, upload_id: str
+    ) -> Optional[Dict[int, str]]:
+        parts = {}
+        try:
+            paginator = self.client.get_paginator("list_parts")
+            for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+                for part in page.get("Parts", []):
+                    parts[part["PartNumber"]] = part["ETag"]
+        except self.client.exceptions.NoSuchUpload:
+            logger.info("Upload %s no longer exists, starting over.", upload_id)
+            return None
+        return parts
+
+    def abort_incomplete_uploads(
+        self, bucket: str, prefix: str = "", older_than_hours: float = STALE_UPLOAD_HOURS
+    ) -> int:
+        cutoff = time.time() - older_than_hours * 3600
+        aborted = 0
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"].timestamp() > cutoff:
+                    continue
+                logger.info("Aborting incomplete upload of '%s'...", upload["Key"])
+                self.client.abort_multipart_upload(
+                    Bucket=bucket, Key=upload["Key"], UploadId=upload["UploadId"]
+                )
+                aborted += 1
+        logger.info("Aborted %s incomplete uploads.", aborted)
+        return aborted
+
+    def upload_directory(
+        self,
+        dir_path: str,
+        bucket: str,
+        prefix: str = "",
+        progress: Optional[Progress] = None,
+    ) -> int:
+        if not os.path.isdir(dir_path):
+            raise NotADirectoryError(f"Directory not found: {dir_path}")
+
+        logger.info(
+            "Uploading directory '%s' to bucket '%s' with prefix '%s'...", dir_path, bucket, prefix
         )
-        self.client.upload_file(file_path, bucket, key)
+        files: Iterable[Tuple[str, str]] = self._walk_directory(dir_path, prefix)
+        if progress is not None:
+            files = list(files)
+            progress.set_total(len(files), sum(os.path.getsize(path) for path, _ in files))
+        uploaded = self._upload_files(files, bucket, progress)
+        logger.info("Uploaded %s files from '%s'.", uploaded, dir_path)
+        return uploaded
 
-    def upload_directory(self, dir_path: str, bucket: str, prefix: str = "") -> None:
+    def sync_directory(
+        self,
+        dir_path: str,
+        bucket: str,
+        prefix: str = "",
+        delete: bool = False,
+        manifest_path: Optional[str] = None,
+        progress: Optional[Progress] = None,
+    ) -> Dict[str, int]:
         if not os.path.isdir(dir_path):
             raise NotADirectoryError(f"Directory not found: {dir_path}")
 
-        self._log(
-            f"Uploading directory '{dir_path}' to bucket '{bucket}' with prefix '{prefix}'..."
+        prefix = self._directory_prefix(prefix)
+        logger.info(
+            "Syncing directory '%s' to bucket '%s' with prefix '%s'...", dir_path, bucket, prefix
         )
+        index = None
+        if manifest_path:
+            index = self._load_manifest(manifest_path, bucket, prefix)
+        if index is None:
+            index = self._list_remote_index(bucket, prefix)
+
+        seen: Set[str] = set()
+        stats = {"uploaded": 0, "skipped": 0, "deleted": 0}
+
+        def changed_files() -> Iterator[Tuple[str, str]]:
+            for local_path, s3_key in self._walk_directory(dir_path, prefix):
+                seen.add(s3_key)
+                stat = os.stat(local_path)
+                entry = index.get(s3_key)
+                if entry and self._is_unchanged(local_path, stat, entry):
+                    entry.mtime = stat.st_mtime
+                    stats["skipped"] += 1
+                    continue
+                index[s3_key] = ObjectInfo(
+                    size=stat.st_size, last_modified=time.time(), mtime=stat.st_mtime
+                )
+                yield local_path, s3_key
+
+        stats["uploaded"] = self._upload_files(changed_files(), bucket, progress)
+
+        if delete:
+            orphans = [key for key in index if key.startswith(prefix) and key not in seen]
+            summary = self.delete_many(bucket, orphans)
+            stats["deleted"] = summary.deleted
+            failed = {error["Key"] for error in summary.errors}
+            for key in orphans:
+                if key not in failed:
+                    del index[key]
+
+        if manifest_path:
+            self._save_manifest(manifest_path, bucket, prefix, index)
+
+        logger.info(
+            "Sync finished: %s uploaded, %s unchanged, %s deleted.",
+            stats["uploaded"], stats["skipped"], stats["deleted"],
+        )
+        return stats
+
+    def _upload_files(
+        self,
+        files: Iterable[Tuple[str, str]],
+        bucket: str,
+        progress: Optional[Progress] = None,
+    ) -> int:
+        max_pending = (
+            self.transfer_config.max_concurrency * self.PENDING_UPLOADS_PER_WORKER
+        )
+        pending: Deque[TransferFuture] = deque()
+        tracker = progress or ThroughputLog(logger, "upload", unit="files")
+        subscribers = [ProgressCallbackInvoker(progress.add_bytes)] if progress else None
+
+        def collect(future: TransferFuture) -> int:
+            future.result()
+            tracker.add()
+            return 1
+
+        uploaded = 0
+        with create_transfer_manager(self.client, self.transfer_config) as manager:
+            for local_path, s3_key in files:
+                logger.debug("Uploading file '%s' to key '%s'...", local_path, s3_key)
+                pending.append(manager.upload(local_path, bucket, s3_key,
+                                              subscribers=subscribers))
+                if len(pending) >= max_pending:
+                    uploaded += collect(pending.popleft())
+            while pending:
+                uploaded += collect(pending.popleft())
+        tracker.close()
+        return uploaded
+
+    def download_file(
+        self,
+        bucket: str,
+        key: str,
+        dest_path: Optional[str] = None,
+        max_workers: Optional[int] = None,
+    ) -> bool:
+        if not bucket or not key:
+            raise ValueError("Bucket and key are required")
+
+        dest_path = dest_path or os.path.basename(key)
+        head = self.client.head_object(Bucket=bucket, Key=key)
+        size, etag = head["ContentLength"], head.get("ETag", "")
+        if os.path.exists(dest_path) and os.path.getsize(dest_path) == size \
+                and self._local_etag(dest_path, size) == etag:
+            logger.debug("Skipping '%s', '%s' is up to date.", key, dest_path)
+            return False
+
+        logger.debug("Downloading '%s' from bucket '%s' to '%s'...", key, bucket, dest_path)
+        parent = os.path.dirname(dest_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        partial_path = dest_path + self.PARTIAL_SUFFIX
+        if size < self.transfer_config.multipart_threshold:
+            self._download_range(bucket, key, etag, partial_path, 0, size, create=True)
+        else:
+            workers = max_workers or self.transfer_config.max_concurrency
+            self._scale_pool(workers)
+            self._download_ranges(bucket, key, etag, size, dest_path, workers)
+        os.replace(partial_path, dest_path)
+        return True
+
+    def download_prefix(
+        self,
+        bucket: str,
+        prefix: str,
+        dest_dir: str,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        progress: Optional[Progress] = None,
+    ) -> Dict[str, int]:
+        prefix = self._directory_prefix(prefix)
+        logger.info("Downloading '%s' from bucket '%s' to '%s'...", prefix, bucket, dest_dir)
+        part_workers = max(1, self.transfer_config.max_concurrency // max_workers)
+        self._scale_pool(max_workers * part_workers)
+        stats = {"downloaded": 0, "skipped": 0}
+        pending: Deque[Tuple[Future, int]] = deque()
+        tracker = progress or ThroughputLog(logger, "download", unit="files")
+
+        def collect(item: Tuple[Future, int]) -> None:
+            future, size = item
+            downloaded = future.result()
+            stats["downloaded" if downloaded else "skipped"] += 1
+            tracker.add(1, size if downloaded else 0)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for obj in self.list_objects(bucket, prefix):
+                if obj["Key"].endswith("/"):
+                    continue
+                dest_path = self._local_path(dest_dir, obj["Key"][len(prefix):])
+                pending.append((executor.submit(
+                    self.download_file, bucket, obj["Key"], dest_path, part_workers
+                ), obj.get("Size", 0)))
+                if len(pending) >= max_workers * self.PENDING_UPLOADS_PER_WORKER:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+
+        tracker.close()
+        logger.info(
+            "Downloaded %s files, %s up to date.", stats["downloaded"], stats["skipped"]
+        )
+        return stats
+
+    @staticmethod
+    def _local_path(dest_dir: str, relative_key: str) -> str:
+        root = os.path.abspath(dest_dir)
+        path = os.path.abspath(os.path.join(root, *relative_key.split("/")))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Key escapes destination directory: {relative_key}")
+        return path
+
+    def _download_ranges(self, bucket: str, key: str, etag: str, size: int,
+                         dest_path: str, max_workers: int) -> None:
+        partial_path = dest_path + self.PARTIAL_SUFFIX
+        state_path = dest_path + self.STATE_SUFFIX
+        chunksize = self.transfer_config.multipart_chunksize
+        header = {"etag": etag, "size": size, "chunksize": chunksize}
+        completed = self._load_download_state(state_path, partial_path, header)
+        if completed:
+            logger.info("Resuming '%s', %s parts already downloaded.", key, len(completed))
+        else:
+            with open(partial_path, "wb") as partial:
+                partial.truncate(size)
+            with open(state_path, "w") as state_file:
+                state_file.write(json.dumps(header) + "\n")
+
+        lock = threading.Lock()
+        with open(state_path, "a") as state:
+
+            def fetch(part: int) -> None:
+                start = part * chunksize
+                self._download_range(bucket, key, etag, partial_path, start,
+                                     min(start + chunksize, size))
+                with lock:
+                    state.write(f"{part}\n")
+                    state.flush()
+
+            parts = [p for p in range((size + chunksize - 1) // chunksize)
+                     if p not in completed]
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for future in [executor.submit(fetch, p) for p in parts]:
+                    future.result()
+        os.remove(state_path)
+
+    def _download_range(self, bucket: str, key: str, etag: str, path: str,
+                        start: int, end: int, create: bool = False) -> None:
+        kwargs = {"Bucket": bucket, "Key": key}
+        if etag:
+            kwargs["IfMatch"] = etag
+        if not create:
+            kwargs["Range"] = f"bytes={start}-{end - 1}"
+        body = self.client.get_object(**kwargs)["Body"]
+        with open(path, "wb" if create else "r+b") as f:
+            f.seek(start)
+            for chunk in body.iter_chunks(self.IO_CHUNK_SIZE):
+                f.write(chunk)
+
+    @staticmethod
+    def _load_download_state(state_path: str, partial_path: str,
+                             header: Dict) -> Set[int]:
+        if not os.path.exists(state_path) or not os.path.exists(partial_path):
+            return set()
+        with open(state_path, "r") as f:
+            lines = f.read().split("\n")[:-1]
+        if not lines or json.loads(lines[0]) != header:
+            return set()
+        return {int(line) for line in lines[1:] if line.strip()}
+
+    def _list_remote_index(self, bucket: str, prefix: str) -> Dict[str, ObjectInfo]:
+        logger.info("Listing objects in bucket '%s' with prefix '%s'...", bucket, prefix)
+        return {
+            obj["Key"]: ObjectInfo(
+                size=obj["Size"],
+                etag=obj.get("ETag", ""),
+                last_modified=obj["LastModified"].timestamp(),
+            )
+            for obj in self.list_objects(bucket, prefix)
+        }
+
+    def _is_unchanged(self, local_path: str, stat: os.stat_result,
+                      entry: ObjectInfo) -> bool:
+        if entry.size != stat.st_size:
+            return False
+        if entry.mtime:
+            return entry.mtime == stat.st_mtime
+        if stat.st_mtime <= entry.last_modified:
+            return True
+        return self._local_etag(local_path, stat.st_size) == entry.etag
+
+    def _local_etag(self, file_path: str, size: int) -> str:
+        if size < self.transfer_config.multipart_threshold:
+            with open(file_path, "rb") as f:
+                return f'"{hashlib.md5(f.read()).hexdigest()}"'
+
+        chunksize = ChunksizeAdjuster().adjust_chunksize(
+            self.transfer_config.multipart_chunksize, size
+        )
+        digests = []
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunksize), b""):
+                digests.append(hashlib.md5(chunk).digest())
+        return f'"{hashlib.md5(b"".join(digests)).hexdigest()}-{len(digests)}"'
+
+    def _load_manifest(
+        self, manifest_path: str, bucket: str, prefix: str
+    ) -> Optional[Dict[str, ObjectInfo]]:
+        if not os.path.exists(manifest_path):
+            return None
+
+        with open(manifest_path, "r") as f:
+            data = json.load(f)
+        if (data.get("bucket") != bucket
+                or self._directory_prefix(data.get("prefix", "")) != prefix):
+            logger.warning("Manifest '%s' targets another destination, ignoring.", manifest_path)
+            return None
+
+        logger.info("Using manifest '%s' instead of listing the bucket.", manifest_path)
+        return {
+            key: ObjectInfo.from_dict(entry)
+            for key, entry in data.get("objects", {}).items()
+        }
+
+    @staticmethod
+    def _save_manifest(manifest_path: str, bucket: str, prefix: str,
+                       index: Dict[str, ObjectInfo]) -> None:
+        data = {
+            "bucket": bucket,
+            "prefix": prefix,
+            "objects": {key: entry.to_dict() for key, entry in index.items()},
+        }
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, manifest_path)
+
+    @staticmethod
+    def _directory_prefix(prefix: str) -> str:
+        return prefix if not prefix or prefix.endswith("/") else f"{prefix}/"
+
+    @staticmethod
+    def _walk_directory(dir_path: str, prefix: str) -> Iterator[Tuple[str, str]]:
         for root, _, files in os.walk(dir_path):
             for file in files:
                 local_path = os.path.join(root, file)
                 rel_path = os.path.relpath(local_path, dir_path)
-                s3_key = os.path.join(prefix, rel_path).replace("\\", "/")
-                self._log(f"Uploading file '{local_path}' to key '{s3_key}'...")
-                self.upload_file(local_path, bucket, s3_key)
+                yield local_path, os.path.join(prefix, rel_path).replace("\\", "/")
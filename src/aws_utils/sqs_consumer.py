@@ -0,0 +1,253 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Generator, List, Optional
+
+from .log import get_logger
+
+logger = get_logger("SQSUtils")
+
+
+@dataclass
+class ConsumeSummary:
+    received: int = 0
+    processed: int = 0
+    failed: int = 0
+    deleted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.processed / self.seconds if self.seconds else 0.0
+
+
+class QueueConsumer:
+    MAX_BATCH_SIZE = 10
+    PUT_TIMEOUT = 0.5
+    _STOP = object()
+
+    def __init__(
+        self,
+        client,
+        queue_url: str,
+        receivers: int = 4,
+        max_buffered: int = 100,
+        max_messages: Optional[int] = None,
+        delete: bool = True,
+        wait_time_seconds: int = 20,
+        visibility_timeout: int = 30,
+        idle_polls: int = 1,
+        resolve: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+        on_deleted: Optional[Callable[[List[str]], None]] = None,
+    ) -> None:
+        self.client = client
+        self.queue_url = queue_url
+        self.receivers = receivers
+        self.max_messages = max_messages
+        self.delete = delete
+        self.wait_time_seconds = wait_time_seconds
+        self.visibility_timeout = visibility_timeout
+        self.idle_polls = idle_polls
+        self.resolve = resolve
+        self.on_deleted = on_deleted
+        self.summary = ConsumeSummary()
+
+        self._buffer: "queue.Queue" = queue.Queue(maxsize=max_buffered)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._held: Dict[str, str] = {}
+        self._pending_deletes: List[str] = []
+        self._reserved = 0
+        self._live_receivers = 0
+        self._consumers = 0
+        self._threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self._start_time = 0.0
+
+    def run(self, handler: Callable[[Dict], None], workers: int = 4) -> ConsumeSummary:
+        self._start(consumers=workers)
+        worker_threads = [
+            threading.Thread(target=self._work, args=(handler,), daemon=True)
+            for _ in range(workers)
+        ]
+        for thread in worker_threads:
+            thread.start()
+        try:
+            for thread in worker_threads:
+                thread.join()
+        finally:
+            self._finish()
+        return self.summary
+
+    def messages(self) -> Generator[Dict, None, None]:
+        self._start(consumers=1)
+        try:
+            while True:
+                message = self._next()
+                if message is None:
+                    break
+                yield message
+                self._ack(message)
+        finally:
+            self._finish()
+
+    def _start(self, consumers: int) -> None:
+        self._start_time = time.perf_counter()
+        self._consumers = consumers
+        self._live_receivers = self.receivers
+        self._threads = [
+            threading.Thread(target=self._receive_loop, daemon=True)
+            for _ in range(self.receivers)
+        ]
+        if self.visibility_timeout > 0:
+            self._threads.append(
+                threading.Thread(target=self._heartbeat_loop, daemon=True)
+            )
+        for thread in self._threads:
+            thread.start()
+
+    def _finish(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._flush_deletes(force=True)
+        self.summary.seconds = time.perf_counter() - self._start_time
+        if self._error:
+            raise self._error
+
+    def _next(self) -> Optional[Dict]:
+        while True:
+            try:
+                item = self._buffer.get(timeout=self.PUT_TIMEOUT)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+                continue
+            return None if item is self._STOP else item
+
+    def _work(self, handler: Callable[[Dict], None]) -> None:
+        while True:
+            message = self._next()
+            if message is None:
+                return
+            try:
+                handler(message)
+            except Exception as e:
+                logger.warning("Handler failed for message %s: %s", message.get("MessageId"), e)
+                with self._lock:
+                    self._held.pop(message["ReceiptHandle"], None)
+                    self.summary.failed += 1
+                continue
+            self._ack(message)
+
+    def _ack(self, message: Dict) -> None:
+        with self._lock:
+            self._held.pop(message["ReceiptHandle"], None)
+            self.summary.processed += 1
+            if self.delete:
+                self._pending_deletes.append(message["ReceiptHandle"])
+        self._flush_deletes()
+
+    def _flush_deletes(self, force: bool = False) -> None:
+        while True:
+            with self._lock:
+                if not self._pending_deletes or (
+                    not force and len(self._pending_deletes) < self.MAX_BATCH_SIZE
+                ):
+                    return
+                batch = self._pending_deletes[: self.MAX_BATCH_SIZE]
+                del self._pending_deletes[: self.MAX_BATCH_SIZE]
+            self._delete_batch(batch)
+
+    def _delete_batch(self, receipts: List[str]) -> None:
+        response = self.client.delete_message_batch(
+            QueueUrl=self.queue_url,
+            Entries=[{"Id": str(i), "ReceiptHandle": r} for i, r in enumerate(receipts)],
+        )
+        for failure in response.get("Failed", []):
+            logger.warning("Failed to delete message: %s", failure)
+        deleted = [receipts[int(entry["Id"])] for entry in response.get("Successful", [])]
+        with self._lock:
+            self.summary.deleted += len(deleted)
+        if deleted and self.on_deleted is not None:
+            try:
+                self.on_deleted(deleted)
+            except Exception as e:
+                logger.warning("Post-delete hook failed: %s", e)
+
+    def _reserve(self) -> int:
+        with self._lock:
+            if self.max_messages is None:
+                return self.MAX_BATCH_SIZE
+            count = min(self.MAX_BATCH_SIZE, self.max_messages - self._reserved)
+            self._reserved += count
+            return count
+
+    def _receive_loop(self) -> None:
+        idle = 0
+        try:
+            while not self._stop.is_set() and idle < self.idle_polls:
+                count = self._reserve()
+                if count <= 0:
+                    break
+                response = self.client.receive_message(
+                    QueueUrl=self.queue_url,
+                    MaxNumberOfMessages=count,
+                    WaitTimeSeconds=self.wait_time_seconds,
+                    VisibilityTimeout=self.visibility_timeout,
+                    AttributeNames=["All"],
+                    MessageAttributeNames=["All"],
+                )
+                received = response.get("Messages", [])
+                messages = self.resolve(received) if received and self.resolve else received
+                with self._lock:
+                    self._reserved -= count - len(received)
+                    self.summary.received += len(received)
+                    self.summary.failed += len(received) - len(messages)
+                    for message in messages:
+                        self._held[message["ReceiptHandle"]] = message["MessageId"]
+                idle = 0 if received else idle + 1
+                for message in messages:
+                    if not self._put(message):
+                        return
+        except Exception as e:
+            with self._lock:
+                self._error = self._error or e
+            self._stop.set()
+        finally:
+            self._receiver_done()
+
+    def _receiver_done(self) -> None:
+        with self._lock:
+            self._live_receivers -= 1
+            last = self._live_receivers == 0
+        if last:
+            for _ in range(self._consumers):
+                self._put(self._STOP)
+
+    def _put(self, item: object) -> bool:
+        while True:
+            try:
+                self._buffer.put(item, timeout=self.PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.visibility_timeout / 2):
+            with self._lock:
+                receipts = list(self._held)
+            for i in range(0, len(receipts), self.MAX_BATCH_SIZE):
+                entries = [
+                    {"Id": str(j), "ReceiptHandle": r,
+                     "VisibilityTimeout": self.visibility_timeout}
+                    for j, r in enumerate(receipts[i : i + self.MAX_BATCH_SIZE])
+                ]
+                try:
+                    self.client.change_message_visibility_batch(
+                        QueueUrl=self.queue_url, Entries=entries
+                    )
+                except Exception as e:
+                    logger.warning("Failed to extend visibility timeout: %s", e)
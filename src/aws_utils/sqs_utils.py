@@ -1,29 +1,151 @@
+import hashlib
+import json
+import sys
+import time
 import webbrowser
-from typing import Dict, List, Optional
-from configuration import ConfigurationManager
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import (Any, Callable, Deque, Dict, Generator, Iterable, Iterator, List, Optional,
+                    Set, TextIO, Tuple)
+from .client_cache import client_cache
+from .codec import BodyCodec, decode_message
+from .configuration import ConfigurationManager
+from .log import ThroughputLog, get_logger
+from .progress import Progress
+from .sqs_consumer import ConsumeSummary, QueueConsumer
+from .throttling import backoff_delay, is_throttle_error, rate_controller
 import boto3
+import jmespath
+
+logger = get_logger("SQSUtils")
+
+
+@dataclass
+class SendSummary:
+    sent: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class QueueMetrics:
+    queue_url: str
+    visible: int = 0
+    in_flight: int = 0
+    delayed: int = 0
+    error: str = ""
+
+    @property
+    def name(self) -> str:
+        return self.queue_url.split("/")[-1]
+
+    @property
+    def backlog(self) -> int:
+        return self.visible + self.in_flight + self.delayed
+
+
+@dataclass
+class ScanSummary:
+    scanned: int = 0
+    matched: int = 0
+    duplicates: int = 0
+    seconds: float = 0.0
 
 
 class SQSUtils:
     MAX_BATCH_SIZE = 10
+    MAX_BATCH_BYTES = 256 * 1024
+    DEFAULT_MAX_IN_FLIGHT = 8
+    MAX_SEND_RETRIES = 3
+    RETRY_BASE_DELAY = 0.1
+    DEFAULT_RECEIVERS = 4
+    DEFAULT_CONSUMER_WORKERS = 4
+    DEFAULT_MAX_BUFFERED = 100
+    LONG_POLL_SECONDS = 20
+    DEFAULT_VISIBILITY_TIMEOUT = 30
+    SCAN_VISIBILITY_TIMEOUT = 120
+    SCAN_WAIT_SECONDS = 2
+    QUEUE_CACHE_TTL = 60
+    LIST_QUEUES_PAGE_SIZE = 1000
     CONSOLE_URL_TEMPLATE = "https://{region}.console.aws.amazon.com/sqs/v2/home?region={region}#/queues/{queue_name}"
     ALL_ATTRIBUTES = ["All"]
     MSG_COUNT_ATTRIBUTE = ["ApproximateNumberOfMessages"]
+    METRIC_ATTRIBUTES = [
+        "ApproximateNumberOfMessages",
+        "ApproximateNumberOfMessagesNotVisible",
+        "ApproximateNumberOfMessagesDelayed",
+    ]
+    DEFAULT_METRICS_CONCURRENCY = 16
 
-    def __init__(self, session: Optional[boto3.Session] = None) -> None:
-        self.client = (session or boto3.Session()).client("sqs")
+    def __init__(
+        self, session: Optional[boto3.Session] = None, codec: Optional[BodyCodec] = None
+    ) -> None:
+        self.session = session
+        self.codec = codec
+        self.client = client_cache.get_client("sqs", session)
         self.config_manager = ConfigurationManager()
+        self._queue_cache: Dict[str, Tuple[float, List[str]]] = {}
 
-    def list_queues(self) -> List[str]:
+    def get_queues(self, prefix: str = "", refresh: bool = False) -> List[str]:
+        if not refresh:
+            cached = self._cached_queues(prefix)
+            if cached is not None:
+                return cached
 
-        response = self.client.list_queues()
-        list_queues = response.get("QueueUrls", [])
-        while response.get("NextToken"):
-            response = self.client.list_queues(NextToken=response["NextToken"])
-            list_queues.extend(response.get("QueueUrls", []))
+        queue_urls: List[str] = []
+        kwargs: Dict[str, Any] = {"MaxResults": self.LIST_QUEUES_PAGE_SIZE}
+        if prefix:
+            kwargs["QueueNamePrefix"] = prefix
+        while True:
+            response = self.client.list_queues(**kwargs)
+            queue_urls.extend(response.get("QueueUrls", []))
+            if not response.get("NextToken"):
+                break
+            kwargs["NextToken"] = response["NextToken"]
 
-        return [(queue,queue.split("/")[-1]) for queue in list_queues]
+        self._queue_cache[prefix] = (time.monotonic(), queue_urls)
+        return list(queue_urls)
 
+    def list_queues(self, prefix: str = "", refresh: bool = False) -> List[Tuple[str, str]]:
+        return [(queue, self._queue_name(queue)) for queue in self.get_queues(prefix, refresh)]
+
+    def _scale_pool(self, workers: int) -> None:
+        self.client = client_cache.get_client("sqs", self.session, workers)
+
+    def invalidate_queue_cache(self) -> None:
+        self._queue_cache.clear()
+
+    def _cached_queues(self, prefix: str) -> Optional[List[str]]:
+        now = time.monotonic()
+        for cached_prefix, (fetched_at, queue_urls) in list(self._queue_cache.items()):
+            if now - fetched_at < self.QUEUE_CACHE_TTL and prefix.startswith(cached_prefix):
+                return [q for q in queue_urls if self._queue_name(q).startswith(prefix)]
+        return None
+
+    @staticmethod
+    def _queue_name(queue_url: str) -> str:
+        return queue_url.split("/")[-1]
+
+    def get_queue_url(self, queue_name: str) -> str:
+        return self.client.get_queue_url(QueueName=queue_name)["QueueUrl"]
+
+    def create_queue(self, queue_name: str,
+                     attributes: Optional[Dict[str, str]] = None) -> str:
+        response = self.client.create_queue(
+            QueueName=queue_name, Attributes=attributes or {}
+        )
+        self.invalidate_queue_cache()
+        return response["QueueUrl"]
+
+    def delete_queue(self, queue_url: str) -> None:
+        self.client.delete_queue(QueueUrl=queue_url)
+        self.invalidate_queue_cache()
 
     def get_message_count(self, queue_url: Optional[str] = None) -> int:
         if not queue_url:
@@ -33,7 +155,56 @@ class SQSUtils:
         )
         return int(attrs["Attributes"]["ApproximateNumberOfMessages"])
 
-    def open_in_console(self, queue_url: Optional[Optional] = None,
+    def get_queue_metrics(
+        self,
+        queue_urls: Optional[List[str]] = None,
+        max_workers: int = DEFAULT_METRICS_CONCURRENCY,
+    ) -> List[QueueMetrics]:
+        if queue_urls is None:
+            queue_urls = self.get_queues()
+        if not queue_urls:
+            return []
+
+        self._scale_pool(max_workers)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(queue_urls))) as executor:
+            metrics = list(executor.map(self._fetch_queue_metrics, queue_urls))
+        return sorted(metrics, key=lambda m: (m.backlog, m.visible), reverse=True)
+
+    def watch_queue_metrics(
+        self,
+        interval: float,
+        queue_urls: Optional[List[str]] = None,
+        max_workers: int = DEFAULT_METRICS_CONCURRENCY,
+        iterations: Optional[int] = None,
+    ) -> Iterator[Tuple[List[QueueMetrics], List[QueueMetrics]]]:
+        previous: Dict[str, QueueMetrics] = {}
+        count = 0
+        while iterations is None or count < iterations:
+            if count:
+                time.sleep(interval)
+            metrics = self.get_queue_metrics(queue_urls, max_workers)
+            changed = [m for m in metrics if previous.get(m.queue_url) != m]
+            previous = {m.queue_url: m for m in metrics}
+            count += 1
+            yield metrics, changed
+
+    def _fetch_queue_metrics(self, queue_url: str) -> QueueMetrics:
+        try:
+            response = self.client.get_queue_attributes(
+                QueueUrl=queue_url, AttributeNames=self.METRIC_ATTRIBUTES
+            )
+        except Exception as e:
+            return QueueMetrics(queue_url, error=str(e))
+
+        attrs = response.get("Attributes", {})
+        return QueueMetrics(
+            queue_url,
+            visible=int(attrs.get("ApproximateNumberOfMessages", 0)),
+            in_flight=int(attrs.get("ApproximateNumberOfMessagesNotVisible", 0)),
+            delayed=int(attrs.get("ApproximateNumberOfMessagesDelayed", 0)),
+        )
+
+    def open_in_console(self, queue_url: Optional[str] = None,
                         region: Optional[str] = None) -> None:
 
         if not queue_url:
@@ -41,7 +212,7 @@ class SQSUtils:
         if not region:
             region = self.config_manager.load_config().region
 
-        queue_name = queue_url.split("/")[-1]
+        queue_name = self._queue_name(queue_url)
         console_url = self.CONSOLE_URL_TEMPLATE.format(
             region=region, queue_name=queue_name
         )
@@ -54,29 +225,451 @@ class SQSUtils:
         return response.get("Attributes", {})
 
     def purge(self, queue_url: str) -> None:
-        self.client.pu(QueueUrl=queue_url)
+        self.client.purge_queue(QueueUrl=queue_url)
 
     def receive_messages(self, queue_url: str) -> List[Dict]:
         response = self.client.receive_message(
             QueueUrl=queue_url,
             MaxNumberOfMessages=self.MAX_BATCH_SIZE,
             WaitTimeSeconds=2,
+            MessageAttributeNames=["All"],
+        )
+        return self._resolve_messages(response.get("Messages", []))
+
+    def delete_message(self, queue_url: str, receipt_handle: str) -> None:
+        self.client.delete_message(QueueUrl=queue_url, ReceiptHandle=receipt_handle)
+        self._on_deleted([receipt_handle])
+
+    def _resolve_messages(self, messages: List[Dict]) -> List[Dict]:
+        decoded = []
+        for message in messages:
+            try:
+                decoded.append(decode_message(message))
+            except (ValueError, OSError, EOFError, zlib.error) as e:
+                logger.warning("Failed to decode message %s: %s", message.get("MessageId"), e)
+                decoded.append(message)
+        return decoded
+
+    def _on_deleted(self, receipt_handles: List[str]) -> None:
+        pass
+
+    def _make_consumer(self, queue_url: str, **kwargs: Any) -> QueueConsumer:
+        return QueueConsumer(
+            self.client, queue_url, resolve=self._resolve_messages,
+            on_deleted=self._on_deleted, **kwargs
+        )
+
+    def consume(
+        self,
+        queue_url: str,
+        handler: Callable[[Dict], None],
+        workers: int = DEFAULT_CONSUMER_WORKERS,
+        receivers: int = DEFAULT_RECEIVERS,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+        max_messages: Optional[int] = None,
+        wait_time_seconds: int = LONG_POLL_SECONDS,
+        visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+    ) -> ConsumeSummary:
+        self._scale_pool(receivers + workers + 1)
+        consumer = self._make_consumer(
+            queue_url, receivers=receivers, max_buffered=max_buffered,
+            max_messages=max_messages, wait_time_seconds=wait_time_seconds,
+            visibility_timeout=visibility_timeout,
+        )
+        summary = consumer.run(handler, workers)
+        logger.info(
+            "Processed %d messages, %d failed (%.1f msgs/s)",
+            summary.processed, summary.failed, summary.messages_per_second,
+        )
+        return summary
+
+    def iter_messages(
+        self,
+        queue_url: str,
+        receivers: int = DEFAULT_RECEIVERS,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+        max_messages: Optional[int] = None,
+        delete: bool = True,
+        wait_time_seconds: int = LONG_POLL_SECONDS,
+        visibility_timeout: int = DEFAULT_VISIBILITY_TIMEOUT,
+    ) -> Generator[Dict, None, None]:
+        self._scale_pool(receivers + 2)
+        consumer = self._make_consumer(
+            queue_url, receivers=receivers, max_buffered=max_buffered,
+            max_messages=max_messages, delete=delete,
+            wait_time_seconds=wait_time_seconds, visibility_timeout=visibility_timeout,
+        )
+        return consumer.messages()
+
+    def scan_messages(
+        self,
+        queue_url: str,
+        output: Optional[TextIO] = None,
+        max_messages: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        body_contains: Optional[str] = None,
+        jmespath_filter: Optional[str] = None,
+        visibility_timeout: int = SCAN_VISIBILITY_TIMEOUT,
+        receivers: int = DEFAULT_RECEIVERS,
+    ) -> ScanSummary:
+        output = output or sys.stdout
+        matches = self._build_message_filter(body_contains, jmespath_filter)
+        summary = ScanSummary()
+        seen: Set[str] = set()
+        start = time.perf_counter()
+
+        messages = self.iter_messages(
+            queue_url, receivers=receivers, delete=False,
+            wait_time_seconds=self.SCAN_WAIT_SECONDS,
+            visibility_timeout=visibility_timeout,
         )
-        return response.get("Messages", [])
+        try:
+            for message in messages:
+                if message["MessageId"] in seen:
+                    summary.duplicates += 1
+                else:
+                    seen.add(message["MessageId"])
+                    summary.scanned += 1
+                    if matches(message):
+                        summary.matched += 1
+                        record = {k: v for k, v in message.items() if k != "ReceiptHandle"}
+                        output.write(json.dumps(record) + "\n")
 
-    def send_message(self, queue_url: str, body: str) -> None:
-        response = self.client.send_message(QueueUrl=queue_url, MessageBody=body)
-        print(f"[SQSUtils] Send message response: {response}")
+                if max_messages is not None and summary.scanned >= max_messages:
+                    break
+                if max_seconds is not None and time.perf_counter() - start >= max_seconds:
+                    break
+        finally:
+            messages.close()
+            output.flush()
+
+        summary.seconds = time.perf_counter() - start
+        return summary
+
+    @staticmethod
+    def _build_message_filter(
+        body_contains: Optional[str], jmespath_filter: Optional[str]
+    ) -> Callable[[Dict], bool]:
+        expression = jmespath.compile(jmespath_filter) if jmespath_filter else None
+
+        def matches(message: Dict) -> bool:
+            body = message.get("Body", "")
+            if body_contains and body_contains not in body:
+                return False
+            if expression is None:
+                return True
+            try:
+                return bool(expression.search(json.loads(body)))
+            except ValueError:
+                return False
+
+        return matches
+
+    @staticmethod
+    def is_fifo(queue_url: str) -> bool:
+        return queue_url.endswith(".fifo")
+
+    @staticmethod
+    def deduplication_id(body: str) -> str:
+        return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+    def send_message(self, queue_url: str, body: str, group_id: Optional[str] = None,
+                     deduplication_id: Optional[str] = None) -> None:
+        entry: Dict[str, Any] = {"MessageBody": body}
+        if group_id:
+            entry["MessageGroupId"] = group_id
+            entry["MessageDeduplicationId"] = deduplication_id or self.deduplication_id(body)
+        entry = self._prepare_entries(list(self._encode_entries([entry])))[0]
+        response = self.client.send_message(QueueUrl=queue_url, **entry)
+        logger.debug("Send message response: %s", response)
+
+    def send_messages_from_file(
+        self,
+        queue_url: str,
+        file_path: str,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        progress: Optional[Progress] = None,
+        group_id: Optional[str] = None,
+    ) -> SendSummary:
+        if self.is_fifo(queue_url):
+            return self.send_fifo_messages_from_file(
+                queue_url, file_path, max_in_flight, progress, group_id
+            )
+
+        summary = SendSummary()
+        start = time.perf_counter()
+        self._scale_pool(max_in_flight)
+        pending: Deque[Future] = deque()
+        if progress is not None and progress.total is None:
+            with open(file_path, "r") as f:
+                progress.set_total(sum(1 for line in f if line.strip()))
+        tracker = progress or ThroughputLog(logger, "send", unit="msgs")
+
+        def collect(future: Future) -> None:
+            tracker.add(sum(self._add_to_summary(summary, future)))
+
+        with open(file_path, "r") as f, \
+                ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            entries = ({"MessageBody": line} for line in map(str.strip, f) if line)
+            for batch in self._pack_batches(entries):
+                pending.append(executor.submit(self._send_batch, queue_url, batch))
+                if len(pending) >= max_in_flight * 2:
+                    collect(pending.popleft())
+            while pending:
+                collect(pending.popleft())
+
+        tracker.close()
+        summary.seconds = time.perf_counter() - start
+        logger.info(
+            "Sent %d messages, %d failed (%.1f msgs/s)",
+            summary.sent, summary.failed, summary.messages_per_second,
+        )
+        return summary
+
+    @staticmethod
+    def _add_to_summary(summary: SendSummary, future: Future) -> Tuple[int, int]:
+        sent, failed = future.result()
+        summary.sent += sent
+        summary.failed += failed
+        return sent, failed
+
+    @staticmethod
+    def _entry_size(entry: Dict) -> int:
+        size = len(entry["MessageBody"].encode("utf-8"))
+        for name, value in (entry.get("MessageAttributes") or {}).items():
+            size += len(name) + len(value.get("DataType", ""))
+            size += len(value.get("StringValue", "")) + len(value.get("BinaryValue", b""))
+        return size
+
+    def _wire_size(self, entry: Dict) -> int:
+        return self._entry_size(entry)
+
+    def _encode_entries(self, entries: Iterable[Dict]) -> Iterable[Dict]:
+        return entries if self.codec is None else map(self.codec.encode, entries)
+
+    def _prepare_entries(self, entries: List[Dict]) -> List[Dict]:
+        return entries
+
+    def _pack_batches(self, entries: Iterable[Dict]) -> Iterator[List[Dict]]:
+        batch: List[Dict] = []
+        batch_bytes = 0
+        for entry in self._encode_entries(entries):
+            size = self._wire_size(entry)
+            if batch and (len(batch) == self.MAX_BATCH_SIZE
+                          or batch_bytes + size > self.MAX_BATCH_BYTES):
+                yield batch
+                batch, batch_bytes = [], 0
+            entry["Id"] = str(len(batch))
+            batch.append(entry)
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    def _send_batch(self, queue_url: str, batch: List[Dict]) -> Tuple[int, int]:
+        sent = failed = 0
+        entries = []
+        for entry in batch:
+            if self._wire_size(entry) > self.MAX_BATCH_BYTES:
+                logger.warning("Message exceeds %d bytes, skipping", self.MAX_BATCH_BYTES)
+                failed += 1
+            else:
+                entries.append(entry)
+        entries = self._prepare_entries(entries)
+
+        for attempt in range(self.MAX_SEND_RETRIES + 1):
+            if not entries:
+                break
+            if attempt:
+                time.sleep(backoff_delay(attempt, self.RETRY_BASE_DELAY))
+            response = self.client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            sent += len(response.get("Successful", []))
+            throttled = sum(
+                1 for f in response.get("Failed", []) if is_throttle_error(f.get("Code"))
+            )
+            if throttled:
+                rate_controller.record_throttle("sqs", "SendMessageBatch", throttled,
+                                                rate_controller.scope(self.client))
+
+            by_id = {e["Id"]: e for e in entries}
+            entries = []
+            for failure in response.get("Failed", []):
+                if failure.get("SenderFault") or attempt == self.MAX_SEND_RETRIES:
+                    logger.warning("Failed to send message: %s", failure)
+                    failed += 1
+                else:
+                    entries.append(by_id[failure["Id"]])
+        return sent, failed
+
+    def send_fifo_messages_from_file(
+        self,
+        queue_url: str,
+        file_path: str,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        progress: Optional[Progress] = None,
+        group_id: Optional[str] = None,
+    ) -> SendSummary:
+        summary = SendSummary()
+        start = time.perf_counter()
+        self._scale_pool(max_in_flight)
+        if progress is not None and progress.total is None:
+            with open(file_path, "r") as f:
+                progress.set_total(sum(1 for line in f if line.strip()))
+        tracker = progress or ThroughputLog(logger, "send", unit="msgs")
+
+        def entries(lines: Iterable[str]) -> Iterator[Dict]:
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                entry = self._fifo_entry(line, group_id)
+                if entry is None:
+                    logger.warning("Line %d has no message group id, skipping", number)
+                    summary.failed += 1
+                    tracker.add(1)
+                    continue
+                yield entry
 
-    def send_messages_from_file(self, queue_url: str, file_path: str) -> None:
         with open(file_path, "r") as f:
-            lines = [line.strip() for line in f if line.strip()]
+            self._send_grouped(queue_url, entries(f), max_in_flight, summary, tracker)
+
+        tracker.close()
+        summary.seconds = time.perf_counter() - start
+        logger.info(
+            "Sent %d FIFO messages, %d failed (%.1f msgs/s)",
+            summary.sent, summary.failed, summary.messages_per_second,
+        )
+        return summary
+
+    def _fifo_entry(self, line: str, group_id: Optional[str]) -> Optional[Dict]:
+        body: Any = line
+        dedup_id = None
+        if line.startswith("{"):
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                data = None
+            if isinstance(data, dict) and "body" in data:
+                body = data["body"]
+                group_id = data.get("group_id") or group_id
+                dedup_id = data.get("dedup_id")
+        if not group_id:
+            return None
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        return {
+            "MessageBody": body,
+            "MessageGroupId": str(group_id),
+            "MessageDeduplicationId": str(dedup_id or self.deduplication_id(body)),
+        }
+
+    def _send_grouped(
+        self,
+        queue_url: str,
+        entries: Iterable[Dict],
+        max_in_flight: int,
+        summary: SendSummary,
+        tracker: Any,
+    ) -> None:
+        open_batches: Dict[str, Tuple[List[Dict], int]] = {}
+        queued: Dict[str, Deque[List[Dict]]] = {}
+        in_flight: Dict[Future, str] = {}
+        max_buffered = max_in_flight * 4
+
+        def enqueue(group: str, batch: List[Dict]) -> None:
+            queued.setdefault(group, deque()).append(batch)
+
+        def flush() -> None:
+            for group, (batch, _) in open_batches.items():
+                enqueue(group, batch)
+            open_batches.clear()
+
+        def dispatch(executor: ThreadPoolExecutor) -> None:
+            busy = set(in_flight.values())
+            for group, batches in list(queued.items()):
+                if len(in_flight) >= max_in_flight:
+                    return
+                if group in busy:
+                    continue
+                future = executor.submit(self._send_fifo_batch, queue_url, batches.popleft())
+                in_flight[future] = group
+                if not batches:
+                    del queued[group]
+
+        def collect(block: bool) -> None:
+            done, _ = wait(list(in_flight), timeout=None if block else 0,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                del in_flight[future]
+                tracker.add(sum(self._add_to_summary(summary, future)))
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for entry in self._encode_entries(entries):
+                group = entry["MessageGroupId"]
+                batch, batch_bytes = open_batches.get(group, ([], 0))
+                size = self._wire_size(entry)
+                if batch and (len(batch) == self.MAX_BATCH_SIZE
+                              or batch_bytes + size > self.MAX_BATCH_BYTES):
+                    enqueue(group, batch)
+                    batch, batch_bytes = [], 0
+                entry["Id"] = str(len(batch))
+                batch.append(entry)
+                open_batches[group] = (batch, batch_bytes + size)
+
+                if len(open_batches) > max_buffered:
+                    flush()
+                if in_flight:
+                    collect(block=False)
+                dispatch(executor)
+                while sum(len(b) for b in queued.values()) > max_buffered:
+                    collect(block=True)
+                    dispatch(executor)
+
+            flush()
+            dispatch(executor)
+            while in_flight:
+                collect(block=True)
+                dispatch(executor)
+
+    def _send_fifo_batch(self, queue_url: str, batch: List[Dict]) -> Tuple[int, int]:
+        sent = failed = 0
+        entries = []
+        for entry in batch:
+            if self._wire_size(entry) > self.MAX_BATCH_BYTES:
+                logger.warning("Message exceeds %d bytes, skipping", self.MAX_BATCH_BYTES)
+                failed += 1
+            else:
+                entries.append(entry)
+        entries = self._prepare_entries(entries)
 
-        entries = [{"Id": str(i), "MessageBody": line} for i, line in enumerate(lines)]
+        for attempt in range(self.MAX_SEND_RETRIES + 1):
+            if not entries:
+                break
+            if attempt:
+                time.sleep(backoff_delay(attempt, self.RETRY_BASE_DELAY))
+            response = self.client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            failures = {f["Id"]: f for f in response.get("Failed", [])}
+            throttled = sum(1 for f in failures.values() if is_throttle_error(f.get("Code")))
+            if throttled:
+                rate_controller.record_throttle("sqs", "SendMessageBatch", throttled,
+                                                rate_controller.scope(self.client))
+            if not failures:
+                sent += len(entries)
+                break
+            if attempt == self.MAX_SEND_RETRIES:
+                for failure in failures.values():
+                    logger.warning("Failed to send message: %s", failure)
+                sent += len(entries) - len(failures)
+                failed += len(failures)
+                break
 
-        for batch in self._get_batches(entries):
-            response = self.client.send_message_batch(QueueUrl=queue_url, Entries=batch)
-            print(f"[SQSUtils] Send message response: {response}")
+            first = next(i for i, e in enumerate(entries) if e["Id"] in failures)
+            sent += first
+            entries = entries[first:]
+            if failures[entries[0]["Id"]].get("SenderFault"):
+                logger.warning("Failed to send message: %s", failures[entries[0]["Id"]])
+                failed += 1
+                entries = entries[1:]
+        return sent, failed
 
     def _get_batches(self, entries: List[Dict]) -> List[List[Dict]]:
         return [
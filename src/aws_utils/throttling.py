@@ -0,0 +1,323 @@
+import random
+import threading
+import time
+import weakref
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+THROTTLE_ERROR_CODES = frozenset(
+    {
+        "SlowDown",
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottled",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "RequestLimitExceeded",
+        "ProvisionedThroughputExceededException",
+        "BandwidthLimitExceeded",
+        "EC2ThrottledException",
+        "PriorRequestNotComplete",
+        "TransactionInProgressException",
+    }
+)
+
+DEFAULT_BACKOFF_BASE = 0.1
+DEFAULT_BACKOFF_CAP = 20.0
+
+Scope = Tuple[str, str]
+LimiterKey = Tuple[str, str, str]
+
+
+def is_throttle_error(code: Optional[str]) -> bool:
+    return code in THROTTLE_ERROR_CODES
+
+
+def backoff_delay(
+    attempt: int, base: float = DEFAULT_BACKOFF_BASE, cap: float = DEFAULT_BACKOFF_CAP
+) -> float:
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        wait = self.try_acquire(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class AIMDLimiter:
+    DECREASE_FACTOR = 0.5
+    DECREASE_COOLDOWN = 0.5
+
+    def __init__(self, initial: float = 64, minimum: float = 1, maximum: float = 64) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> float:
+        start = time.monotonic()
+        with self._condition:
+            while self._in_flight >= max(int(self._limit), 1):
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic() - start
+
+    def release(self) -> None:
+        with self._condition:
+            self._in_flight = max(self._in_flight - 1, 0)
+            self._condition.notify()
+
+    def on_success(self) -> None:
+        with self._condition:
+            if self._limit < self.maximum:
+                self._limit = min(self.maximum, self._limit + 1.0 / self._limit)
+                self._condition.notify()
+
+    def on_throttle(self) -> bool:
+        now = time.monotonic()
+        with self._condition:
+            if now - self._last_decrease < self.DECREASE_COOLDOWN:
+                return False
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.DECREASE_FACTOR)
+            return True
+
+
+@dataclass
+class ThrottleStats:
+    calls: int = 0
+    throttled: int = 0
+    retries: int = 0
+    waited_seconds: float = 0.0
+    concurrency_limit: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RateController:
+    CONTEXT_KEY = "aws_utils_rate_controller"
+    LONG_POLL_KEY = "aws_utils_long_poll"
+    DEFAULT_RATES: Dict[str, float] = {
+        "s3.PutObject": 3500,
+        "s3.UploadPart": 3500,
+        "s3.CopyObject": 3500,
+        "s3.DeleteObjects": 3500,
+        "s3.GetObject": 5500,
+        "s3.HeadObject": 5500,
+    }
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        initial_concurrency: int = 64,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+    ) -> None:
+        self.rates = dict(self.DEFAULT_RATES if rates is None else rates)
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+        self._limiters: Dict[LimiterKey, AIMDLimiter] = {}
+        self._stats: Dict[str, ThrottleStats] = {}
+        self._scopes: "weakref.WeakKeyDictionary[Any, Tuple[Scope, Optional[int]]]" = \
+            weakref.WeakKeyDictionary()
+
+    def set_rate(self, key: str, rate: Optional[float], capacity: Optional[float] = None) -> None:
+        with self._lock:
+            if rate is None:
+                self.rates.pop(key, None)
+                self._buckets[key] = None
+            else:
+                self.rates[key] = rate
+                self._buckets[key] = TokenBucket(rate, capacity)
+
+    def register(self, client: Any, profile: Optional[str] = None) -> Any:
+        scope = (client.meta.region_name or "", profile or "")
+        max_pool = getattr(client.meta.config, "max_pool_connections", None)
+        self._scopes[client] = (scope, max_pool)
+        events = client.meta.events
+        events.register("before-parameter-build.*.*", self._before_parameter_build)
+        events.register("before-call.*.*", partial(self._before_call, scope, max_pool))
+        events.register("needs-retry.*.*", partial(self._needs_retry, scope))
+        events.register("after-call.*.*", self._after_call)
+        events.register("after-call-error.*.*", self._after_call_error)
+        return client
+
+    def scope(self, client: Any) -> Scope:
+        registered = self._scopes.get(client)
+        if registered is not None:
+            return registered[0]
+        return getattr(client.meta, "region_name", None) or "", ""
+
+    def acquire(
+        self,
+        service: str,
+        operation: str,
+        scope: Scope = ("", ""),
+        max_concurrency: Optional[int] = None,
+        concurrent: bool = True,
+    ) -> Optional[LimiterKey]:
+        key = f"{service}.{operation}"
+        limiter, bucket, stats = self._lookup(service, key, scope, max_concurrency)
+        waited = limiter.acquire() if concurrent else 0.0
+        if bucket is not None:
+            waited += bucket.acquire()
+        with self._lock:
+            stats.calls += 1
+            stats.waited_seconds += waited
+        return (service,) + scope if concurrent else None
+
+    def release(self, limiter_key: LimiterKey, throttled: bool = False) -> None:
+        limiter = self._limiters.get(limiter_key)
+        if limiter is None:
+            return
+        if not throttled:
+            limiter.on_success()
+        limiter.release()
+
+    def record_throttle(self, service: str, operation: str, count: int = 1,
+                        scope: Scope = ("", "")) -> None:
+        key = f"{service}.{operation}"
+        limiter, _, stats = self._lookup(service, key, scope)
+        with self._lock:
+            stats.throttled += count
+        limiter.on_throttle()
+
+    def stats(self) -> Dict[str, ThrottleStats]:
+        with self._lock:
+            snapshot = {}
+            for key, stats in self._stats.items():
+                service = key.split(".", 1)[0]
+                limits = [limiter.limit for limiter_key, limiter in self._limiters.items()
+                          if limiter_key[0] == service]
+                snapshot[key] = ThrottleStats(
+                    calls=stats.calls,
+                    throttled=stats.throttled,
+                    retries=stats.retries,
+                    waited_seconds=stats.waited_seconds,
+                    concurrency_limit=min(limits, default=0),
+                )
+            return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._limiters.clear()
+            self._stats.clear()
+
+    def _lookup(
+        self, service: str, key: str, scope: Scope = ("", ""),
+        max_concurrency: Optional[int] = None,
+    ) -> Tuple[AIMDLimiter, Optional[TokenBucket], ThrottleStats]:
+        with self._lock:
+            limiter_key = (service,) + scope
+            limiter = self._limiters.get(limiter_key)
+            if limiter is None:
+                limiter = AIMDLimiter(
+                    self.initial_concurrency, self.min_concurrency,
+                    max_concurrency or self.max_concurrency,
+                )
+                self._limiters[limiter_key] = limiter
+            elif max_concurrency and max_concurrency > limiter.maximum:
+                limiter.maximum = max_concurrency
+            if key not in self._buckets:
+                rate = self.rates.get(key, self.rates.get(service))
+                self._buckets[key] = TokenBucket(rate) if rate else None
+            stats = self._stats.setdefault(key, ThrottleStats())
+            return limiter, self._buckets[key], stats
+
+    def _before_parameter_build(self, params: Optional[Dict] = None,
+                                context: Optional[Dict] = None, **kwargs: Any) -> None:
+        if context is not None and params and (params.get("WaitTimeSeconds") or 0) > 0:
+            context[self.LONG_POLL_KEY] = True
+
+    def _before_call(self, scope: Scope, max_concurrency: Optional[int], model: Any = None,
+                     context: Optional[Dict] = None, **kwargs: Any) -> None:
+        if context is None or model is None:
+            return
+        service = model.service_model.service_name
+        limiter_key = self.acquire(service, model.name, scope, max_concurrency,
+                                   concurrent=not context.pop(self.LONG_POLL_KEY, False))
+        if limiter_key is not None:
+            context[self.CONTEXT_KEY] = (limiter_key, False)
+
+    def _needs_retry(
+        self,
+        scope: Scope,
+        response: Any = None,
+        operation: Any = None,
+        attempts: int = 1,
+        caught_exception: Any = None,
+        request_dict: Optional[Dict] = None,
+        **kwargs: Any,
+    ) -> None:
+        if response is None or operation is None:
+            return
+        code = response[1].get("Error", {}).get("Code")
+        if not is_throttle_error(code):
+            return
+        service = operation.service_model.service_name
+        key = f"{service}.{operation.name}"
+        self.record_throttle(service, operation.name, scope=scope)
+        _, bucket, stats = self._lookup(service, key, scope)
+        with self._lock:
+            stats.retries += 1
+        context = (request_dict or {}).get("context")
+        if context is not None and self.CONTEXT_KEY in context:
+            context[self.CONTEXT_KEY] = (context[self.CONTEXT_KEY][0], True)
+        if bucket is not None:
+            waited = bucket.acquire()
+            with self._lock:
+                stats.waited_seconds += waited
+
+    def _after_call(self, context: Optional[Dict] = None, **kwargs: Any) -> None:
+        self._finish(context)
+
+    def _after_call_error(self, context: Optional[Dict] = None, **kwargs: Any) -> None:
+        self._finish(context)
+
+    def _finish(self, context: Optional[Dict]) -> None:
+        if not context or self.CONTEXT_KEY not in context:
+            return
+        limiter_key, throttled = context.pop(self.CONTEXT_KEY)
+        self.release(limiter_key, throttled)
+
+
+rate_controller = RateController()
@@ -2,6 +2,21 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from src.aws_utils.client_cache import client_cache
+from src.aws_utils.instrumentation import instrumentation
+from src.aws_utils.throttling import rate_controller
+
+
+@pytest.fixture(autouse=True)
+def clear_client_cache():
+    client_cache.clear()
+    rate_controller.reset()
+    instrumentation.reset()
+    yield
+    client_cache.clear()
+    rate_controller.reset()
+    instrumentation.reset()
+
 
 @pytest.fixture
 def mock_session():
@@ -0,0 +1,270 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.aws_utils.async_utils import AsyncS3Utils, AsyncSQSUtils
+
+
+class ConcurrencyProbe:
+    def __init__(self, delay=0.05, result=None):
+        self.delay = delay
+        self.result = result
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return self.result(*args, **kwargs) if callable(self.result) else self.result
+
+
+@pytest.fixture
+def mock_client():
+    with patch("boto3.Session") as mock_session:
+        client = Mock()
+        mock_session.return_value.client.return_value = client
+        client.meta.region_name = "us-east-1"
+        yield client
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class TestGatherBounded:
+    def test_pulls_calls_lazily_and_keeps_order(self, mock_client):
+        pulled = []
+        seen = {}
+
+        def work(i):
+            seen[i] = len(pulled)
+            time.sleep(0.01 * (i % 3))
+            return i * 2
+
+        def calls():
+            for i in range(20):
+                pulled.append(i)
+                yield work, (i,)
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                return await sqs._gather_bounded(3, calls())
+
+        assert run(main()) == [i * 2 for i in range(20)]
+        assert all(count <= i + 3 for i, count in seen.items())
+
+
+class TestAsyncSQSUtils:
+    def test_send_messages_runs_batches_concurrently(self, mock_client):
+        probe = ConcurrencyProbe(
+            result=lambda **kw: {"Successful": [{"Id": e["Id"]} for e in kw["Entries"]]}
+        )
+        mock_client.send_message_batch.side_effect = probe
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                return await sqs.send_messages("queue-url", (f"m{i}" for i in range(80)),
+                                               max_in_flight=8)
+
+        summary = run(main())
+
+        assert summary.sent == 80
+        assert mock_client.send_message_batch.call_count == 8
+        assert probe.peak == 8
+
+    def test_send_messages_respects_max_in_flight(self, mock_client):
+        probe = ConcurrencyProbe(result={"Successful": []})
+        mock_client.send_message_batch.side_effect = probe
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                await sqs.send_messages("queue-url", (f"m{i}" for i in range(100)),
+                                        max_in_flight=3)
+
+        run(main())
+
+        assert probe.peak == 3
+
+    def test_get_queue_metrics_gathers(self, mock_client):
+        probe = ConcurrencyProbe(result=lambda **kw: {"Attributes": {
+            "ApproximateNumberOfMessages": kw["QueueUrl"][-1],
+        }})
+        mock_client.get_queue_attributes.side_effect = probe
+        urls = [f"https://sqs/q{i}" for i in range(6)]
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                return await sqs.get_queue_metrics(urls)
+
+        metrics = run(main())
+
+        assert [m.name for m in metrics] == [f"q{i}" for i in reversed(range(6))]
+        assert probe.peak == 6
+
+    def test_many_operations_share_loop(self, mock_client):
+        mock_client.get_queue_attributes.side_effect = ConcurrencyProbe(
+            delay=0.1, result={"Attributes": {"ApproximateNumberOfMessages": "1"}}
+        )
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                start = time.perf_counter()
+                counts = await asyncio.gather(
+                    *(sqs.get_message_count(f"q{i}") for i in range(10))
+                )
+                return counts, time.perf_counter() - start
+
+        counts, elapsed = run(main())
+
+        assert counts == [1] * 10
+        assert elapsed < 0.5
+
+    def test_consume_handles_and_deletes(self, mock_client):
+        messages = [{"MessageId": str(i), "ReceiptHandle": f"r{i}", "Body": str(i)}
+                    for i in range(12)]
+        mock_client.receive_message.side_effect = [
+            {"Messages": messages[:10]},
+            {"Messages": messages[10:]},
+            {},
+        ]
+        mock_client.delete_message_batch.side_effect = lambda **kw: {
+            "Successful": [{"Id": e["Id"]} for e in kw["Entries"]]
+        }
+        active = {"now": 0, "peak": 0}
+        seen = []
+
+        async def handler(message):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            if message["Body"] == "3":
+                raise ValueError("boom")
+            seen.append(message["Body"])
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                return await sqs.consume("queue-url", handler, workers=4)
+
+        summary = run(main())
+
+        assert summary.received == 12
+        assert summary.processed == 11
+        assert summary.failed == 1
+        assert summary.deleted == 11
+        assert active["peak"] == 4
+        assert "3" not in seen
+
+    def test_consume_extends_visibility_for_slow_handlers(self, mock_client):
+        mock_client.receive_message.side_effect = [
+            {"Messages": [{"MessageId": "1", "ReceiptHandle": "r1", "Body": "slow"}]}, {},
+        ]
+        mock_client.delete_message_batch.side_effect = lambda **kw: {
+            "Successful": [{"Id": e["Id"]} for e in kw["Entries"]]
+        }
+
+        async def handler(message):
+            await asyncio.sleep(0.35)
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                return await sqs.consume("queue-url", handler, visibility_timeout=0.2)
+
+        summary = run(main())
+
+        assert summary.deleted == 1
+        entries = mock_client.change_message_visibility_batch.call_args.kwargs["Entries"]
+        assert entries == [{"Id": "0", "ReceiptHandle": "r1", "VisibilityTimeout": 0.2}]
+
+    def test_consume_without_visibility_timeout_skips_heartbeat(self, mock_client):
+        mock_client.receive_message.side_effect = [
+            {"Messages": [{"MessageId": "1", "ReceiptHandle": "r1", "Body": "x"}]}, {},
+        ]
+        mock_client.delete_message_batch.return_value = {"Successful": [{"Id": "0"}]}
+
+        async def handler(message):
+            await asyncio.sleep(0.05)
+
+        async def main():
+            async with AsyncSQSUtils() as sqs:
+                return await sqs.consume("queue-url", handler, visibility_timeout=0)
+
+        assert run(main()).processed == 1
+        mock_client.change_message_visibility_batch.assert_not_called()
+
+
+class TestAsyncS3Utils:
+    def test_upload_files_concurrently(self, mock_client, tmp_path):
+        probe = ConcurrencyProbe()
+        mock_client.upload_file.side_effect = probe
+        files = []
+        for i in range(6):
+            path = tmp_path / f"f{i}"
+            path.write_text("x")
+            files.append((str(path), f"k{i}"))
+
+        async def main():
+            async with AsyncS3Utils() as s3:
+                return await s3.upload_files(files, "bucket", max_concurrency=3)
+
+        assert run(main()) == 6
+        assert probe.peak == 3
+
+    def test_delete_many_gathers_batches(self, mock_client):
+        probe = ConcurrencyProbe(result={"Errors": []})
+        mock_client.delete_objects.side_effect = probe
+
+        async def main():
+            async with AsyncS3Utils() as s3:
+                return await s3.delete_many("bucket", (f"k{i}" for i in range(2500)),
+                                            max_in_flight=4)
+
+        summary = run(main())
+
+        assert summary.deleted == 2500
+        assert mock_client.delete_objects.call_count == 3
+        assert probe.peak == 3
+
+    def test_delete_prefix_streams_listing(self, mock_client):
+        listed = []
+
+        def pages(**kwargs):
+            for page in range(4):
+                listed.append(page)
+                yield {"Contents": [{"Key": f"p/{page}-{i}"} for i in range(1000)]}
+
+        mock_client.get_paginator.return_value.paginate.side_effect = pages
+        listed_at_delete = []
+        mock_client.delete_objects.side_effect = lambda **kw: (
+            listed_at_delete.append(len(listed)) or {"Errors": []}
+        )
+
+        async def main():
+            async with AsyncS3Utils() as s3:
+                return await s3.delete_prefix("bucket", "p/", max_in_flight=1)
+
+        summary = run(main())
+
+        assert summary.deleted == 4000
+        assert listed_at_delete[0] <= 2
+
+    def test_list_objects(self, mock_client):
+        paginator = mock_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {"Contents": [{"Key": "a"}]},
+            {"Contents": [{"Key": "b"}]},
+        ]
+
+        async def main():
+            async with AsyncS3Utils() as s3:
+                return await s3.list_objects("bucket", "p/")
+
+        assert [o["Key"] for o in run(main())] == ["a", "b"]
@@ -0,0 +1,131 @@
+import os
+from unittest.mock import Mock, patch
+
+from src.aws_utils.client_cache import ClientCache
+from src.aws_utils.configuration import ClientSettings, Config, ConfigurationManager
+from src.aws_utils.s3_utils import S3Utils
+from src.aws_utils.sqs_utils import SQSUtils
+
+
+class TestClientCache:
+    def test_get_session_reused_per_profile_and_region(self, mock_session):
+        cache = ClientCache()
+
+        first = cache.get_session("dev", "us-east-1")
+        second = cache.get_session("dev", "us-east-1")
+        cache.get_session("prod", "us-east-1")
+
+        assert first is second
+        assert mock_session.call_count == 2
+        mock_session.assert_any_call(region_name="us-east-1", profile_name="dev")
+
+    def test_get_client_reused(self):
+        cache = ClientCache()
+        session = Mock(profile_name="dev", region_name="us-east-1")
+
+        first = cache.get_client("sqs", session)
+        second = cache.get_client("sqs", session)
+        cache.get_client("s3", session)
+
+        assert first is second
+        assert session.client.call_count == 2
+
+    def test_get_client_not_shared_between_sessions(self):
+        cache = ClientCache()
+        first = Mock(profile_name="dev", region_name="us-east-1")
+        second = Mock(profile_name="dev", region_name="us-east-1")
+
+        cache.get_client("sqs", first)
+        client = cache.get_client("sqs", second)
+
+        assert client is second.client.return_value
+
+    def test_clear(self):
+        cache = ClientCache()
+        session = Mock(profile_name="dev", region_name="us-east-1")
+        cache.get_client("sqs", session)
+
+        cache.clear()
+        cache.get_client("sqs", session)
+
+        assert session.client.call_count == 2
+
+    def test_get_client_applies_settings(self):
+        cache = ClientCache(ClientSettings(max_pool_connections=20, read_timeout=5))
+        session = Mock(profile_name="dev", region_name="us-east-1")
+
+        cache.get_client("sqs", session)
+
+        config = session.client.call_args.kwargs["config"]
+        assert config.max_pool_connections == 20
+        assert config.read_timeout == 5
+        assert config.tcp_keepalive is True
+        assert config.retries == {"mode": "standard", "max_attempts": 5}
+
+    def test_get_client_grows_pool_for_workers(self):
+        cache = ClientCache(ClientSettings(max_pool_connections=10))
+        session = Mock(profile_name="dev", region_name="us-east-1")
+
+        cache.get_client("s3", session)
+        cache.get_client("s3", session, max_pool_connections=8)
+        cache.get_client("s3", session, max_pool_connections=64)
+        cache.get_client("s3", session, max_pool_connections=32)
+
+        pools = [c.kwargs["config"].max_pool_connections
+                 for c in session.client.call_args_list]
+        assert pools == [10, 64]
+
+    def test_configure_drops_clients_when_settings_change(self):
+        cache = ClientCache()
+        session = Mock(profile_name="dev", region_name="us-east-1")
+        cache.get_client("sqs", session)
+
+        cache.configure(ClientSettings())
+        cache.get_client("sqs", session)
+        cache.configure(ClientSettings(read_timeout=1))
+        cache.get_client("sqs", session)
+
+        assert session.client.call_count == 2
+
+    def test_bulk_operations_scale_pool(self, mock_session):
+        client = mock_session.return_value.client.return_value
+        client.delete_objects.return_value = {}
+
+        S3Utils().delete_many("bucket", ["a"], max_in_flight=100)
+
+        pools = [c.kwargs["config"].max_pool_connections
+                 for c in mock_session.return_value.client.call_args_list]
+        assert pools == [50, 100]
+
+    def test_utils_share_clients(self, mock_session):
+        SQSUtils()
+        SQSUtils()
+        S3Utils()
+        S3Utils()
+
+        mock_session.assert_called_once_with()
+        client_calls = mock_session.return_value.client.call_args_list
+        assert [call.args for call in client_calls] == [("sqs",), ("s3",)]
+
+
+class TestConfigurationManagerSessionCache:
+    def test_create_session_reused_until_config_changes(self, mock_session, tmp_path):
+        config_path = tmp_path / "config.yaml"
+        manager = ConfigurationManager(config_path)
+        manager.save_config(Config(region="us-east-1", profile="dev"))
+
+        first = manager.create_session()
+        with patch.object(manager, "load_config", wraps=manager.load_config) as load:
+            second = manager.create_session()
+            load.assert_not_called()
+
+        assert first is second
+        assert mock_session.call_count == 1
+
+        manager.save_config(Config(region="eu-west-1", profile="dev"))
+        stat = config_path.stat()
+        os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        manager.create_session()
+
+        assert mock_session.call_count == 2
+        mock_session.assert_called_with(region_name="eu-west-1", profile_name="dev")
@@ -0,0 +1,58 @@
+import base64
+import json
+import os
+
+import pytest
+
+from src.aws_utils.codec import ENCODING_ATTRIBUTE, BodyCodec, decode_message
+
+
+def json_body(size):
+    records = [{"id": i, "status": "ok", "tags": ["a", "b"]} for i in range(size // 40)]
+    return json.dumps(records)
+
+
+def received(entry):
+    return {"MessageId": "1", "Body": entry["MessageBody"],
+            "MessageAttributes": entry.get("MessageAttributes", {})}
+
+
+class TestBodyCodec:
+    @pytest.mark.parametrize("algorithm", ["zlib", "gzip"])
+    def test_round_trip(self, algorithm):
+        body = json_body(20_000)
+        entry = BodyCodec(algorithm=algorithm).encode({"Id": "0", "MessageBody": body})
+
+        assert len(entry["MessageBody"]) < len(body) / 4
+        assert entry["MessageAttributes"][ENCODING_ATTRIBUTE]["StringValue"] == \
+            f"{algorithm}+base64"
+        message = decode_message(received(entry))
+        assert message["Body"] == body
+        assert message["MessageAttributes"] == {}
+
+    def test_small_bodies_are_untouched(self):
+        entry = {"MessageBody": "x" * 100}
+
+        assert BodyCodec(threshold=1024).encode(entry) is entry
+
+    def test_incompressible_bodies_are_untouched(self):
+        entry = {"MessageBody": base64.b64encode(os.urandom(3072)).decode()}
+
+        assert BodyCodec(threshold=0).encode(entry) is entry
+
+    def test_keeps_other_attributes(self):
+        attributes = {"Source": {"DataType": "String", "StringValue": "billing"}}
+        entry = BodyCodec().encode({"MessageBody": json_body(5000),
+                                    "MessageAttributes": attributes})
+
+        assert decode_message(received(entry))["MessageAttributes"] == attributes
+
+    def test_unknown_encoding_is_left_alone(self):
+        message = {"Body": "abc", "MessageAttributes": {
+            ENCODING_ATTRIBUTE: {"DataType": "String", "StringValue": "br+base64"}}}
+
+        assert decode_message(message) is message
+
+    def test_unsupported_algorithm(self):
+        with pytest.raises(ValueError):
+            BodyCodec(algorithm="lz4")
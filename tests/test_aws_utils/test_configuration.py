@@ -2,7 +2,7 @@ from pathlib import Path
 
 import pytest
 
-from src.aws_utils.configuration import Config, ConfigurationManager
+from src.aws_utils.configuration import ClientSettings, Config, ConfigurationManager
 
 
 class TestAWSConfig:
@@ -34,6 +34,33 @@ class TestAWSConfig:
         expected = {"region": "ap-south-1", "profile": "test"}
         assert config.to_dict() == expected
 
+    def test_client_settings_round_trip(self):
+        config = Config(region="us-east-1", client=ClientSettings(max_pool_connections=100))
+
+        data = config.to_dict()
+        assert data["client"]["max_pool_connections"] == 100
+        assert Config.from_dict(data).client == config.client
+
+    def test_default_client_settings_not_serialized(self):
+        assert "client" not in Config(region="us-east-1").to_dict()
+        assert Config.from_dict({"region": "us-east-1"}).client == ClientSettings()
+
+    def test_region_and_profile_lists(self):
+        config = Config.from_dict({"region": ["us-east-1", "eu-west-1"], "profile": "dev, prod"})
+
+        assert (config.region, config.regions) == ("us-east-1", ["us-east-1", "eu-west-1"])
+        assert (config.profile, config.profiles) == ("dev", ["dev", "prod"])
+        assert len(config.targets()) == 4
+        assert ("prod", "eu-west-1") in config.targets()
+        assert Config.from_dict(config.to_dict()) == config
+
+    def test_single_region_has_one_target(self):
+        config = Config.from_dict({"region": "us-east-1", "regions": ["us-east-1"]})
+
+        assert config.regions == []
+        assert config.targets() == [("", "us-east-1")]
+        assert "regions" not in config.to_dict()
+
     def test_is_valid_with_region(self):
         config = Config(region="us-west-2")
         assert config.is_valid()
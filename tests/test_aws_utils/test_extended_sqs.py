@@ -0,0 +1,188 @@
+import io
+import json
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.aws_utils.codec import BodyCodec
+from src.aws_utils.extended_sqs import ExtendedSQSUtils, make_pointer, parse_pointer
+
+LARGE = 300 * 1024
+
+
+@pytest.fixture
+def mock_client():
+    with patch("boto3.Session") as mock_session:
+        client = Mock()
+        mock_session.return_value.client.return_value = client
+        client.meta.region_name = "us-east-1"
+        client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            "Successful": [{"Id": e["Id"]} for e in Entries]
+        }
+        client.delete_objects.return_value = {}
+        yield client
+
+
+@pytest.fixture
+def utils(mock_client):
+    utils = ExtendedSQSUtils(bucket="payloads", delete_payloads=True)
+    yield utils
+    utils.close()
+
+
+def pointer_message(message_id, key):
+    return {"MessageId": message_id, "ReceiptHandle": f"rh-{message_id}",
+            "Body": make_pointer("payloads", key),
+            "MessageAttributes": {"ExtendedPayloadSize": {"DataType": "Number",
+                                                          "StringValue": "10"}}}
+
+
+class TestExtendedSQSUtils:
+    def test_requires_bucket(self, mock_client):
+        with patch("src.aws_utils.sqs_utils.ConfigurationManager") as manager:
+            manager.return_value.load_config.return_value.bucket = ""
+            with pytest.raises(ValueError):
+                ExtendedSQSUtils()
+
+    def test_pointer_round_trip(self):
+        assert parse_pointer(make_pointer("b", "k")) == ("b", "k")
+        assert parse_pointer('["other"]') is None
+        assert parse_pointer("plain body") is None
+
+    def test_large_bodies_are_uploaded_concurrently(self, utils, mock_client, tmp_path):
+        file_path = tmp_path / "messages.txt"
+        file_path.write_text("\n".join(["small", "a" * LARGE, "b" * LARGE, "c" * LARGE]))
+        barrier = threading.Barrier(3, timeout=5)
+        mock_client.put_object.side_effect = lambda **kwargs: barrier.wait()
+
+        summary = utils.send_messages_from_file("https://q/events", str(file_path))
+
+        assert (summary.sent, summary.failed) == (4, 0)
+        assert mock_client.send_message_batch.call_count == 1
+        entries = mock_client.send_message_batch.call_args.kwargs["Entries"]
+        assert entries[0]["MessageBody"] == "small"
+        uploads = {c.kwargs["Key"]: c.kwargs["Body"] for c in mock_client.put_object.call_args_list}
+        for entry in entries[1:]:
+            bucket, key = parse_pointer(entry["MessageBody"])
+            assert bucket == "payloads"
+            assert len(uploads[key]) == LARGE
+            assert entry["MessageAttributes"]["ExtendedPayloadSize"]["StringValue"] == str(LARGE)
+
+    def test_send_message_offloads_large_body(self, utils, mock_client):
+        utils.send_message("https://q/events", "x" * LARGE)
+
+        body = mock_client.send_message.call_args.kwargs["MessageBody"]
+        assert parse_pointer(body)[0] == "payloads"
+
+    def test_receive_fetches_and_caches_payloads(self, utils, mock_client):
+        mock_client.receive_message.return_value = {"Messages": [
+            pointer_message("1", "k1"), {"MessageId": "2", "ReceiptHandle": "rh-2", "Body": "plain"},
+        ]}
+        mock_client.get_object.side_effect = lambda Bucket, Key: {
+            "Body": io.BytesIO(json.dumps({"key": Key}).encode())
+        }
+
+        first = utils.receive_messages("https://q/events")
+        second = utils.receive_messages("https://q/events")
+
+        assert first[0]["Body"] == '{"key": "k1"}'
+        assert first[0]["S3Payload"] == {"Bucket": "payloads", "Key": "k1"}
+        assert "ExtendedPayloadSize" not in first[0]["MessageAttributes"]
+        assert first[1]["Body"] == "plain"
+        assert second[0]["Body"] == first[0]["Body"]
+        assert mock_client.get_object.call_count == 1
+
+    def test_missing_payload_is_skipped(self, utils, mock_client):
+        mock_client.receive_message.return_value = {"Messages": [pointer_message("1", "gone")]}
+        mock_client.get_object.side_effect = RuntimeError("NoSuchKey")
+
+        assert utils.receive_messages("https://q/events") == []
+
+    def test_delete_message_deletes_payload(self, utils, mock_client):
+        mock_client.receive_message.return_value = {"Messages": [pointer_message("1", "k1")]}
+        mock_client.get_object.return_value = {"Body": io.BytesIO(b"payload")}
+        message = utils.receive_messages("https://q/events")[0]
+
+        utils.delete_message("https://q/events", message["ReceiptHandle"])
+
+        mock_client.delete_message.assert_called_once_with(
+            QueueUrl="https://q/events", ReceiptHandle="rh-1"
+        )
+        mock_client.delete_objects.assert_called_once_with(
+            Bucket="payloads", Delete={"Objects": [{"Key": "k1"}], "Quiet": True}
+        )
+
+    def test_consume_resolves_and_deletes_payloads(self, utils, mock_client):
+        mock_client.receive_message.side_effect = [
+            {"Messages": [pointer_message("1", "k1")]}, {}, {}, {},
+        ]
+        mock_client.get_object.return_value = {"Body": io.BytesIO(b"payload")}
+        mock_client.delete_message_batch.side_effect = lambda QueueUrl, Entries: {
+            "Successful": [{"Id": e["Id"]} for e in Entries]
+        }
+        bodies = []
+
+        utils.consume("https://q/events", lambda m: bodies.append(m["Body"]),
+                      workers=1, receivers=1, wait_time_seconds=0)
+
+        assert bodies == ["payload"]
+        mock_client.delete_objects.assert_called_once()
+
+    def test_iter_without_delete_does_not_track_receipts(self, utils, mock_client):
+        mock_client.receive_message.side_effect = [
+            {"Messages": [pointer_message("1", "k1")]}, {}, {}, {},
+        ]
+        mock_client.get_object.return_value = {"Body": io.BytesIO(b"payload")}
+
+        messages = list(utils.iter_messages("https://q/events", receivers=1, max_messages=1,
+                                            delete=False, wait_time_seconds=0))
+
+        assert [m["Body"] for m in messages] == ["payload"]
+        assert not utils._pointers
+
+    def test_tracked_receipts_are_bounded(self, utils, mock_client):
+        utils.MAX_TRACKED_RECEIPTS = 2
+        mock_client.receive_message.return_value = {"Messages": [
+            pointer_message(str(i), f"k{i}") for i in range(3)
+        ]}
+        mock_client.get_object.side_effect = lambda Bucket, Key: {"Body": io.BytesIO(b"x")}
+
+        utils.receive_messages("https://q/events")
+
+        assert list(utils._pointers) == ["rh-1", "rh-2"]
+
+    def test_cache_counts_bytes(self, mock_client):
+        utils = ExtendedSQSUtils(bucket="payloads", cache_bytes=15)
+        payload = "é" * 10
+        mock_client.get_object.side_effect = lambda Bucket, Key: {
+            "Body": io.BytesIO(payload.encode())
+        }
+
+        assert utils._fetch("payloads", "k1") == payload
+        assert utils._fetch("payloads", "k1") == payload
+        utils.close()
+
+        assert utils._cached_bytes == 0
+        assert mock_client.get_object.call_count == 2
+
+    def test_compresses_before_offloading(self, mock_client):
+        utils = ExtendedSQSUtils(bucket="payloads", codec=BodyCodec())
+        compressible = json.dumps([{"id": i, "status": "ok"} for i in range(20_000)])
+
+        utils.send_message("https://q/events", compressible)
+        utils.close()
+
+        mock_client.put_object.assert_not_called()
+        sent = mock_client.send_message.call_args.kwargs
+        assert sent["MessageAttributes"]["ContentEncoding"]["StringValue"] == "zlib+base64"
+
+    def test_receive_decodes_offloaded_compressed_payload(self, utils, mock_client):
+        body = "event " * 100_000
+        encoded = BodyCodec().encode({"MessageBody": body})
+        message = pointer_message("1", "k1")
+        message["MessageAttributes"]["ContentEncoding"] = encoded["MessageAttributes"]["ContentEncoding"]
+        mock_client.receive_message.return_value = {"Messages": [message]}
+        mock_client.get_object.return_value = {"Body": io.BytesIO(encoded["MessageBody"].encode())}
+
+        assert utils.receive_messages("https://q/events")[0]["Body"] == body
@@ -0,0 +1,124 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.aws_utils.configuration import Config
+from src.aws_utils.fanout import FanOut, Target
+
+
+@pytest.fixture
+def sqs_by_target():
+    utils = {}
+
+    def get(self, target):
+        if target not in utils:
+            utils[target] = Mock()
+            utils[target].list_queues.return_value = [
+                (f"https://sqs.{target.region}/{target.profile}/orders", "orders")
+            ]
+        return utils[target]
+
+    with patch.object(FanOut, "sqs", get):
+        yield utils
+
+
+class TestFanOut:
+    def test_targets_from_config(self):
+        config = Config(profiles=["dev", "prod"], regions=["us-east-1", "eu-west-1"])
+
+        with FanOut.from_config(config) as fanout:
+            assert fanout.targets == [
+                Target("dev", "us-east-1"), Target("dev", "eu-west-1"),
+                Target("prod", "us-east-1"), Target("prod", "eu-west-1"),
+            ]
+
+    def test_requires_a_target(self):
+        with pytest.raises(ValueError):
+            FanOut([])
+
+    def test_list_queues_merges_tagged_rows(self, sqs_by_target):
+        with FanOut([("dev", "us-east-1"), ("prod", "eu-west-1")]) as fanout:
+            result = fanout.list_queues("ord")
+
+        assert result.errors == []
+        assert [(r["profile"], r["region"], r["name"]) for r in result.rows] == [
+            ("dev", "us-east-1", "orders"), ("prod", "eu-west-1", "orders"),
+        ]
+        sqs_by_target[Target("dev", "us-east-1")].list_queues.assert_called_once_with("ord")
+
+    def test_failed_target_is_reported(self, sqs_by_target):
+        with FanOut([("dev", "us-east-1"), ("prod", "eu-west-1")]) as fanout:
+            fanout.sqs(Target("prod", "eu-west-1")).list_queues.side_effect = \
+                RuntimeError("AccessDenied")
+            result = fanout.list_queues()
+
+        assert [r["profile"] for r in result.rows] == ["dev"]
+        assert result.errors[0].target == Target("prod", "eu-west-1")
+        assert result.errors[0].error == "AccessDenied"
+
+    def test_slow_target_times_out_without_blocking_others(self, sqs_by_target):
+        release = threading.Event()
+        with FanOut([("dev", "us-east-1"), ("dev", "ap-south-1")], timeout=0.2) as fanout:
+            fanout.sqs(Target("dev", "ap-south-1")).list_queues.side_effect = \
+                lambda prefix: release.wait(5)
+            result = fanout.list_queues()
+            release.set()
+
+        assert [r["region"] for r in result.rows] == ["us-east-1"]
+        assert result.errors[0].error == "timed out"
+        assert result.errors[0].seconds < 5
+
+    def test_timed_out_work_does_not_stall_the_next_run(self, sqs_by_target):
+        release = threading.Event()
+        slow = Target("dev", "ap-south-1")
+        with FanOut([("dev", "us-east-1"), ("dev", "ap-south-1")], timeout=0.2) as fanout:
+            fanout.sqs(slow).list_queues.side_effect = lambda prefix: release.wait(5)
+            fanout.list_queues()
+            fanout.sqs(slow).list_queues.side_effect = None
+            result = fanout.list_queues()
+            release.set()
+
+        assert result.errors == []
+        assert len(result.rows) == 2
+
+    def test_each_target_gets_its_own_deadline(self, sqs_by_target):
+        targets = [("dev", "us-east-1"), ("dev", "eu-west-1"), ("dev", "ap-south-1")]
+        with FanOut(targets, timeout=0.3, max_workers=1) as fanout:
+            for target in fanout.targets:
+                fanout.sqs(target).list_queues.side_effect = \
+                    lambda prefix, target=target: time.sleep(0.2) or [("url", target.region)]
+            result = fanout.list_queues()
+
+        assert result.errors == []
+        assert [r["name"] for r in result.rows] == ["us-east-1", "eu-west-1", "ap-south-1"]
+
+    def test_queue_metrics_rows(self, sqs_by_target):
+        from src.aws_utils.sqs_utils import QueueMetrics
+
+        with FanOut([("dev", "us-east-1")]) as fanout:
+            utils = fanout.sqs(Target("dev", "us-east-1"))
+            utils.get_queues.return_value = ["https://q/orders"]
+            utils.get_queue_metrics.return_value = [QueueMetrics("https://q/orders", visible=3)]
+            result = fanout.get_queue_metrics()
+
+        assert result.rows == [{
+            "profile": "dev", "region": "us-east-1", "name": "orders", "url": "https://q/orders",
+            "visible": 3, "in_flight": 0, "delayed": 0, "error": "",
+        }]
+
+    @patch("src.aws_utils.fanout.client_cache")
+    def test_list_buckets_once_per_profile(self, mock_cache):
+        client = mock_cache.get_client.return_value
+        client.list_buckets.return_value = {
+            "Buckets": [{"Name": "logs", "BucketRegion": "eu-west-1"}]
+        }
+
+        with FanOut([("dev", "us-east-1"), ("dev", "eu-west-1"), ("prod", "us-east-1")]) as fanout:
+            result = fanout.list_buckets()
+
+        assert client.list_buckets.call_count == 2
+        assert [(r["profile"], r["region"], r["name"]) for r in result.rows] == [
+            ("dev", "eu-west-1", "logs"), ("prod", "eu-west-1", "logs"),
+        ]
@@ -0,0 +1,123 @@
+import json
+
+import boto3
+from botocore.stub import Stubber
+from moto import mock_aws
+
+from src.aws_utils.instrumentation import Instrumentation, LatencyHistogram
+
+
+def make_client(service="sqs"):
+    session = boto3.Session(
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+    )
+    return session.client(service)
+
+
+class TestLatencyHistogram:
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for latency in range(1, 101):
+            histogram.add(float(latency))
+
+        assert histogram.count == 100
+        assert histogram.min_ms == 1
+        assert histogram.max_ms == 100
+        assert 45 <= histogram.percentile(50) <= 55
+        assert 95 <= histogram.percentile(99) <= 100
+        assert histogram.mean_ms == 50.5
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(99) == 0.0
+
+    def test_outliers_are_clamped(self):
+        histogram = LatencyHistogram()
+        histogram.add(0.001)
+        histogram.add(10_000_000)
+
+        assert histogram.percentile(50) <= 0.1
+        assert histogram.percentile(100) == 10_000_000
+
+
+class TestInstrumentation:
+    def test_records_calls_and_latency(self):
+        instrumentation = Instrumentation()
+        client = instrumentation.register(make_client())
+
+        with Stubber(client) as stubber:
+            for _ in range(3):
+                stubber.add_response("send_message_batch", {"Successful": [], "Failed": []})
+                client.send_message_batch(
+                    QueueUrl="https://q", Entries=[{"Id": "0", "MessageBody": "x"}]
+                )
+
+        stats = instrumentation.get("sqs.SendMessageBatch")
+        assert stats["calls"] == 3
+        assert stats["errors"] == 0
+        assert stats["latency_ms"]["p99"] >= stats["latency_ms"]["p50"] >= 0
+
+    def test_records_bytes_sent_on_the_wire(self, tmp_path):
+        path = tmp_path / "upload.bin"
+        path.write_bytes(b"x" * (3 * 1024 * 1024))
+        instrumentation = Instrumentation()
+
+        with mock_aws():
+            client = instrumentation.register(make_client("s3"))
+            client.create_bucket(Bucket="bucket")
+            with open(path, "rb") as f:
+                client.put_object(Bucket="bucket", Key="file", Body=f)
+            upload = client.create_multipart_upload(Bucket="bucket", Key="parts")
+            client.upload_part(Bucket="bucket", Key="parts", PartNumber=1,
+                               UploadId=upload["UploadId"], Body=b"y" * 1024)
+            client.get_object(Bucket="bucket", Key="file")["Body"].read()
+
+        assert instrumentation.get("s3.PutObject")["bytes_sent"] >= 3 * 1024 * 1024
+        assert instrumentation.get("s3.UploadPart")["bytes_sent"] >= 1024
+        assert instrumentation.get("s3.GetObject")["bytes_received"] == 3 * 1024 * 1024
+
+    def test_stubbed_calls_send_nothing(self):
+        instrumentation = Instrumentation()
+        client = instrumentation.register(make_client())
+
+        with Stubber(client) as stubber:
+            stubber.add_response("list_queues", {"QueueUrls": []})
+            client.list_queues()
+
+        assert instrumentation.get("sqs.ListQueues")["bytes_sent"] == 0
+
+    def test_records_errors(self):
+        instrumentation = Instrumentation()
+        client = instrumentation.register(make_client())
+
+        with Stubber(client) as stubber:
+            stubber.add_client_error("list_queues", service_error_code="AccessDenied")
+            try:
+                client.list_queues()
+            except client.exceptions.ClientError:
+                pass
+
+        assert instrumentation.get("sqs.ListQueues")["errors"] == 1
+
+    def test_retries_bytes_and_dump(self, tmp_path):
+        instrumentation = Instrumentation()
+        instrumentation.record("s3.GetObject", 12.5, retries=2, bytes_received=1024)
+        instrumentation.record("s3.GetObject", 7.5, error=True)
+        path = tmp_path / "stats.json"
+
+        instrumentation.dump(str(path))
+
+        data = json.loads(path.read_text())["s3.GetObject"]
+        assert data["calls"] == 2
+        assert data["errors"] == 1
+        assert data["retries"] == 2
+        assert data["bytes_received"] == 1024
+        assert data["latency_ms"]["max"] == 12.5
+
+    def test_reset(self):
+        instrumentation = Instrumentation()
+        instrumentation.record("sqs.ListQueues", 1.0)
+        instrumentation.reset()
+
+        assert instrumentation.snapshot() == {}
@@ -0,0 +1,109 @@
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from src.aws_utils.log import (ROOT_LOGGER, ThroughputLog, configure_logging,
+                               get_logger)
+
+
+@pytest.fixture(autouse=True)
+def restore_root_logger():
+    root = logging.getLogger(ROOT_LOGGER)
+    handlers, level, propagate = list(root.handlers), root.level, root.propagate
+    yield
+    root.handlers, root.level, root.propagate = handlers, level, propagate
+
+
+class CountingArg:
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return "arg"
+
+
+class TestLogging:
+    def test_silent_by_default(self, capsys):
+        get_logger("S3Utils").info("hello")
+
+        assert capsys.readouterr().out == ""
+
+    def test_text_format_keeps_component_prefix(self):
+        stream = io.StringIO()
+        configure_logging(stream=stream)
+
+        get_logger("S3Utils").info("Uploaded %d files", 3)
+
+        assert stream.getvalue() == "[S3Utils] Uploaded 3 files\n"
+
+    def test_json_format_includes_extra_fields(self):
+        stream = io.StringIO()
+        configure_logging(json_format=True, stream=stream)
+
+        get_logger("SQSUtils").warning("Sent %d", 5, extra={"queue": "q1"})
+
+        record = json.loads(stream.getvalue())
+        assert record["level"] == "WARNING"
+        assert record["logger"] == "aws_utils.SQSUtils"
+        assert record["message"] == "Sent 5"
+        assert record["queue"] == "q1"
+
+    def test_lazy_formatting_below_level(self):
+        configure_logging(level=logging.WARNING, stream=io.StringIO())
+        arg = CountingArg()
+
+        get_logger("S3Utils").debug("value %s", arg)
+
+        assert arg.calls == 0
+
+    def test_configure_replaces_previous_handler(self):
+        first, second = io.StringIO(), io.StringIO()
+        configure_logging(stream=first)
+        configure_logging(stream=second)
+
+        get_logger("S3Utils").info("once")
+
+        assert first.getvalue() == ""
+        assert second.getvalue().count("once") == 1
+
+
+class TestThroughputLog:
+    def test_emits_at_most_once_per_interval(self):
+        stream = io.StringIO()
+        configure_logging(json_format=True, stream=stream)
+        progress = ThroughputLog(get_logger("S3Utils"), "upload", unit="files", interval=60)
+
+        for _ in range(1000):
+            progress.add(1, 1024)
+        progress.close()
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert len(lines) == 1
+        assert lines[0]["progress"] == "upload"
+        assert lines[0]["count"] == 1000
+        assert lines[0]["bytes"] == 1024 * 1000
+
+    def test_emits_when_interval_elapsed(self):
+        stream = io.StringIO()
+        configure_logging(stream=stream)
+        with patch("src.aws_utils.log.time.monotonic", side_effect=[0, 0.5, 1.5, 2.0]):
+            progress = ThroughputLog(get_logger("SQSUtils"), "send", unit="msgs")
+            progress.add(10)
+            progress.add(10)
+            progress.close()
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith("[SQSUtils] send: 20 msgs")
+
+    def test_disabled_logger_skips_accounting(self):
+        configure_logging(level=logging.WARNING, stream=io.StringIO())
+        progress = ThroughputLog(get_logger("S3Utils"), "upload")
+
+        progress.add(5)
+
+        assert progress.count == 0
@@ -0,0 +1,83 @@
+import io
+import threading
+from unittest.mock import patch
+
+from src.aws_utils.progress import (Progress, ProgressSnapshot, console_progress,
+                                    format_progress)
+
+
+class TestProgress:
+    def test_concurrent_updates_are_counted(self):
+        progress = Progress("upload", total=8000)
+
+        def worker():
+            for _ in range(1000):
+                progress.add(1, 10)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snapshot = progress.close()
+        assert snapshot.done == 8000
+        assert snapshot.bytes_done == 80000
+        assert snapshot.percent == 100
+        assert snapshot.finished
+
+    def test_reports_are_coalesced(self):
+        reports = []
+        progress = Progress("send", callback=reports.append, interval=60)
+
+        for _ in range(10000):
+            progress.add()
+        progress.close()
+
+        assert len(reports) == 1
+        assert reports[0].done == 10000
+
+    def test_reports_after_interval(self):
+        reports = []
+        times = iter([0.0, 0.1, 1.0, 1.1, 2.0])
+        with patch("src.aws_utils.progress.time.monotonic", lambda: next(times)):
+            progress = Progress("send", total=100, callback=reports.append, interval=0.5)
+            progress.add(5)
+            progress.add(10)
+            progress.add(10)
+            progress.close()
+
+        assert [r.done for r in reports] == [15, 25]
+        assert reports[0].rate == 15.0
+        assert reports[0].eta == (100 - 15) / 15.0
+        assert reports[1].finished
+        assert reports[1].rate == 12.5
+
+    def test_set_total_later(self):
+        progress = Progress("upload")
+        assert progress.snapshot().percent is None
+
+        progress.set_total(total=4, total_bytes=200)
+        progress.add(1, 50)
+
+        assert progress.snapshot().percent == 25
+
+
+class TestFormatting:
+    def test_format_progress(self):
+        snapshot = ProgressSnapshot(
+            "Uploading", done=50, total=200, bytes_done=5 * 1024 * 1024,
+            rate=10.0, byte_rate=1024 * 1024,
+        )
+
+        line = format_progress(snapshot, "files")
+
+        assert line == ("Uploading: 50/200 files  25%  5.0 MB  10.0 files/s, 1.0 MB/s  ETA 15s")
+
+    def test_console_progress_finishes_line(self):
+        stream = io.StringIO()
+        render = console_progress("msgs", stream)
+
+        render(ProgressSnapshot("Sending", done=3, elapsed=65, rate=1.0, finished=True))
+
+        assert stream.getvalue().endswith("Sending: 3 msgs  1.0 msgs/s  in 1m05s\n")
@@ -1,8 +1,12 @@
-from unittest.mock import Mock, patch
+import json
+import os
+from datetime import datetime, timezone
+from unittest.mock import ANY, Mock, patch
 
 import pytest
 
-from src.aws_utils.s3_utils import S3Utils
+from src.aws_utils.progress import Progress
+from src.aws_utils.s3_utils import ObjectInfo, PrefixStats, S3Utils
 
 
 @pytest.fixture
@@ -26,7 +30,7 @@ class TestS3Utils:
         s3_utils = S3Utils(session=mock_session)
 
         assert s3_utils.client == mock_client
-        mock_session.client.assert_called_once_with("s3")
+        mock_session.client.assert_called_once_with("s3", config=ANY)
 
     def test_list_buckets(self, mock_s3_client):
         mock_s3_client.list_buckets.return_value = {
@@ -75,7 +79,10 @@ class TestS3Utils:
         s3_utils.upload_file("local/path.txt", "test-bucket", "remote/path.txt")
 
         mock_s3_client.upload_file.assert_called_once_with(
-            "local/path.txt", "test-bucket", "remote/path.txt"
+            "local/path.txt",
+            "test-bucket",
+            "remote/path.txt",
+            Config=s3_utils.transfer_config,
         )
 
     def test_upload_file_not_found(self):
@@ -87,3 +94,579 @@ class TestS3Utils:
         s3_utils = S3Utils()
         with pytest.raises(NotADirectoryError):
             s3_utils.upload_directory("nonexistent", "test-bucket")
+
+    def test_init_custom_transfer_config(self, mock_s3_client):
+        config = S3Utils.build_transfer_config(
+            max_workers=4, multipart_threshold=1024, multipart_chunksize=2048
+        )
+        s3_utils = S3Utils(transfer_config=config)
+
+        assert s3_utils.transfer_config.max_concurrency == 4
+        assert s3_utils.transfer_config.multipart_threshold == 1024
+        assert s3_utils.transfer_config.multipart_chunksize == 2048
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_upload_directory(self, mock_create_manager, mock_s3_client, tmp_path):
+        (tmp_path / "nested").mkdir()
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "nested" / "b.txt").write_text("b")
+        manager = mock_create_manager.return_value.__enter__.return_value
+        s3_utils = S3Utils(transfer_config=S3Utils.build_transfer_config(max_workers=1))
+
+        uploaded = s3_utils.upload_directory(str(tmp_path), "test-bucket", "prefix")
+
+        assert uploaded == 2
+        mock_create_manager.assert_called_once_with(
+            mock_s3_client, s3_utils.transfer_config
+        )
+        uploads = {call.args[1:] for call in manager.upload.call_args_list}
+        assert uploads == {
+            ("test-bucket", "prefix/a.txt"),
+            ("test-bucket", "prefix/nested/b.txt"),
+        }
+        assert manager.upload.return_value.result.call_count == 2
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_upload_directory_reports_progress(
+        self, mock_create_manager, mock_s3_client, tmp_path
+    ):
+        (tmp_path / "a.txt").write_text("aa")
+        (tmp_path / "b.txt").write_text("bbb")
+        manager = mock_create_manager.return_value.__enter__.return_value
+        progress = Progress("upload")
+
+        S3Utils().upload_directory(str(tmp_path), "test-bucket", progress=progress)
+
+        snapshot = progress.snapshot()
+        assert (snapshot.done, snapshot.total, snapshot.total_bytes) == (2, 2, 5)
+        assert snapshot.finished
+        subscriber = manager.upload.call_args.kwargs["subscribers"][0]
+        subscriber.on_progress(bytes_transferred=5)
+        assert progress.snapshot().bytes_done == 5
+
+    def test_upload_file_reports_bytes(self, mock_s3_client, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_text("abcd")
+        progress = Progress("upload")
+
+        S3Utils().upload_file(str(path), "test-bucket", progress=progress)
+
+        callback = mock_s3_client.upload_file.call_args.kwargs["Callback"]
+        callback(4)
+        snapshot = progress.snapshot()
+        assert (snapshot.done, snapshot.bytes_done, snapshot.total_bytes) == (1, 4, 4)
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_upload_directory_propagates_errors(
+        self, mock_create_manager, mock_s3_client, tmp_path
+    ):
+        (tmp_path / "a.txt").write_text("a")
+        manager = mock_create_manager.return_value.__enter__.return_value
+        manager.upload.return_value.result.side_effect = Exception("Upload failed")
+        s3_utils = S3Utils()
+
+        with pytest.raises(Exception, match="Upload failed"):
+            s3_utils.upload_directory(str(tmp_path), "test-bucket")
+
+
+class TestS3UtilsSync:
+    @pytest.fixture
+    def local_dir(self, tmp_path):
+        local_dir = tmp_path / "local"
+        local_dir.mkdir()
+        (local_dir / "same.txt").write_text("same")
+        (local_dir / "changed.txt").write_text("changed content")
+        (local_dir / "new.txt").write_text("new")
+        past = datetime(2020, 1, 1, tzinfo=timezone.utc).timestamp()
+        for name in ("same.txt", "changed.txt", "new.txt"):
+            os.utime(local_dir / name, (past, past))
+        return local_dir
+
+    @pytest.fixture
+    def remote_objects(self, mock_s3_client):
+        modified = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        contents = [
+            {"Key": "p/same.txt", "Size": 4, "ETag": '"x"', "LastModified": modified},
+            {"Key": "p/changed.txt", "Size": 3, "ETag": '"y"', "LastModified": modified},
+            {"Key": "p/orphan.txt", "Size": 1, "ETag": '"z"', "LastModified": modified},
+        ]
+        paginator = mock_s3_client.get_paginator.return_value
+        paginator.paginate.return_value = [{"Contents": contents}]
+        mock_s3_client.delete_objects.return_value = {}
+        return paginator
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_sync_uploads_only_changed_files(
+        self, mock_create_manager, mock_s3_client, remote_objects, local_dir
+    ):
+        manager = mock_create_manager.return_value.__enter__.return_value
+
+        stats = S3Utils().sync_directory(str(local_dir), "test-bucket", "p")
+
+        assert stats == {"uploaded": 2, "skipped": 1, "deleted": 0}
+        remote_objects.paginate.assert_called_once_with(Bucket="test-bucket", Prefix="p/")
+        uploaded = {call.args[2] for call in manager.upload.call_args_list}
+        assert uploaded == {"p/changed.txt", "p/new.txt"}
+        mock_s3_client.delete_objects.assert_not_called()
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_sync_deletes_orphans(
+        self, mock_create_manager, mock_s3_client, remote_objects, local_dir
+    ):
+        stats = S3Utils().sync_directory(
+            str(local_dir), "test-bucket", "p", delete=True
+        )
+
+        assert stats["deleted"] == 1
+        mock_s3_client.delete_objects.assert_called_once_with(
+            Bucket="test-bucket",
+            Delete={"Objects": [{"Key": "p/orphan.txt"}], "Quiet": True},
+        )
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_sync_manifest_keeps_failed_deletes(
+        self, mock_create_manager, mock_s3_client, remote_objects, local_dir, tmp_path
+    ):
+        manifest = tmp_path / "manifest.json"
+        mock_s3_client.delete_objects.return_value = {
+            "Errors": [{"Key": "p/orphan.txt", "Code": "AccessDenied", "Message": "denied"}]
+        }
+
+        stats = S3Utils().sync_directory(str(local_dir), "test-bucket", "p", delete=True,
+                                         manifest_path=str(manifest))
+
+        assert stats["deleted"] == 0
+        assert "p/orphan.txt" in json.loads(manifest.read_text())["objects"]
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_sync_delete_keeps_sibling_prefixes(
+        self, mock_create_manager, mock_s3_client, tmp_path
+    ):
+        (tmp_path / "kept.txt").write_text("kept")
+        modified = datetime(2021, 1, 1, tzinfo=timezone.utc)
+        contents = [
+            {"Key": key, "Size": 1, "ETag": '"x"', "LastModified": modified}
+            for key in ("data/orphan.txt", "data-backup/important.db", "database.sql")
+        ]
+        paginator = mock_s3_client.get_paginator.return_value
+        paginator.paginate.side_effect = lambda Bucket, Prefix: [{"Contents": [
+            obj for obj in contents if obj["Key"].startswith(Prefix)
+        ]}]
+        mock_s3_client.delete_objects.return_value = {}
+
+        stats = S3Utils().sync_directory(str(tmp_path), "test-bucket", "data", delete=True)
+
+        assert stats == {"uploaded": 1, "skipped": 0, "deleted": 1}
+        mock_s3_client.delete_objects.assert_called_once_with(
+            Bucket="test-bucket",
+            Delete={"Objects": [{"Key": "data/orphan.txt"}], "Quiet": True},
+        )
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_sync_compares_etag_for_touched_files(
+        self, mock_create_manager, mock_s3_client, tmp_path
+    ):
+        (tmp_path / "touched.txt").write_text("hello")
+        paginator = mock_s3_client.get_paginator.return_value
+        paginator.paginate.return_value = [{"Contents": [{
+            "Key": "touched.txt",
+            "Size": 5,
+            "ETag": '"5d41402abc4b2a76b9719d911017c592"',
+            "LastModified": datetime(2000, 1, 1, tzinfo=timezone.utc),
+        }]}]
+
+        stats = S3Utils().sync_directory(str(tmp_path), "test-bucket")
+
+        assert stats == {"uploaded": 0, "skipped": 1, "deleted": 0}
+
+    @patch("src.aws_utils.s3_utils.create_transfer_manager")
+    def test_sync_manifest_skips_listing(
+        self, mock_create_manager, mock_s3_client, remote_objects, local_dir, tmp_path
+    ):
+        manifest = tmp_path / "manifest.json"
+        s3_utils = S3Utils()
+        s3_utils.sync_directory(str(local_dir), "test-bucket", "p",
+                                manifest_path=str(manifest))
+        remote_objects.paginate.reset_mock()
+        manager = mock_create_manager.return_value.__enter__.return_value
+        manager.upload.reset_mock()
+
+        stats = s3_utils.sync_directory(str(local_dir), "test-bucket", "p",
+                                        manifest_path=str(manifest))
+
+        assert stats == {"uploaded": 0, "skipped": 3, "deleted": 0}
+        remote_objects.paginate.assert_not_called()
+        manager.upload.assert_not_called()
+        data = json.loads(manifest.read_text())
+        assert data["bucket"] == "test-bucket"
+        assert set(data["objects"]) == {
+            "p/same.txt", "p/changed.txt", "p/new.txt", "p/orphan.txt"
+        }
+
+    def test_load_manifest_other_destination(self, mock_s3_client, tmp_path):
+        manifest = tmp_path / "manifest.json"
+        S3Utils._save_manifest(str(manifest), "other-bucket", "p",
+                               {"p/a.txt": ObjectInfo(size=1)})
+
+        assert S3Utils()._load_manifest(str(manifest), "test-bucket", "p") is None
+
+    def test_sync_directory_not_found(self):
+        with pytest.raises(NotADirectoryError):
+            S3Utils().sync_directory("nonexistent", "test-bucket")
+
+
+class TestS3UtilsListing:
+    @pytest.fixture
+    def bucket_pages(self, mock_s3_client):
+        keys = {
+            "logs/readme.txt": 10,
+            "logs/2024/a.gz": 2048,
+            "logs/2024/b.gz": 4096,
+            "logs/2025/c.gz": 5 * 1024 * 1024,
+        }
+
+        def paginate(Bucket, Prefix, Delimiter=None):
+            matching = sorted(k for k in keys if k.startswith(Prefix))
+            contents, prefixes = [], []
+            for key in matching:
+                rest = key[len(Prefix):]
+                if Delimiter and Delimiter in rest:
+                    common = Prefix + rest.split(Delimiter)[0] + Delimiter
+                    if {"Prefix": common} not in prefixes:
+                        prefixes.append({"Prefix": common})
+                else:
+                    contents.append({"Key": key, "Size": keys[key]})
+            pages = [{"Contents": [c]} for c in contents]
+            if prefixes:
+                pages.append({"CommonPrefixes": prefixes})
+            return iter(pages)
+
+        mock_s3_client.get_paginator.return_value.paginate.side_effect = paginate
+        return keys
+
+    def test_list_objects_is_lazy(self, mock_s3_client, bucket_pages):
+        objects = S3Utils().list_objects("bucket", "logs/")
+
+        mock_s3_client.get_paginator.assert_not_called()
+        assert next(objects)["Key"] == "logs/2024/a.gz"
+
+    def test_list_objects_with_delimiter(self, mock_s3_client, bucket_pages):
+        s3_utils = S3Utils()
+
+        keys = [o["Key"] for o in s3_utils.list_objects("bucket", "logs/", "/")]
+
+        assert keys == ["logs/readme.txt"]
+        assert s3_utils.list_common_prefixes("bucket", "logs/") == [
+            "logs/2024/", "logs/2025/"
+        ]
+
+    def test_list_objects_parallel(self, mock_s3_client, bucket_pages):
+        keys = {o["Key"] for o in S3Utils().list_objects_parallel("bucket", "logs/", 2)}
+
+        assert keys == set(bucket_pages)
+
+    def test_list_objects_parallel_propagates_errors(self, mock_s3_client, bucket_pages):
+        paginate = mock_s3_client.get_paginator.return_value.paginate
+        original = paginate.side_effect
+
+        def failing(Bucket, Prefix, Delimiter=None):
+            if Prefix == "logs/2025/":
+                raise Exception("AccessDenied")
+            return original(Bucket, Prefix, Delimiter)
+
+        paginate.side_effect = failing
+
+        with pytest.raises(Exception, match="AccessDenied"):
+            list(S3Utils().list_objects_parallel("bucket", "logs/", 2))
+
+    @pytest.mark.parametrize("max_workers", [None, 4])
+    def test_summarize_objects(self, mock_s3_client, bucket_pages, max_workers):
+        summary = S3Utils().summarize_objects("bucket", "logs/", max_workers=max_workers)
+
+        assert summary["logs/"].count == 1
+        assert summary["logs/2024/"].count == 2
+        assert summary["logs/2024/"].total_bytes == 6144
+        assert summary["logs/2024/"].histogram == {"<1MB": 2}
+        assert summary["logs/2025/"].histogram == {"<100MB": 1}
+
+    def test_prefix_stats_histogram(self):
+        stats = PrefixStats()
+        for size in (0, 1024, 2 * 1024 ** 3):
+            stats.add(size)
+
+        assert stats.histogram == {"<1KB": 1, "<1MB": 1, ">=1GB": 1}
+        assert stats.total_bytes == 1024 + 2 * 1024 ** 3
+
+
+class TestS3UtilsDeleteMany:
+    def test_delete_many_batches_keys(self, mock_s3_client):
+        mock_s3_client.delete_objects.return_value = {}
+        keys = (f"key-{i}" for i in range(2500))
+
+        summary = S3Utils().delete_many("bucket", keys, max_in_flight=2)
+
+        assert summary.deleted == 2500
+        sizes = sorted(
+            len(call.kwargs["Delete"]["Objects"])
+            for call in mock_s3_client.delete_objects.call_args_list
+        )
+        assert sizes == [500, 1000, 1000]
+
+    def test_delete_many_reports_key_errors(self, mock_s3_client):
+        error = {"Key": "b", "Code": "AccessDenied", "Message": "Access Denied"}
+        mock_s3_client.delete_objects.return_value = {"Errors": [error]}
+
+        summary = S3Utils().delete_many("bucket", ["a", "b", "c"])
+
+        assert summary.deleted == 2
+        assert summary.errors == [error]
+
+    def test_delete_many_dry_run(self, mock_s3_client):
+        summary = S3Utils().delete_many("bucket", iter(["a", "b"]), dry_run=True)
+
+        assert summary.deleted == 2
+        assert summary.dry_run
+        mock_s3_client.delete_objects.assert_not_called()
+
+    def test_delete_prefix_streams_listing(self, mock_s3_client):
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "tmp/a"}, {"Key": "tmp/b"}]},
+            {"Contents": [{"Key": "tmp/c"}]},
+        ]
+        mock_s3_client.delete_objects.return_value = {}
+
+        summary = S3Utils().delete_prefix("bucket", "tmp/")
+
+        assert summary.deleted == 3
+        mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="bucket", Prefix="tmp/"
+        )
+
+    def test_delete_prefix_requires_prefix(self, mock_s3_client):
+        with pytest.raises(ValueError):
+            S3Utils().delete_prefix("bucket", "")
+
+    def test_delete_keys_from_file(self, mock_s3_client, tmp_path):
+        key_file = tmp_path / "keys.txt"
+        key_file.write_text("a\n\nb\n")
+        mock_s3_client.delete_objects.return_value = {}
+
+        summary = S3Utils().delete_keys_from_file("bucket", str(key_file))
+
+        assert summary.deleted == 2
+        mock_s3_client.delete_objects.assert_called_once_with(
+            Bucket="bucket", Delete={"Objects": [{"Key": "a"}, {"Key": "b"}], "Quiet": True}
+        )
+
+
+class TestS3UtilsDownload:
+    @pytest.fixture
+    def remote_object(self, mock_s3_client):
+        data = bytes(range(256)) * 40
+
+        def get_object(Bucket, Key, IfMatch=None, Range=None):
+            start, end = 0, len(data) - 1
+            if Range:
+                start, end = (int(n) for n in Range[len("bytes="):].split("-"))
+            body = Mock()
+            body.iter_chunks.return_value = [data[start:end + 1]]
+            return {"Body": body}
+
+        mock_s3_client.head_object.return_value = {
+            "ContentLength": len(data), "ETag": '"etag-1"'
+        }
+        mock_s3_client.get_object.side_effect = get_object
+        return data
+
+    def ranged_utils(self, chunksize=1024):
+        return S3Utils(transfer_config=S3Utils.build_transfer_config(
+            max_workers=4, multipart_threshold=chunksize, multipart_chunksize=chunksize
+        ))
+
+    def test_download_small_file(self, mock_s3_client, remote_object, tmp_path):
+        dest = tmp_path / "file.bin"
+
+        assert S3Utils().download_file("bucket", "file.bin", str(dest))
+
+        assert dest.read_bytes() == remote_object
+        mock_s3_client.get_object.assert_called_once_with(
+            Bucket="bucket", Key="file.bin", IfMatch='"etag-1"'
+        )
+
+    def test_download_ranged_parts(self, mock_s3_client, remote_object, tmp_path):
+        dest = tmp_path / "nested" / "file.bin"
+
+        self.ranged_utils().download_file("bucket", "file.bin", str(dest))
+
+        assert dest.read_bytes() == remote_object
+        ranges = sorted(c.kwargs["Range"] for c in mock_s3_client.get_object.call_args_list)
+        assert len(ranges) == 10
+        assert "bytes=9216-10239" in ranges
+        assert not (tmp_path / "nested" / "file.bin.part.state").exists()
+
+    def test_download_resumes_missing_parts(self, mock_s3_client, remote_object, tmp_path):
+        dest = tmp_path / "file.bin"
+        s3_utils = self.ranged_utils()
+        partial = tmp_path / "file.bin.part"
+        partial.write_bytes(remote_object[:2048] + bytes(len(remote_object) - 2048))
+        header = {"etag": '"etag-1"', "size": len(remote_object), "chunksize": 1024}
+        (tmp_path / "file.bin.part.state").write_text(json.dumps(header) + "\n0\n1\n3")
+
+        s3_utils.download_file("bucket", "file.bin", str(dest))
+
+        assert dest.read_bytes() == remote_object
+        ranges = {c.kwargs["Range"] for c in mock_s3_client.get_object.call_args_list}
+        assert len(ranges) == 8
+        assert "bytes=0-1023" not in ranges
+        assert "bytes=3072-4095" in ranges
+
+    def test_download_restarts_when_object_changed(
+        self, mock_s3_client, remote_object, tmp_path
+    ):
+        dest = tmp_path / "file.bin"
+        (tmp_path / "file.bin.part").write_bytes(bytes(len(remote_object)))
+        header = {"etag": '"etag-0"', "size": len(remote_object), "chunksize": 1024}
+        (tmp_path / "file.bin.part.state").write_text(json.dumps(header) + "\n0\n")
+
+        self.ranged_utils().download_file("bucket", "file.bin", str(dest))
+
+        assert dest.read_bytes() == remote_object
+        assert mock_s3_client.get_object.call_count == 10
+
+    def test_download_skips_matching_local_file(self, mock_s3_client, tmp_path):
+        dest = tmp_path / "file.txt"
+        dest.write_text("hello")
+        mock_s3_client.head_object.return_value = {
+            "ContentLength": 5, "ETag": '"5d41402abc4b2a76b9719d911017c592"'
+        }
+
+        assert not S3Utils().download_file("bucket", "file.txt", str(dest))
+        mock_s3_client.get_object.assert_not_called()
+
+    def test_download_prefix(self, mock_s3_client, remote_object, tmp_path):
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [
+            {"Contents": [{"Key": "data/"}, {"Key": "data/a.bin"}, {"Key": "data/x/b.bin"}]}
+        ]
+
+        stats = S3Utils().download_prefix("bucket", "data/", str(tmp_path), max_workers=2)
+
+        assert stats == {"downloaded": 2, "skipped": 0}
+        assert (tmp_path / "a.bin").read_bytes() == remote_object
+        assert (tmp_path / "x" / "b.bin").read_bytes() == remote_object
+
+    def test_download_prefix_skips_sibling_prefixes(self, mock_s3_client, remote_object, tmp_path):
+        keys = ["logs/a.log", "logs-old/b.log", "logs.txt"]
+        mock_s3_client.get_paginator.return_value.paginate.side_effect = \
+            lambda Bucket, Prefix: [{"Contents": [{"Key": k} for k in keys if k.startswith(Prefix)]}]
+
+        stats = S3Utils().download_prefix("bucket", "logs", str(tmp_path), max_workers=2)
+
+        assert stats == {"downloaded": 1, "skipped": 0}
+        assert sorted(os.listdir(tmp_path)) == ["a.log"]
+
+    def test_local_path_rejects_escaping_keys(self, tmp_path):
+        with pytest.raises(ValueError):
+            S3Utils._local_path(str(tmp_path), "../outside.txt")
+
+
+class TestS3UtilsResumableUpload:
+    CHUNK = 5 * 1024 * 1024
+
+    @pytest.fixture
+    def large_file(self, tmp_path):
+        path = tmp_path / "large.bin"
+        path.write_bytes(b"a" * self.CHUNK + b"b" * self.CHUNK + b"c" * 10)
+        return path
+
+    @pytest.fixture
+    def multipart_client(self, mock_s3_client):
+        mock_s3_client.create_multipart_upload.return_value = {"UploadId": "upload-1"}
+        mock_s3_client.upload_part.side_effect = lambda **kwargs: {
+            "ETag": f'"etag-{kwargs["PartNumber"]}"'
+        }
+        mock_s3_client.complete_multipart_upload.return_value = {"ETag": '"final"'}
+        return mock_s3_client
+
+    def utils(self):
+        return S3Utils(transfer_config=S3Utils.build_transfer_config(
+            multipart_chunksize=self.CHUNK
+        ))
+
+    def test_upload_sends_all_parts(self, multipart_client, large_file):
+        s3_utils = self.utils()
+
+        etag = s3_utils.upload_file_resumable(str(large_file), "bucket", "key")
+
+        assert etag == '"final"'
+        sent = sorted(c.kwargs["PartNumber"] for c in multipart_client.upload_part.call_args_list)
+        assert sent == [1, 2, 3]
+        multipart_client.complete_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="key", UploadId="upload-1",
+            MultipartUpload={"Parts": [
+                {"PartNumber": n, "ETag": f'"etag-{n}"'} for n in (1, 2, 3)
+            ]},
+        )
+        assert not os.path.exists(str(large_file) + ".upload.state")
+
+    def test_failed_upload_keeps_state(self, multipart_client, large_file):
+        def upload_part(**kwargs):
+            if kwargs["PartNumber"] == 2:
+                raise Exception("Connection reset")
+            return {"ETag": f'"etag-{kwargs["PartNumber"]}"'}
+
+        multipart_client.upload_part.side_effect = upload_part
+
+        with pytest.raises(Exception, match="Connection reset"):
+            self.utils().upload_file_resumable(str(large_file), "bucket", "key")
+
+        lines = open(str(large_file) + ".upload.state").read().splitlines()
+        assert json.loads(lines[0])["upload_id"] == "upload-1"
+        assert "2 " not in "\n".join(lines[1:])
+        multipart_client.complete_multipart_upload.assert_not_called()
+
+    def test_resume_sends_only_missing_parts(self, multipart_client, large_file):
+        s3_utils = self.utils()
+        stat = large_file.stat()
+        header = {"bucket": "bucket", "key": "key", "size": stat.st_size,
+                  "mtime": stat.st_mtime, "chunksize": self.CHUNK, "upload_id": "upload-0"}
+        (large_file.parent / "large.bin.upload.state").write_text(json.dumps(header) + "\n")
+        multipart_client.get_paginator.return_value.paginate.return_value = [
+            {"Parts": [{"PartNumber": 1, "ETag": '"old-1"'}, {"PartNumber": 3, "ETag": '"old-3"'}]}
+        ]
+
+        s3_utils.upload_file_resumable(str(large_file), "bucket", "key")
+
+        multipart_client.create_multipart_upload.assert_not_called()
+        multipart_client.upload_part.assert_called_once()
+        assert multipart_client.upload_part.call_args.kwargs["PartNumber"] == 2
+        assert multipart_client.upload_part.call_args.kwargs["UploadId"] == "upload-0"
+        parts = multipart_client.complete_multipart_upload.call_args.kwargs["MultipartUpload"]
+        assert parts["Parts"][0] == {"PartNumber": 1, "ETag": '"old-1"'}
+
+    def test_resume_ignores_state_for_modified_file(self, multipart_client, large_file):
+        header = {"bucket": "bucket", "key": "key", "size": 1, "mtime": 0,
+                  "chunksize": self.CHUNK, "upload_id": "upload-0"}
+        (large_file.parent / "large.bin.upload.state").write_text(json.dumps(header) + "\n")
+
+        self.utils().upload_file_resumable(str(large_file), "bucket", "key")
+
+        multipart_client.create_multipart_upload.assert_called_once()
+        assert multipart_client.upload_part.call_count == 3
+
+    def test_abort_incomplete_uploads(self, mock_s3_client):
+        old = datetime(2020, 1, 1, tzinfo=timezone.utc)
+        new = datetime.now(timezone.utc)
+        mock_s3_client.get_paginator.return_value.paginate.return_value = [{"Uploads": [
+            {"Key": "a", "UploadId": "1", "Initiated": old},
+            {"Key": "b", "UploadId": "2", "Initiated": new},
+        ]}]
+
+        aborted = S3Utils().abort_incomplete_uploads("bucket", "logs/")
+
+        assert aborted == 1
+        mock_s3_client.get_paginator.return_value.paginate.assert_called_once_with(
+            Bucket="bucket", Prefix="logs/"
+        )
+        mock_s3_client.abort_multipart_upload.assert_called_once_with(
+            Bucket="bucket", Key="a", UploadId="1"
+        )
@@ -0,0 +1,141 @@
+import threading
+import time
+
+import pytest
+
+from src.aws_utils.sqs_consumer import QueueConsumer
+
+
+class FakeQueueClient:
+    def __init__(self, count):
+        self.messages = [
+            {"MessageId": str(i), "ReceiptHandle": f"rh-{i}", "Body": f"body {i}"}
+            for i in range(count)
+        ]
+        self.lock = threading.Lock()
+        self.receive_calls = []
+        self.delete_batches = []
+        self.visibility_batches = []
+
+    def receive_message(self, **kwargs):
+        with self.lock:
+            self.receive_calls.append(kwargs)
+            count = kwargs["MaxNumberOfMessages"]
+            batch, self.messages = self.messages[:count], self.messages[count:]
+        return {"Messages": batch} if batch else {}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        with self.lock:
+            self.delete_batches.append(Entries)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        with self.lock:
+            self.visibility_batches.append(Entries)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+
+class TestQueueConsumer:
+    def test_run_processes_and_deletes_in_batches(self):
+        client = FakeQueueClient(95)
+        seen = []
+        lock = threading.Lock()
+
+        def handler(message):
+            with lock:
+                seen.append(message["MessageId"])
+
+        summary = QueueConsumer(client, "queue-url", receivers=3).run(handler, workers=4)
+
+        assert sorted(seen, key=int) == [str(i) for i in range(95)]
+        assert summary.received == 95
+        assert summary.processed == 95
+        assert summary.deleted == 95
+        assert all(len(batch) <= 10 for batch in client.delete_batches)
+        assert len(client.delete_batches) == 10
+        assert client.receive_calls[0]["WaitTimeSeconds"] == 20
+
+    def test_run_does_not_delete_failed_messages(self):
+        client = FakeQueueClient(5)
+
+        def handler(message):
+            if message["MessageId"] == "3":
+                raise ValueError("boom")
+
+        summary = QueueConsumer(client, "queue-url", receivers=1).run(handler, workers=2)
+
+        deleted = {e["ReceiptHandle"] for b in client.delete_batches for e in b}
+        assert summary.failed == 1
+        assert summary.processed == 4
+        assert "rh-3" not in deleted
+
+    def test_messages_respects_max_messages_without_delete(self):
+        client = FakeQueueClient(50)
+        consumer = QueueConsumer(
+            client, "queue-url", receivers=2, max_messages=15, delete=False
+        )
+
+        received = list(consumer.messages())
+
+        assert len(received) == 15
+        assert len(client.messages) == 35
+        assert client.delete_batches == []
+
+    def test_bounded_buffer_applies_backpressure(self):
+        client = FakeQueueClient(100)
+        consumer = QueueConsumer(client, "queue-url", receivers=2, max_buffered=5)
+        messages = consumer.messages()
+
+        next(messages)
+        time.sleep(0.2)
+
+        assert consumer._buffer.qsize() <= 5
+        assert len(client.messages) >= 100 - 5 - 1 - 2 * 10
+        messages.close()
+
+    def test_heartbeat_extends_visibility_for_slow_handlers(self):
+        client = FakeQueueClient(1)
+
+        QueueConsumer(client, "queue-url", receivers=1, visibility_timeout=0.2).run(
+            lambda message: time.sleep(0.35), workers=1
+        )
+
+        extended = [e for batch in client.visibility_batches for e in batch]
+        assert extended
+        assert extended[0]["ReceiptHandle"] == "rh-0"
+        assert extended[0]["VisibilityTimeout"] == 0.2
+
+    def test_zero_visibility_timeout_skips_heartbeat(self):
+        client = FakeQueueClient(1)
+        consumer = QueueConsumer(client, "queue-url", receivers=1, visibility_timeout=0)
+
+        summary = consumer.run(lambda message: time.sleep(0.1), workers=1)
+
+        assert summary.processed == 1
+        assert client.visibility_batches == []
+        assert len(consumer._threads) == 1
+
+    def test_receive_errors_are_raised(self):
+        client = FakeQueueClient(0)
+        client.receive_message = lambda **kwargs: (_ for _ in ()).throw(
+            RuntimeError("receive failed")
+        )
+
+        with pytest.raises(RuntimeError, match="receive failed"):
+            QueueConsumer(client, "queue-url", receivers=1).run(lambda m: None)
+
+    def test_resolve_and_on_deleted_hooks(self):
+        client = FakeQueueClient(12)
+        deleted = []
+
+        def resolve(messages):
+            return [dict(m, Body=m["Body"].upper()) for m in messages if m["MessageId"] != "3"]
+
+        handled = []
+        summary = QueueConsumer(
+            client, "queue-url", receivers=1, resolve=resolve, on_deleted=deleted.extend
+        ).run(lambda message: handled.append(message["Body"]), workers=2)
+
+        assert (summary.received, summary.processed, summary.failed) == (12, 11, 1)
+        assert "BODY 0" in handled and "BODY 3" not in handled
+        assert sorted(deleted) == sorted(f"rh-{i}" for i in range(12) if i != 3)
@@ -1,8 +1,17 @@
+import base64
+import gzip
+import io
+import json
+import threading
+import time
 from unittest.mock import Mock, patch
 
 import pytest
 
+from src.aws_utils.codec import ENCODING_ATTRIBUTE, BodyCodec
+from src.aws_utils.progress import Progress
 from src.aws_utils.sqs_utils import SQSUtils
+from src.aws_utils.throttling import rate_controller
 
 
 @pytest.fixture
@@ -81,7 +90,8 @@ class TestSQSUtils:
 
         assert result == mock_messages
         mock_sqs_client.receive_message.assert_called_once_with(
-            QueueUrl=queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=2
+            QueueUrl=queue_url, MaxNumberOfMessages=10, WaitTimeSeconds=2,
+            MessageAttributeNames=["All"],
         )
 
     def test_send_message(self, sqs_utils, mock_sqs_client):
@@ -103,3 +113,428 @@ class TestSQSUtils:
         assert len(batches[0]) == 10
         assert len(batches[1]) == 10
         assert len(batches[2]) == 5
+
+    def test_pack_batches_by_count(self, sqs_utils):
+        entries = ({"MessageBody": str(i)} for i in range(25))
+
+        batches = list(sqs_utils._pack_batches(entries))
+
+        assert [len(b) for b in batches] == [10, 10, 5]
+        assert [e["Id"] for e in batches[2]] == ["0", "1", "2", "3", "4"]
+
+    def test_pack_batches_by_payload_size(self, sqs_utils):
+        body = "x" * (100 * 1024)
+        entries = ({"MessageBody": body} for _ in range(5))
+
+        batches = list(sqs_utils._pack_batches(entries))
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+
+    def test_send_messages_from_file(self, sqs_utils, mock_sqs_client, tmp_path):
+        file_path = tmp_path / "messages.txt"
+        file_path.write_text("\n".join(f"message {i}" for i in range(25)) + "\n\n")
+        mock_sqs_client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            "Successful": [{"Id": e["Id"]} for e in Entries]
+        }
+
+        summary = sqs_utils.send_messages_from_file(
+            "test-queue-url", str(file_path), max_in_flight=2
+        )
+
+        assert summary.sent == 25
+        assert summary.failed == 0
+        assert summary.messages_per_second > 0
+        assert mock_sqs_client.send_message_batch.call_count == 3
+        bodies = sorted(
+            e["MessageBody"]
+            for call in mock_sqs_client.send_message_batch.call_args_list
+            for e in call.kwargs["Entries"]
+        )
+        assert bodies == sorted(f"message {i}" for i in range(25))
+
+    def test_send_messages_from_file_reports_progress(
+        self, sqs_utils, mock_sqs_client, tmp_path
+    ):
+        file_path = tmp_path / "messages.txt"
+        file_path.write_text("\n".join(f"message {i}" for i in range(25)) + "\n\n")
+        mock_sqs_client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            "Successful": [{"Id": e["Id"]} for e in Entries]
+        }
+        reports = []
+        progress = Progress("send", callback=reports.append)
+
+        sqs_utils.send_messages_from_file(
+            "test-queue-url", str(file_path), max_in_flight=2, progress=progress
+        )
+
+        assert reports[-1].finished
+        assert (reports[-1].done, reports[-1].total) == (25, 25)
+
+    def test_send_fifo_preserves_order_within_groups(self, sqs_utils, mock_sqs_client, tmp_path):
+        groups = ["a", "b", "c", "d"]
+        lines = [json.dumps({"body": f"{g}-{i}", "group_id": g})
+                 for i in range(35) for g in groups]
+        file_path = tmp_path / "messages.jsonl"
+        file_path.write_text("\n".join(lines))
+
+        lock = threading.Lock()
+        received = {g: [] for g in groups}
+        active = set()
+        overlap = []
+        max_active = [0]
+
+        def send_message_batch(QueueUrl, Entries):
+            group = Entries[0]["MessageGroupId"]
+            with lock:
+                overlap.append(group in active)
+                active.add(group)
+                max_active[0] = max(max_active[0], len(active))
+            time.sleep(0.005)
+            with lock:
+                active.discard(group)
+                received[group].extend(e["MessageBody"] for e in Entries)
+            return {"Successful": [{"Id": e["Id"]} for e in Entries]}
+
+        mock_sqs_client.send_message_batch.side_effect = send_message_batch
+
+        summary = sqs_utils.send_messages_from_file(
+            "https://q/orders.fifo", str(file_path), max_in_flight=4
+        )
+
+        assert (summary.sent, summary.failed) == (140, 0)
+        assert not any(overlap)
+        assert max_active[0] > 1
+        for group in groups:
+            assert received[group] == [f"{group}-{i}" for i in range(35)]
+        entry = mock_sqs_client.send_message_batch.call_args_list[0].kwargs["Entries"][0]
+        assert entry["MessageDeduplicationId"] == SQSUtils.deduplication_id(entry["MessageBody"])
+
+    def test_send_fifo_uses_default_group_and_input_dedup_ids(
+        self, sqs_utils, mock_sqs_client, tmp_path
+    ):
+        file_path = tmp_path / "messages.txt"
+        file_path.write_text('plain\n{"body": {"n": 1}, "dedup_id": "d-1"}\n')
+        mock_sqs_client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            "Successful": [{"Id": e["Id"]} for e in Entries]
+        }
+
+        summary = sqs_utils.send_messages_from_file(
+            "https://q/orders.fifo", str(file_path), group_id="default"
+        )
+
+        entries = mock_sqs_client.send_message_batch.call_args.kwargs["Entries"]
+        assert summary.sent == 2
+        assert [e["MessageGroupId"] for e in entries] == ["default", "default"]
+        assert entries[1]["MessageBody"] == '{"n": 1}'
+        assert entries[1]["MessageDeduplicationId"] == "d-1"
+
+    def test_send_fifo_skips_lines_without_group(self, sqs_utils, mock_sqs_client, tmp_path):
+        file_path = tmp_path / "messages.txt"
+        file_path.write_text("no group\n")
+
+        summary = sqs_utils.send_messages_from_file("https://q/orders.fifo", str(file_path))
+
+        assert (summary.sent, summary.failed) == (0, 1)
+        mock_sqs_client.send_message_batch.assert_not_called()
+
+    @patch("time.sleep")
+    def test_send_fifo_batch_resends_tail_after_failure(
+        self, mock_sleep, sqs_utils, mock_sqs_client
+    ):
+        batch = [{"Id": str(i), "MessageBody": f"m{i}", "MessageGroupId": "g",
+                  "MessageDeduplicationId": f"d{i}"} for i in range(3)]
+        mock_sqs_client.send_message_batch.side_effect = [
+            {"Successful": [{"Id": "0"}, {"Id": "2"}],
+             "Failed": [{"Id": "1", "SenderFault": False, "Code": "InternalError"}]},
+            {"Successful": [{"Id": "1"}, {"Id": "2"}]},
+        ]
+
+        assert sqs_utils._send_fifo_batch("https://q/orders.fifo", batch) == (3, 0)
+        retry_call = mock_sqs_client.send_message_batch.call_args_list[1]
+        assert retry_call.kwargs["Entries"] == batch[1:]
+
+    def test_send_message_fifo(self, sqs_utils, mock_sqs_client):
+        sqs_utils.send_message("https://q/orders.fifo", "hello", group_id="g")
+
+        mock_sqs_client.send_message.assert_called_once_with(
+            QueueUrl="https://q/orders.fifo", MessageBody="hello", MessageGroupId="g",
+            MessageDeduplicationId=SQSUtils.deduplication_id("hello"),
+        )
+
+    def test_compressed_bodies_pack_more_per_batch(self, mock_sqs_client, tmp_path):
+        body = json.dumps([{"id": i, "status": "ok"} for i in range(1400)])
+        file_path = tmp_path / "messages.txt"
+        file_path.write_text("\n".join([body] * 40))
+        mock_sqs_client.send_message_batch.side_effect = lambda QueueUrl, Entries: {
+            "Successful": [{"Id": e["Id"]} for e in Entries]
+        }
+
+        plain = SQSUtils().send_messages_from_file("test-queue-url", str(file_path))
+        plain_calls = mock_sqs_client.send_message_batch.call_count
+        mock_sqs_client.send_message_batch.reset_mock()
+        compressed = SQSUtils(codec=BodyCodec()).send_messages_from_file(
+            "test-queue-url", str(file_path)
+        )
+
+        assert plain.sent == compressed.sent == 40
+        assert plain_calls == 7
+        assert mock_sqs_client.send_message_batch.call_count == 4
+        entry = mock_sqs_client.send_message_batch.call_args.kwargs["Entries"][0]
+        assert entry["MessageAttributes"][ENCODING_ATTRIBUTE]["StringValue"] == "zlib+base64"
+
+    def test_receive_decodes_compressed_bodies(self, sqs_utils, mock_sqs_client):
+        body = "hello " * 1000
+        entry = BodyCodec().encode({"MessageBody": body})
+        mock_sqs_client.receive_message.return_value = {"Messages": [
+            {"MessageId": "1", "Body": entry["MessageBody"],
+             "MessageAttributes": entry["MessageAttributes"]},
+            {"MessageId": "2", "Body": "plain"},
+        ]}
+
+        messages = sqs_utils.receive_messages("test-queue-url")
+
+        assert [m["Body"] for m in messages] == [body, "plain"]
+
+    @pytest.mark.parametrize("encoding, body", [
+        ("zlib+base64", base64.b64encode(b"not zlib data").decode()),
+        ("gzip+base64", base64.b64encode(gzip.compress(b"x" * 100)[:20]).decode()),
+        ("zlib+base64", "not base64!"),
+    ])
+    def test_receive_passes_through_corrupt_bodies(
+        self, sqs_utils, mock_sqs_client, encoding, body
+    ):
+        attributes = {ENCODING_ATTRIBUTE: {"DataType": "String", "StringValue": encoding}}
+        mock_sqs_client.receive_message.return_value = {"Messages": [
+            {"MessageId": "1", "Body": body, "MessageAttributes": attributes},
+            {"MessageId": "2", "Body": "plain"},
+        ]}
+
+        messages = sqs_utils.receive_messages("test-queue-url")
+
+        assert [m["Body"] for m in messages] == [body, "plain"]
+
+    def test_entry_size_counts_attributes(self):
+        entry = {"MessageBody": "abc",
+                 "MessageAttributes": {"Key": {"DataType": "String", "StringValue": "value"}}}
+
+        assert SQSUtils._entry_size(entry) == 3 + 3 + 6 + 5
+
+    @patch("time.sleep")
+    def test_send_batch_retries_only_failed_entries(
+        self, mock_sleep, sqs_utils, mock_sqs_client
+    ):
+        batch = [{"Id": str(i), "MessageBody": f"m{i}"} for i in range(3)]
+        mock_sqs_client.send_message_batch.side_effect = [
+            {
+                "Successful": [{"Id": "0"}],
+                "Failed": [
+                    {"Id": "1", "SenderFault": False, "Code": "InternalError"},
+                    {"Id": "2", "SenderFault": True, "Code": "InvalidMessageContents"},
+                ],
+            },
+            {"Successful": [{"Id": "1"}]},
+        ]
+
+        assert sqs_utils._send_batch("test-queue-url", batch) == (2, 1)
+        retry_call = mock_sqs_client.send_message_batch.call_args_list[1]
+        assert retry_call.kwargs["Entries"] == [batch[1]]
+
+    @patch("time.sleep")
+    def test_send_batch_records_throttled_entries(
+        self, mock_sleep, sqs_utils, mock_sqs_client
+    ):
+        batch = [{"Id": "0", "MessageBody": "m0"}]
+        mock_sqs_client.send_message_batch.side_effect = [
+            {"Failed": [{"Id": "0", "SenderFault": False, "Code": "RequestThrottled"}]},
+            {"Successful": [{"Id": "0"}]},
+        ]
+
+        assert sqs_utils._send_batch("test-queue-url", batch) == (1, 0)
+        assert rate_controller.stats()["sqs.SendMessageBatch"].throttled == 1
+
+    def test_send_batch_skips_oversized_entries(self, sqs_utils, mock_sqs_client):
+        batch = [{"Id": "0", "MessageBody": "x" * (256 * 1024 + 1)}]
+
+        assert sqs_utils._send_batch("test-queue-url", batch) == (0, 1)
+        mock_sqs_client.send_message_batch.assert_not_called()
+
+    def test_consume_uses_long_polling(self, sqs_utils, mock_sqs_client):
+        mock_sqs_client.receive_message.side_effect = [
+            {"Messages": [{"MessageId": "1", "ReceiptHandle": "rh", "Body": "b"}]},
+            {},
+        ]
+        mock_sqs_client.delete_message_batch.return_value = {"Successful": [{"Id": "0"}]}
+        handler = Mock()
+
+        summary = sqs_utils.consume("test-queue-url", handler, workers=1, receivers=1)
+
+        assert summary.processed == 1
+        handler.assert_called_once()
+        mock_sqs_client.receive_message.assert_called_with(
+            QueueUrl="test-queue-url", MaxNumberOfMessages=10,
+            WaitTimeSeconds=20, VisibilityTimeout=30,
+            AttributeNames=["All"], MessageAttributeNames=["All"],
+        )
+        mock_sqs_client.delete_message_batch.assert_called_once_with(
+            QueueUrl="test-queue-url", Entries=[{"Id": "0", "ReceiptHandle": "rh"}]
+        )
+
+    def test_scan_messages_streams_unique_matches(self, sqs_utils, mock_sqs_client):
+        messages = [
+            {"MessageId": "1", "ReceiptHandle": "a", "Body": '{"type": "poison"}'},
+            {"MessageId": "2", "ReceiptHandle": "b", "Body": '{"type": "ok"}'},
+            {"MessageId": "3", "ReceiptHandle": "c", "Body": "not json poison"},
+        ]
+        mock_sqs_client.receive_message.side_effect = [
+            {"Messages": messages},
+            {"Messages": [dict(messages[0], ReceiptHandle="d")]},
+            {},
+        ]
+        output = io.StringIO()
+
+        summary = sqs_utils.scan_messages(
+            "test-queue-url", output, receivers=1, jmespath_filter="type == 'poison'"
+        )
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [r["MessageId"] for r in records] == ["1"]
+        assert "ReceiptHandle" not in records[0]
+        assert summary.scanned == 3
+        assert summary.matched == 1
+        assert summary.duplicates == 1
+        mock_sqs_client.delete_message_batch.assert_not_called()
+        assert mock_sqs_client.receive_message.call_args.kwargs["VisibilityTimeout"] == 120
+
+    def test_scan_messages_stops_at_cap(self, sqs_utils, mock_sqs_client):
+        mock_sqs_client.receive_message.side_effect = lambda **kwargs: {"Messages": [
+            {"MessageId": str(i), "ReceiptHandle": str(i), "Body": "poison"}
+            for i in range(kwargs["MaxNumberOfMessages"])
+        ]}
+        output = io.StringIO()
+
+        summary = sqs_utils.scan_messages(
+            "test-queue-url", output, max_messages=5, body_contains="poison", receivers=1
+        )
+
+        assert summary.scanned == 5
+        assert len(output.getvalue().splitlines()) == 5
+
+    def test_list_queues_paginates_with_max_results(self, sqs_utils, mock_sqs_client):
+        base = "https://sqs.us-east-1.amazonaws.com/123"
+        mock_sqs_client.list_queues.side_effect = [
+            {"QueueUrls": [f"{base}/orders"], "NextToken": "token"},
+            {"QueueUrls": [f"{base}/orders-dlq"]},
+        ]
+
+        result = sqs_utils.list_queues(prefix="orders")
+
+        assert result == [(f"{base}/orders", "orders"), (f"{base}/orders-dlq", "orders-dlq")]
+        mock_sqs_client.list_queues.assert_any_call(
+            MaxResults=1000, QueueNamePrefix="orders"
+        )
+        mock_sqs_client.list_queues.assert_called_with(
+            MaxResults=1000, QueueNamePrefix="orders", NextToken="token"
+        )
+
+    def test_list_queues_cached_and_narrowed_locally(self, sqs_utils, mock_sqs_client):
+        mock_sqs_client.list_queues.return_value = {
+            "QueueUrls": ["https://q/orders", "https://q/orders-dlq", "https://q/users"]
+        }
+
+        sqs_utils.list_queues()
+        narrowed = sqs_utils.get_queues(prefix="orders-")
+
+        assert narrowed == ["https://q/orders-dlq"]
+        mock_sqs_client.list_queues.assert_called_once()
+
+    def test_list_queues_cache_expires(self, sqs_utils, mock_sqs_client):
+        mock_sqs_client.list_queues.return_value = {"QueueUrls": []}
+
+        with patch("time.monotonic", side_effect=[0, 0, 61, 61]):
+            sqs_utils.list_queues()
+            sqs_utils.list_queues()
+
+        assert mock_sqs_client.list_queues.call_count == 2
+
+    def test_list_queues_refresh(self, sqs_utils, mock_sqs_client):
+        mock_sqs_client.list_queues.return_value = {"QueueUrls": []}
+
+        sqs_utils.list_queues()
+        sqs_utils.list_queues(refresh=True)
+
+        assert mock_sqs_client.list_queues.call_count == 2
+
+    def test_create_and_delete_queue_invalidate_cache(self, sqs_utils, mock_sqs_client):
+        mock_sqs_client.list_queues.return_value = {"QueueUrls": []}
+        mock_sqs_client.create_queue.return_value = {"QueueUrl": "https://q/new"}
+
+        sqs_utils.list_queues()
+        assert sqs_utils.create_queue("new") == "https://q/new"
+        sqs_utils.list_queues()
+        sqs_utils.delete_queue("https://q/new")
+        sqs_utils.list_queues()
+
+        assert mock_sqs_client.list_queues.call_count == 3
+        mock_sqs_client.delete_queue.assert_called_once_with(QueueUrl="https://q/new")
+
+    def test_get_queue_metrics_sorted_by_backlog(self, sqs_utils, mock_sqs_client):
+        attributes = {
+            "https://q/a": {"ApproximateNumberOfMessages": "1"},
+            "https://q/b": {
+                "ApproximateNumberOfMessages": "5",
+                "ApproximateNumberOfMessagesNotVisible": "2",
+                "ApproximateNumberOfMessagesDelayed": "1",
+            },
+        }
+
+        def get_queue_attributes(QueueUrl, AttributeNames):
+            if QueueUrl == "https://q/gone":
+                raise Exception("NonExistentQueue")
+            return {"Attributes": attributes[QueueUrl]}
+
+        mock_sqs_client.get_queue_attributes.side_effect = get_queue_attributes
+
+        metrics = sqs_utils.get_queue_metrics(["https://q/a", "https://q/gone", "https://q/b"])
+
+        assert [m.name for m in metrics] == ["b", "a", "gone"]
+        assert (metrics[0].visible, metrics[0].in_flight, metrics[0].delayed) == (5, 2, 1)
+        assert metrics[2].error == "NonExistentQueue"
+
+    def test_get_queue_metrics_fans_out(self, sqs_utils, mock_sqs_client):
+        lock = threading.Lock()
+        active = {"now": 0, "peak": 0}
+
+        def slow_attributes(QueueUrl, AttributeNames):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+            return {"Attributes": {"ApproximateNumberOfMessages": "1"}}
+
+        mock_sqs_client.get_queue_attributes.side_effect = slow_attributes
+        queue_urls = [f"https://q/{i}" for i in range(20)]
+
+        sqs_utils.get_queue_metrics(queue_urls, max_workers=1)
+        assert active["peak"] == 1
+        metrics = sqs_utils.get_queue_metrics(queue_urls, max_workers=10)
+
+        assert len(metrics) == 20
+        assert 1 < active["peak"] <= 10
+
+    @patch("time.sleep")
+    def test_watch_queue_metrics_reports_changed_rows(
+        self, mock_sleep, sqs_utils, mock_sqs_client
+    ):
+        counts = iter(["1", "2", "1", "1", "1", "1"])
+        mock_sqs_client.get_queue_attributes.side_effect = lambda **kwargs: {
+            "Attributes": {"ApproximateNumberOfMessages": next(counts)}
+        }
+
+        ticks = list(sqs_utils.watch_queue_metrics(
+            5, ["https://q/a", "https://q/b"], max_workers=1, iterations=3
+        ))
+
+        assert [len(changed) for _, changed in ticks] == [2, 1, 0]
+        mock_sleep.assert_called_with(5)
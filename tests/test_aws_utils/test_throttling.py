@@ -0,0 +1,207 @@
+import threading
+import time
+from unittest.mock import patch
+
+import boto3
+from botocore.config import Config
+from botocore.stub import Stubber
+
+from src.aws_utils.throttling import (AIMDLimiter, RateController, TokenBucket,
+                                      backoff_delay, is_throttle_error)
+
+
+SCOPE = ("us-east-1", "")
+
+
+def make_client(service="sqs", region="us-east-1", config=None):
+    session = boto3.Session(
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name=region,
+    )
+    return session.client(service, config=config)
+
+
+class TestTokenBucket:
+    def test_burst_then_wait(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert 0.05 < bucket.try_acquire() <= 0.1
+
+    @patch("time.sleep")
+    def test_acquire_sleeps_for_deficit(self, mock_sleep):
+        bucket = TokenBucket(rate=100, capacity=1)
+        bucket.acquire()
+        bucket.acquire()
+
+        mock_sleep.assert_called_once()
+        assert 0 < mock_sleep.call_args.args[0] <= 0.01
+
+
+class TestAIMDLimiter:
+    def test_throttle_halves_limit_with_cooldown(self):
+        limiter = AIMDLimiter(initial=16, minimum=2, maximum=16)
+
+        assert limiter.on_throttle()
+        assert limiter.limit == 8
+        assert not limiter.on_throttle()
+        assert limiter.limit == 8
+
+    def test_success_increases_additively(self):
+        limiter = AIMDLimiter(initial=4, minimum=1, maximum=5)
+        for _ in range(5):
+            limiter.on_success()
+
+        assert limiter.limit == 5
+        for _ in range(20):
+            limiter.on_success()
+        assert limiter.limit == 5
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AIMDLimiter(initial=1, minimum=1, maximum=1)
+        limiter.acquire()
+        acquired = threading.Event()
+
+        def worker():
+            limiter.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        assert not acquired.wait(0.05)
+        limiter.release()
+        assert acquired.wait(1)
+        thread.join()
+
+
+class TestBackoff:
+    def test_backoff_delay_is_capped(self):
+        for attempt in range(10):
+            assert 0 <= backoff_delay(attempt, base=0.1, cap=1.0) <= 1.0
+
+    def test_is_throttle_error(self):
+        assert is_throttle_error("SlowDown")
+        assert is_throttle_error("RequestThrottled")
+        assert not is_throttle_error("AccessDenied")
+        assert not is_throttle_error(None)
+
+
+class TestRateController:
+    def test_counts_calls_and_releases_slots(self):
+        controller = RateController(rates={})
+        client = controller.register(make_client())
+
+        with Stubber(client) as stubber:
+            stubber.add_response("list_queues", {"QueueUrls": []})
+            stubber.add_response("list_queues", {"QueueUrls": []})
+            client.list_queues()
+            client.list_queues()
+
+        stats = controller.stats()["sqs.ListQueues"]
+        assert stats.calls == 2
+        assert stats.throttled == 0
+        assert controller._limiters[("sqs",) + SCOPE].in_flight == 0
+
+    def test_releases_slot_on_error(self):
+        controller = RateController(rates={})
+        client = controller.register(make_client())
+
+        with Stubber(client) as stubber:
+            stubber.add_client_error("list_queues", service_error_code="AccessDenied")
+            try:
+                client.list_queues()
+            except client.exceptions.ClientError:
+                pass
+
+        assert controller._limiters[("sqs",) + SCOPE].in_flight == 0
+
+    def test_throttle_response_reduces_concurrency(self):
+        controller = RateController(rates={}, initial_concurrency=32, max_concurrency=32)
+        controller.record_throttle("s3", "PutObject")
+
+        stats = controller.stats()["s3.PutObject"]
+        assert stats.throttled == 1
+        assert stats.concurrency_limit == 16
+
+    def test_needs_retry_counts_throttles(self):
+        controller = RateController(rates={})
+        client = make_client("s3")
+        operation = client.meta.service_model.operation_model("PutObject")
+        context = {}
+        controller._before_call(SCOPE, None, model=operation, context=context)
+
+        controller._needs_retry(
+            SCOPE,
+            response=(None, {"Error": {"Code": "SlowDown"}}),
+            operation=operation,
+            request_dict={"context": context},
+        )
+        controller._after_call(context=context)
+
+        stats = controller.stats()["s3.PutObject"]
+        assert stats.throttled == 1
+        assert stats.retries == 1
+        assert stats.concurrency_limit == 32
+        assert controller._limiters[("s3",) + SCOPE].in_flight == 0
+
+    def test_rate_limits_operation(self):
+        controller = RateController(rates={"sqs.ListQueues": 20})
+        controller._buckets["sqs.ListQueues"] = TokenBucket(20, capacity=1)
+        client = controller.register(make_client())
+
+        start = time.monotonic()
+        with Stubber(client) as stubber:
+            for _ in range(3):
+                stubber.add_response("list_queues", {"QueueUrls": []})
+                client.list_queues()
+
+        assert time.monotonic() - start >= 0.09
+        assert controller.stats()["sqs.ListQueues"].waited_seconds > 0
+
+    def test_long_poll_receive_skips_concurrency_slot(self):
+        controller = RateController(rates={}, initial_concurrency=1)
+        client = controller.register(make_client())
+        limiter_key = controller.acquire("sqs", "SendMessage", SCOPE)
+        done = threading.Event()
+
+        def receive():
+            with Stubber(client) as stubber:
+                stubber.add_response("receive_message", {"Messages": []})
+                client.receive_message(QueueUrl="https://q", WaitTimeSeconds=20)
+            done.set()
+
+        thread = threading.Thread(target=receive)
+        thread.start()
+        assert done.wait(1)
+        thread.join()
+        assert controller._limiters[limiter_key].in_flight == 1
+        assert controller.stats()["sqs.ReceiveMessage"].calls == 1
+        controller.release(limiter_key)
+
+    def test_limiters_are_scoped_by_region_and_profile(self):
+        controller = RateController(rates={}, initial_concurrency=32, max_concurrency=32)
+        controller.record_throttle("sqs", "SendMessageBatch", scope=("us-east-1", "prod"))
+
+        assert controller._limiters[("sqs", "us-east-1", "prod")].limit == 16
+        controller._lookup("sqs", "sqs.SendMessageBatch", ("eu-west-1", "prod"))
+        assert controller._limiters[("sqs", "eu-west-1", "prod")].limit == 32
+
+    def test_register_records_scope(self):
+        controller = RateController(rates={})
+        client = controller.register(make_client(region="eu-west-1"), "prod")
+
+        assert controller.scope(client) == ("eu-west-1", "prod")
+
+    def test_max_concurrency_follows_connection_pool(self):
+        controller = RateController(rates={})
+        client = controller.register(make_client(config=Config(max_pool_connections=8)))
+
+        with Stubber(client) as stubber:
+            stubber.add_response("list_queues", {"QueueUrls": []})
+            client.list_queues()
+
+        limiter = controller._limiters[("sqs",) + SCOPE]
+        assert limiter.maximum == 8
+        assert limiter.limit == 8
@@ -1,6 +1,10 @@
+import sys
 from unittest.mock import Mock, patch
 
-from cli import MenuHandler, SQSActionExecutor
+from prompt_toolkit.document import Document
+
+from cli import MenuHandler, QueueCompleter, SQSActionExecutor, fuzzy_match, select_queue
+from src.aws_utils.configuration import Config
 
 
 class TestMenuHandler:
@@ -37,11 +41,219 @@ class TestSQSActionExecutor:
         self.executor.sqs.list_queues.assert_called_once()
 
 
+class TestSelectQueue:
+    def setup_method(self):
+        self.sqs = Mock()
+        self.queues = [
+            ("https://q/orders", "orders"),
+            ("https://q/orders-dlq", "orders-dlq"),
+            ("https://q/users", "users"),
+        ]
+        self.sqs.list_queues.side_effect = lambda prefix="": [
+            q for q in self.queues if q[1].startswith(prefix)
+        ]
+
+    def completions(self, text):
+        completer = QueueCompleter(self.sqs)
+        return [c.text for c in completer.get_completions(Document(text), None)]
+
+    def test_completer_uses_server_side_prefix(self):
+        assert self.completions("ord") == ["orders", "orders-dlq"]
+        self.sqs.list_queues.assert_called_once_with(prefix="ord")
+
+    def test_completer_falls_back_to_fuzzy_match(self):
+        assert self.completions("odlq") == ["orders-dlq"]
+
+    def test_completer_ignores_urls(self):
+        assert self.completions("https://q/orders") == []
+
+    def test_fuzzy_match(self):
+        assert fuzzy_match("usr", "users")
+        assert not fuzzy_match("usx", "users")
+
+    @patch("questionary.autocomplete")
+    def test_select_queue_resolves_name(self, mock_autocomplete):
+        mock_autocomplete.return_value.ask.return_value = "orders"
+
+        assert select_queue(self.sqs) == "https://q/orders"
+
+    @patch("questionary.autocomplete")
+    def test_select_queue_unknown_name(self, mock_autocomplete):
+        mock_autocomplete.return_value.ask.return_value = "other"
+        self.sqs.get_queue_url.return_value = "https://q/other"
+
+        assert select_queue(self.sqs) == "https://q/other"
+
+
 @patch("cli.ConfigurationManager")
 def test_main_exit(mock_config_manager):
     with patch("questionary.select") as mock_select:
         mock_select.return_value.ask.return_value = "Exit"
         from cli import main
 
-        main()
+        main([])
         mock_select.assert_called()
+
+
+@patch("cli.ConfigurationManager")
+def test_configure_keeps_other_settings(mock_config_manager):
+    from cli import main
+
+    manager = mock_config_manager.return_value
+    manager.load_config.return_value = Config.from_dict({
+        "region": "us-east-1", "profile": "old", "sqs": "orders", "bucket": "payloads",
+        "client": {"max_pool_connections": 100},
+    })
+    with patch("questionary.select") as mock_select, \
+            patch("questionary.text") as mock_text:
+        mock_select.return_value.ask.side_effect = ["Configure", "Exit"]
+        mock_text.return_value.ask.side_effect = ["eu-west-1, us-west-2", "dev"]
+        main([])
+
+    saved = manager.save_config.call_args.args[0]
+    assert (saved.region, saved.regions) == ("eu-west-1", ["eu-west-1", "us-west-2"])
+    assert (saved.profile, saved.profiles) == ("dev", [])
+    assert (saved.sqs, saved.bucket) == ("orders", "payloads")
+    assert saved.client.max_pool_connections == 100
+
+
+@patch("cli.run_command", return_value=0)
+def test_main_reads_sys_argv(mock_run_command):
+    from cli import main
+
+    with patch.object(sys, "argv", ["aws-utils-cli", "sqs", "list"]):
+        assert main() == 0
+    mock_run_command.assert_called_once_with(["sqs", "list"])
+
+
+class TestStats:
+    def test_render_stats_row(self):
+        from cli import render_stats_row
+
+        row = render_stats_row("sqs.SendMessageBatch", {
+            "calls": 3, "errors": 1, "retries": 2, "bytes_sent": 10, "bytes_received": 20,
+            "latency_ms": {"p50": 1.0, "p90": 2.0, "p99": 3.25},
+        })
+
+        assert row.split() == ["sqs.SendMessageBatch", "3", "1", "2", "10", "20",
+                               "1.0", "2.0", "3.2"]
+
+    @patch("questionary.text")
+    def test_show_stats_dumps_json(self, mock_text, tmp_path):
+        from cli import instrumentation, show_stats
+
+        instrumentation.record("sqs.ListQueues", 5.0)
+        path = tmp_path / "stats.json"
+        mock_text.return_value.ask.return_value = str(path)
+
+        show_stats()
+
+        assert "sqs.ListQueues" in path.read_text()
+
+
+class TestCommandMode:
+    def setup_method(self):
+        from cli import CommandRunner, build_parser
+
+        self.parser = build_parser()
+        self.runner = CommandRunner(Mock())
+        self.runner._sqs = Mock()
+        self.runner._s3 = Mock()
+
+    def test_parser_maps_subcommands(self):
+        args = self.parser.parse_args(["sqs", "send", "orders", "hello"])
+        assert (args.command, args.queue, args.body) == ("sqs_send", "orders", "hello")
+
+        args = self.parser.parse_args(["s3", "sync", "dir", "bucket", "--delete"])
+        assert (args.command, args.prefix, args.delete) == ("s3_sync", "", True)
+
+    def test_send_resolves_queue_name(self):
+        self.runner._sqs.list_queues.return_value = [("https://q/orders", "orders")]
+
+        self.runner.run(self.parser.parse_args(["sqs", "send", "orders", "hello"]))
+
+        self.runner._sqs.send_message.assert_called_once_with("https://q/orders", "hello", None, None)
+
+    def test_run_batch_reports_each_line_in_order(self):
+        import io
+        import json
+
+        from cli import run_batch
+
+        self.runner._sqs.get_message_count.side_effect = lambda url: int(url.rsplit("/", 1)[1])
+        lines = ["# counts", ""] + [f"sqs count https://q/{i}" for i in range(20)] + ["bogus"]
+        output = io.StringIO()
+
+        failed = run_batch(self.runner, self.parser, lines, parallel=4, output=output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert failed == 1
+        assert [r["result"]["count"] for r in records[:-1]] == list(range(20))
+        assert records[-1] == {"line": 23, "command": "bogus", "ok": False,
+                               "error": "invalid command"}
+
+    def test_run_batch_fail_fast(self):
+        import io
+
+        from cli import run_batch
+
+        deleted = []
+
+        def delete_object(bucket, key):
+            deleted.append(key)
+            if key == "key3":
+                raise RuntimeError("denied")
+
+        self.runner._s3.delete_object.side_effect = delete_object
+        lines = [f"s3 delete bucket key{i}" for i in range(10)]
+        output = io.StringIO()
+
+        failed = run_batch(self.runner, self.parser, lines, fail_fast=True, output=output)
+
+        assert failed == 1
+        assert deleted == ["key0", "key1", "key2", "key3"]
+        assert len(output.getvalue().splitlines()) == 4
+        assert "RuntimeError: denied" in output.getvalue().splitlines()[-1]
+
+    @patch("cli.ConfigurationManager")
+    @patch("cli.CommandRunner")
+    def test_main_runs_command_without_menus(self, mock_runner, mock_config_manager, capsys):
+        from cli import main
+
+        mock_runner.return_value.run.return_value = ["bucket-a"]
+
+        with patch("questionary.select") as mock_select:
+            assert main(["s3", "list-buckets"]) == 0
+            mock_select.assert_not_called()
+
+        assert capsys.readouterr().out.strip() == '["bucket-a"]'
+        mock_config_manager.return_value.create_session.assert_called_once()
+
+
+class TestFanOutCommands:
+    def test_render_fanout_aligns_columns(self):
+        from cli import render_fanout
+        from src.aws_utils.fanout import FanOutResult
+
+        result = FanOutResult(rows=[
+            {"profile": "dev", "region": "us-east-1", "name": "orders"},
+            {"profile": "production", "region": "eu-west-1", "name": "q"},
+        ])
+
+        header, *rows = render_fanout(result, "queues")
+
+        assert header.split() == ["PROFILE", "REGION", "NAME"]
+        assert rows[0].index("us-east-1") == rows[1].index("eu-west-1")
+
+    @patch("src.aws_utils.FanOut")
+    def test_fanout_command_overrides_targets(self, mock_fanout):
+        from cli import CommandRunner, build_parser
+
+        runner = CommandRunner(Mock(), config=Config(profile="dev", regions=["a", "b"]))
+        args = build_parser().parse_args(["fanout", "queues", "--regions", "x,y", "--timeout", "5"])
+
+        runner.run(args)
+        runner.run(args)
+
+        mock_fanout.assert_called_once_with([("dev", "x"), ("dev", "y")], timeout=5.0)
+        assert mock_fanout.return_value.list_queues.call_count == 2
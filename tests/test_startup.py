@@ -0,0 +1,57 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STARTUP_BUDGET_SECONDS = float(os.environ.get("AWS_UTILS_STARTUP_BUDGET", "1.5"))
+
+FIRST_PROMPT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import questionary
+
+class FirstPrompt:
+    def ask(self):
+        print(json.dumps({
+            "seconds": time.perf_counter() - start,
+            "modules": sorted(sys.modules),
+        }))
+        sys.exit(0)
+
+questionary.select = lambda *args, **kwargs: FirstPrompt()
+import cli
+cli.main()
+"""
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+
+
+def test_first_prompt_does_not_import_boto3():
+    output = run_python("-c", FIRST_PROMPT_SCRIPT).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert "boto3" not in result["modules"]
+    assert "botocore" not in result["modules"]
+    assert "src.aws_utils.sqs_utils" not in result["modules"]
+    assert "src.aws_utils.s3_utils" not in result["modules"]
+    assert result["seconds"] < STARTUP_BUDGET_SECONDS
+
+
+def test_import_time_of_package_excludes_boto3():
+    stderr = run_python("-X", "importtime", "-c", "import src.aws_utils").stderr
+    imported = {line.rsplit("|", 1)[-1].strip() for line in stderr.splitlines()}
+
+    assert "src.aws_utils" in imported
+    assert "boto3" not in imported
+
+
+def test_lazy_attributes_resolve():
+    code = "from src import aws_utils; print(aws_utils.SQSUtils.__name__)"
+
+    assert run_python("-c", code).stdout.strip() == "SQSUtils"